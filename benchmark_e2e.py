@@ -0,0 +1,219 @@
+"""
+Offline end-to-end benchmark: runs the real Manager.process_request path (HTTP,
+serialization, vector store, orchestration) against the in-repo stub Ollama server.
+
+Run with:  python benchmark_e2e.py --requests 20 --concurrency 4 --latency uniform:0.05,0.2 --tokens-per-s 80
+Add --profile to print the hottest functions (cProfile) of one request.
+Add --pool-sizes 1,2,4,8 to measure throughput scaling with the Manager pool size.
+"""
+import sys
+import os
+import time
+import json
+import shutil
+import argparse
+import tempfile
+import cProfile
+import pstats
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+from io import StringIO
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from tools.stub_ollama import StubOllamaServer
+
+SAMPLE_STORY = """
+Feature: User Login
+
+Background:
+  - Passwords must be at least 8 characters long.
+  - After 3 consecutive failed attempts the account is locked for 15 minutes.
+
+Acceptance Criteria:
+  - Valid credentials log the user in and redirect to the Dashboard.
+  - A locked account shows: "Account locked. Try again in 15 minutes."
+
+Scenarios:
+  1. Login with valid username and password.
+  2. Login with valid username but wrong password.
+  3. Account lockout after 3 failed login attempts.
+"""
+
+SAMPLE_DOC = "Login rules: passwords need 8 characters. Three failed attempts lock the account for 15 minutes.\n"
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+@contextmanager
+def offline_workspace(server_url, docs_dir=None):
+    """
+    Points the engine at the stub server and keeps every file it writes
+    (vector store, ingest state, outputs, logs) inside a temporary directory.
+    """
+    import config
+    import ingest_data
+    from tools import knowledge_base, file_ops
+
+    workdir = tempfile.mkdtemp(prefix="trace_bench_")
+    if docs_dir is None:
+        docs_dir = os.path.join(workdir, "inputs")
+        os.makedirs(docs_dir)
+        with open(os.path.join(docs_dir, "login_rules.txt"), "w", encoding="utf-8") as f:
+            f.write(SAMPLE_DOC)
+
+    saved_host = os.environ.get("OLLAMA_HOST")
+    saved = [(module, name, getattr(module, name)) for module, name in (
+        (knowledge_base, "VECTOR_STORE_PATH"),
+        (ingest_data, "STATE_FILE"),
+        (ingest_data, "TARGET_FOLDERS"),
+        (file_ops, "TARGET_FOLDERS"),
+        (config, "INTENT_DECISION_LOG"),
+        (config, "ROUTING_STATS_PATH"),
+        (config, "TRACE_LOG"),
+        (config, "CHECKPOINT_DB"),
+        (config, "STAGE_MEMO_DB"),
+    )]
+    os.environ["OLLAMA_HOST"] = server_url
+    knowledge_base.VECTOR_STORE_PATH = os.path.join(workdir, "vector_store")
+    ingest_data.STATE_FILE = os.path.join(workdir, ".ingest_state.json")
+    ingest_data.TARGET_FOLDERS = file_ops.TARGET_FOLDERS = [docs_dir]
+    config.INTENT_DECISION_LOG = os.path.join(workdir, "logs", "intent_decisions.jsonl")
+    config.ROUTING_STATS_PATH = os.path.join(workdir, "logs", "model_routing.json")
+    config.TRACE_LOG = os.path.join(workdir, "logs", "traces.jsonl")
+    config.CHECKPOINT_DB = os.path.join(workdir, "state", "checkpoints.sqlite")
+    config.STAGE_MEMO_DB = os.path.join(workdir, "state", "stage_memo.sqlite")
+    try:
+        # The Archivist needs a vector store at construction time
+        ingest_data.ingest_knowledge_base()
+        yield workdir
+    finally:
+        for module, name, value in saved:
+            setattr(module, name, value)
+        if saved_host is None:
+            os.environ.pop("OLLAMA_HOST", None)
+        else:
+            os.environ["OLLAMA_HOST"] = saved_host
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def build_manager(workdir, memo=False):
+    """A Manager writing into `workdir`. The stage memo is off unless asked for:
+    with it, every repeat of the benchmark story would skip the models entirely."""
+    from agents.manager import Manager
+    from tools.log_capture import LogBuffer, capture
+    with capture(LogBuffer(max_chars=10_000)):
+        manager = Manager()
+    manager.scribe.output_dir = os.path.join(workdir, "outputs")
+    os.makedirs(manager.scribe.output_dir, exist_ok=True)
+    if not memo:
+        manager.memo_path = None
+    return manager
+
+def run_benchmark(requests, concurrency, story, server, workdir, pool_size=None, memo=False):
+    """
+    Runs `requests` stories from `concurrency` client threads through a ManagerPool of
+    `pool_size` Managers (default: one per client). Returns a report dict.
+    """
+    from tools.manager_pool import ManagerPool
+    from tools.log_capture import LogBuffer, capture
+    managers = ManagerPool(lambda: build_manager(workdir, memo), pool_size or concurrency)
+
+    def worker(index):
+        started = time.perf_counter()
+        # Per-thread capture: redirect_stdout would swap the process-wide stdout under other workers
+        with capture(LogBuffer(max_chars=10_000)):
+            result = managers.process_request(story, session=f"bench-{index % concurrency}")
+        return time.perf_counter() - started, result.startswith("Workflow Complete")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(worker, range(requests)))
+    wall = time.perf_counter() - started
+
+    latencies = [seconds for seconds, _ in results]
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "pool_size": managers.size,
+        "managers_built": managers.stats()["created"],
+        "completed": sum(1 for _, ok in results if ok),
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(requests / wall, 3) if wall else 0.0,
+        "latency_s": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "max": round(max(latencies), 3),
+        },
+        "stub": server.stats(),
+    }
+
+def run_scaling(requests, pool_sizes, story, server, workdir, memo=False):
+    """
+    Same load (`requests` stories from max(pool_sizes) clients) against each pool size.
+    Speedup is throughput relative to the first size.
+    """
+    clients = max(pool_sizes)
+    runs = [run_benchmark(requests, clients, story, server, workdir, pool_size=size, memo=memo)
+            for size in pool_sizes]
+    base = runs[0]["throughput_rps"] or 1.0
+    return {
+        "requests": requests,
+        "clients": clients,
+        "scaling": [
+            {"pool_size": r["pool_size"], "throughput_rps": r["throughput_rps"],
+             "speedup": round(r["throughput_rps"] / base, 2), "latency_s": r["latency_s"],
+             "completed": r["completed"]}
+            for r in runs
+        ],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark against the stub Ollama server.")
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--latency", default="fixed:0.05", help="time to first token, e.g. uniform:0.05,0.2")
+    parser.add_argument("--tokens-per-s", type=float, default=200.0)
+    parser.add_argument("--load-seconds", type=float, default=0.0)
+    parser.add_argument("--script", help="JSON response script for the stub server")
+    parser.add_argument("--story", help="file with the user story to submit (default: built-in login story)")
+    parser.add_argument("--docs", help="folder of documents to ingest (default: one small text file)")
+    parser.add_argument("--pool-sizes", help="comma-separated Manager pool sizes to compare, e.g. 1,2,4,8")
+    parser.add_argument("--memo", action="store_true", help="keep the stage memo on (repeats become cache hits)")
+    parser.add_argument("--profile", action="store_true", help="profile one request with cProfile")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    story = SAMPLE_STORY
+    if args.story:
+        with open(args.story, "r", encoding="utf-8") as f:
+            story = f.read()
+    script = None
+    if args.script:
+        with open(args.script, "r", encoding="utf-8") as f:
+            script = json.load(f)
+
+    with StubOllamaServer(script=script, latency=args.latency, tokens_per_s=args.tokens_per_s,
+                          load_seconds=args.load_seconds) as server, \
+         offline_workspace(server.url, args.docs) as workdir:
+        if args.profile:
+            manager = build_manager(workdir, args.memo)
+            profiler = cProfile.Profile()
+            with redirect_stdout(StringIO()):
+                profiler.runcall(manager.process_request, story)
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+        if args.pool_sizes:
+            sizes = [int(size) for size in args.pool_sizes.split(",") if size.strip()]
+            report = run_scaling(args.requests, sizes, story, server, workdir, memo=args.memo)
+        else:
+            report = run_benchmark(args.requests, args.concurrency, story, server, workdir, memo=args.memo)
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
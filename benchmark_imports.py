@@ -0,0 +1,105 @@
+"""
+Import-time benchmark: runs `python -X importtime -c "import <entry>"` for each entry
+point in a fresh interpreter and reports the total, the slowest modules, and which
+heavy dependencies (LangChain, Chroma, document loaders) were loaded at import.
+
+Run with:  python benchmark_imports.py --repeat 5
+Add --check to fail when an entry point loads a heavy dependency at import,
+and --max-ms 500 to fail when an import takes longer than that.
+"""
+import sys
+import os
+import re
+import json
+import argparse
+import statistics
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+
+# The Streamlit app needs streamlit installed, so it isn't measured by default
+ENTRY_POINTS = ["main", "batch", "api", "ingest_data", "agents.manager"]
+
+# Should load on first use only (see src/tools/lazy_import.py)
+HEAVY_MODULES = [
+    "langchain_core", "langchain_ollama", "langchain_chroma", "langchain_community",
+    "langchain_text_splitters", "chromadb", "pypdf", "docx2txt", "ollama", "httpx",
+]
+
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def parse_importtime(text):
+    """Rows of `-X importtime` output as dicts: module, self_us, cumulative_us, depth."""
+    rows = []
+    for line in text.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append({"module": module, "self_us": int(self_us), "cumulative_us": int(cumulative_us),
+                         "depth": (len(indent) - 1) // 2})
+    return rows
+
+def measure(entry, python=sys.executable):
+    """Imports `entry` once in a fresh interpreter. Returns the parsed rows (last one is `entry`)."""
+    result = subprocess.run([python, "-X", "importtime", "-c", f"import {entry}"],
+                            cwd=SRC_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {entry} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    return parse_importtime(result.stderr)
+
+def top_level_package(module):
+    return module.split(".", 1)[0]
+
+def summarize(entry, runs, top=10):
+    """Median total over the runs, plus the slowest packages and heavy modules of the median run."""
+    totals = [runs_rows[-1]["cumulative_us"] for runs_rows in runs]
+    median_run = sorted(runs, key=lambda rows: rows[-1]["cumulative_us"])[len(runs) // 2]
+
+    # Self time summed per top-level package (where the time actually goes)
+    packages = {}
+    for row in median_run:
+        name = top_level_package(row["module"])
+        packages[name] = packages.get(name, 0) + row["self_us"]
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    loaded = {top_level_package(row["module"]) for row in median_run}
+    return {
+        "entry": entry,
+        "import_ms": round(statistics.median(totals) / 1000, 1),
+        "min_ms": round(min(totals) / 1000, 1),
+        "modules": len(median_run),
+        "slowest_packages_ms": {name: round(us / 1000, 1) for name, us in slowest},
+        "heavy_loaded": [m for m in HEAVY_MODULES if m in loaded],
+    }
+
+def run_benchmark(entries, repeat=3, top=10):
+    return [summarize(entry, [measure(entry) for _ in range(repeat)], top) for entry in entries]
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time of each entry point (python -X importtime).")
+    parser.add_argument("entries", nargs="*", default=ENTRY_POINTS, help=f"modules to import (default: {' '.join(ENTRY_POINTS)})")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per entry (the median is reported)")
+    parser.add_argument("--top", type=int, default=10, help="slowest packages to list per entry")
+    parser.add_argument("--check", action="store_true", help="exit 1 if an entry loads a heavy dependency at import")
+    parser.add_argument("--max-ms", type=float, help="exit 1 if an entry takes longer than this to import")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.entries, max(1, args.repeat), args.top)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    failures = []
+    for result in report:
+        if args.check and result["heavy_loaded"]:
+            failures.append(f"{result['entry']} loads {', '.join(result['heavy_loaded'])} at import")
+        if args.max_ms is not None and result["import_ms"] > args.max_ms:
+            failures.append(f"{result['entry']} takes {result['import_ms']} ms to import (limit {args.max_ms})")
+    for failure in failures:
+        print(f"[FAIL] {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,21 @@
 import sys
-from langchain_ollama import ChatOllama
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
 from tools.knowledge_base import get_retriever
+from tools.llm_calls import invoke_chain, llm_options, ModelCallError
+from tools.lazy_import import lazy_import
+
+# LangChain loads on first use, not at import (tools/lazy_import.py)
+ChatOllama = lazy_import("langchain_ollama", "ChatOllama")
+PromptTemplate = lazy_import("langchain_core.prompts", "PromptTemplate")
+StrOutputParser = lazy_import("langchain_core.output_parsers", "StrOutputParser")
+RunnablePassthrough = lazy_import("langchain_core.runnables", "RunnablePassthrough")
 
 class Archivist:
     def __init__(self):
         print("--- Initializing Archivist Agent ---")
         
         try:
-            self.llm = ChatOllama(model="gpt-oss:20b-cloud")
+            self.model_name = "gpt-oss:20b-cloud"
+            self.llm = ChatOllama(model=self.model_name, **llm_options("archivist"))
             self.retriever = get_retriever()
 
             # STRICT PROMPT: Enforces "Librarian" behavior, forbids "Creator" behavior.
@@ -65,7 +70,9 @@ class Archivist:
             
         try:
             # invoke the chain
-            response = self.chain.invoke(query)
+            response = invoke_chain("archivist", self.model_name, self.chain, query)
             return response
+        except ModelCallError:
+            raise
         except Exception as e:
             return f"Error during retrieval: {e}"
\ No newline at end of file
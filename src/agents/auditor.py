@@ -1,26 +1,78 @@
+import re
 import sys
-from langchain_ollama import ChatOllama
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+from tools.prompt_budget import enforce_budget, log_budget
+from tools.llm_calls import invoke_chain, llm_options, ModelCallError, AgentError
+from tools.test_cases import owner_id
+import config
+from tools.lazy_import import lazy_import
+
+# LangChain loads on first use, not at import (tools/lazy_import.py)
+ChatOllama = lazy_import("langchain_ollama", "ChatOllama")
+PromptTemplate = lazy_import("langchain_core.prompts", "PromptTemplate")
+StrOutputParser = lazy_import("langchain_core.output_parsers", "StrOutputParser")
+
+VERDICT_LINE = re.compile(r"^[^\w\n]*(TC_\d+(?:_\d+)?)[^\w\n]*(APPROVED|REJECTED)\b[ \t:\-]*(.*)$",
+                          re.IGNORECASE | re.MULTILINE)
+
+REVIEW_REJECTED = re.compile(r"STATUS:\s*REJECTED", re.IGNORECASE)
+CASE_MENTION = re.compile(r"\bTC_\d+(?:_\d+)?\b", re.IGNORECASE)
+
+def parse_verdicts(review, case_ids):
+    """
+    Maps each reviewed Test Case ID to None (approved) or its feedback (rejected).
+    Uses the per-case VERDICTS lines when present; a case they leave out follows the
+    review's overall STATUS. Without verdict lines, a REJECTED review rejects the cases
+    its feedback names, or every case if it names none. Extra cases (TC_01_2, see
+    assign_ids) count towards their scenario's case.
+    """
+    review = review or ""
+    verdicts = {tc_id: None for tc_id in case_ids}
+    rejected = bool(REVIEW_REJECTED.search(review))
+
+    # Last verdict per listed ID, grouped under the scenario's case
+    lines = {}
+    for m in VERDICT_LINE.finditer(review):
+        owner = owner_id(m.group(1), case_ids)
+        if owner is not None:
+            lines.setdefault(owner, {})[m.group(1).upper()] = (m.group(2).upper(), m.group(3).strip())
+    if lines:
+        for tc_id in case_ids:
+            if tc_id not in lines:
+                if rejected:
+                    verdicts[tc_id] = review
+                continue
+            reasons = [reason if listed_id == tc_id.upper() else f"{listed_id}: {reason}"
+                       for listed_id, (status, reason) in lines[tc_id].items() if status == "REJECTED"]
+            if reasons:
+                feedback = "\n".join(r for r in reasons if r.strip()) or review
+                verdicts[tc_id] = f"STATUS: REJECTED\nFEEDBACK: {feedback}"
+        return verdicts
+
+    if "STATUS: APPROVED" in review:
+        return verdicts
+
+    named = {owner_id(m.group(0), case_ids) for m in CASE_MENTION.finditer(review)} - {None}
+    for tc_id in [c for c in case_ids if c in named] or case_ids:
+        verdicts[tc_id] = review
+    return verdicts
 
 class Auditor:
     def __init__(self, archivist_agent):
         print("--- Initializing Auditor Agent ---")
         try:
             self.archivist = archivist_agent
-            self.llm = ChatOllama(model="gemma3:27b-cloud")
+            self.model_name = "gemma3:27b-cloud"
+            self.llm = ChatOllama(model=self.model_name, **llm_options("auditor"))
 
+            # Static instructions first, variable inputs last (prompt-cache friendly)
             template = """
             You are 'The Auditor'.
             
             CONSTRAINT: The User's list of Scenarios is FINAL. Do not suggest adding new test cases.
             YOUR JOB: Verify accuracy of the generated steps against the Acceptance Criteria.
 
-            User Input (Source of Truth): "{requirement}"
-            Draft Test Cases: "{test_cases}"
-            
             INSTRUCTIONS:
-            1. Check if the Author created a test for every Scenario listed in the input.
+            1. Check if the Author created a test for every Scenario listed in the input (each Scenario is prefixed with its Test Case ID).
             2. Check if the "Expected Results" match the "Acceptance Criteria".
             3. IGNORE formatting preferences. Focus on Logic.
             4. If REJECTING, provide the EXACT text correction.
@@ -34,7 +86,14 @@ class Auditor:
             --- END ANALYSIS ---
             
             STATUS: [APPROVED or REJECTED]
+            VERDICTS: (One line per Test Case ID, e.g.)
+            TC_01: APPROVED
+            TC_02: REJECTED - Expected Result must say "Account locked. Try again in 15 minutes."
             FEEDBACK: (If REJECTED, "Change Test Case 2 Expected Result to...")
+
+            --- INPUTS ---
+            User Input (Source of Truth): "{requirement}"
+            Draft Test Cases: "{test_cases}"
             """
             
             self.prompt = PromptTemplate(
@@ -49,13 +108,20 @@ class Auditor:
             raise e
 
     def review(self, requirement, test_cases_text):
-        if not requirement or not test_cases_text: return "Error: Missing inputs."
+        if not requirement or not test_cases_text:
+            raise AgentError("auditor", "missing inputs")
         try:
             print(f"Auditor is reviewing...")
-            full_response = self.chain.invoke({
+            # No context field: the scenarios and drafts under review are never trimmed or
+            # deduped (the Manager already sends only the unapproved ones), so an oversized
+            # prompt is reported rather than compressed
+            inputs, budget = enforce_budget(self.prompt, {
                 "requirement": requirement,
                 "test_cases": test_cases_text
-            })
+            }, config.PROMPT_BUDGETS.get("auditor"), focus=requirement, context_field=None)
+            log_budget("auditor", budget)
+
+            full_response = invoke_chain("auditor", self.model_name, self.chain, inputs)
             
             if "--- END ANALYSIS ---" in full_response:
                 parts = full_response.split("--- END ANALYSIS ---")
@@ -65,5 +131,8 @@ class Auditor:
                 return decision
             else:
                 return full_response
+        except ModelCallError:
+            raise
         except Exception as e:
-            return f"Error: {e}"
\ No newline at end of file
+            # An error string would be parsed as a review (and fed back to the Author)
+            raise AgentError("auditor", e) from e
\ No newline at end of file
@@ -1,40 +1,38 @@
 import sys
-from langchain_ollama import ChatOllama
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+from tools.prompt_budget import enforce_budget, log_budget
+from tools.llm_calls import invoke_chain, llm_options, ModelCallError, AgentError
+import config
+from tools.lazy_import import lazy_import
+
+# LangChain loads on first use, not at import (tools/lazy_import.py)
+ChatOllama = lazy_import("langchain_ollama", "ChatOllama")
+PromptTemplate = lazy_import("langchain_core.prompts", "PromptTemplate")
+StrOutputParser = lazy_import("langchain_core.output_parsers", "StrOutputParser")
 
 class Author:
     def __init__(self):
         print("--- Initializing Author Agent ---")
         try:
-            self.llm = ChatOllama(model="ministral-3:14b-cloud")
+            self.model_name = "ministral-3:14b-cloud"
+            self.llm = ChatOllama(model=self.model_name, **llm_options("author"))
 
+            # Static instructions first, variable inputs last: every call shares the
+            # same prompt prefix, so the server's prompt cache can reuse it.
+            # CONTEXT comes before the scenario because parallel drafts of one story share it.
             template = """
             You are 'The Author', a Senior QA Engineer.
 
-            --- INPUTS ---
-            SCENARIOS TO AUTOMATE (The Task):
-            "{topic}"
-
-            BUSINESS RULES & CONTEXT (The Truth):
-            "{context}"
-
-            FEEDBACK: {feedback}
-            PREVIOUS DRAFT: {previous_draft}
-            ----------------
-
             INSTRUCTIONS:
-            1. Read the "SCENARIOS TO AUTOMATE" list.
-            2. For EACH scenario in that list, create a Test Case.
+            1. Read the "SCENARIO TO AUTOMATE" at the end of this prompt. It is exactly one scenario.
+            2. Write exactly ONE Test Case for that scenario. Do not add cases for other scenarios.
             3. Use "BUSINESS RULES" to fill in the "Pre-conditions" and "Expected Results".
-            4. If Feedback exists, fix the errors without rewriting valid tests.
-            5. Output ALL test cases in one single block.
-            6. Use plain text only. Do NOT use emoji, symbols, or any non-ASCII characters in your response.
+            4. If Feedback exists, fix the errors without rewriting the parts that were correct.
+            5. Use plain text only. Do NOT use emoji, symbols, or any non-ASCII characters in your response.
 
             FORMAT:
 
             --- THOUGHTS ---
-            * (Strategy: "Mapping Scenario 1 to Rule X...")
+            * (Strategy: "Mapping the scenario to Rule X...")
             --- END THOUGHTS ---
 
             Test Case ID: [TC_01]
@@ -44,8 +42,16 @@ class Author:
             1. [Step]
             Expected Result: [Result]
 
-            Test Case ID: [TC_02]
-            ...
+            --- INPUTS ---
+            BUSINESS RULES & CONTEXT (The Truth):
+            "{context}"
+
+            SCENARIO TO AUTOMATE (The Task):
+            "{topic}"
+
+            FEEDBACK: {feedback}
+            PREVIOUS DRAFT: {previous_draft}
+            ----------------
             """
 
             self.prompt = PromptTemplate(
@@ -54,23 +60,39 @@ class Author:
             )
 
             self.chain = self.prompt | self.llm | StrOutputParser()
+            # Chains for other routing tiers, built on first use
+            self._tier_chains = {}
 
         except Exception as e:
             print(f"Error setting up Author: {e}")
             raise e
 
-    def write(self, topic, context, feedback="", previous_draft=""):
-        if not topic: return "Please provide a topic."
+    def chain_for(self, model):
+        """The drafting chain for `model` (the default chain for this agent's own model)."""
+        if not model or model == self.model_name:
+            return self.chain
+        if model not in self._tier_chains:
+            llm = ChatOllama(model=model, **llm_options("author"))
+            self._tier_chains[model] = self.prompt | llm | StrOutputParser()
+        return self._tier_chains[model]
+
+    def write(self, topic, context, feedback="", previous_draft="", model=None):
+        if not topic:
+            raise AgentError("author", "no scenario to draft")
         try:
             mode = "Refining" if feedback else "Drafting"
             print(f"Author is {mode}...")
 
-            full_response = self.chain.invoke({
+            inputs, budget = enforce_budget(self.prompt, {
                 "topic": topic,
                 "context": context,
                 "feedback": feedback if feedback else "None",
                 "previous_draft": previous_draft if previous_draft else "None"
-            })
+            }, config.PROMPT_BUDGETS.get("author"), focus=topic)
+            log_budget("author", budget)
+
+            model = model or self.model_name
+            full_response = invoke_chain("author", model, self.chain_for(model), inputs)
 
             if "--- END THOUGHTS ---" in full_response:
                 parts = full_response.split("--- END THOUGHTS ---")
@@ -80,5 +102,8 @@ class Author:
                 return content
             else:
                 return full_response
+        except ModelCallError:
+            raise
         except Exception as e:
-            return f"Error: {e}"
+            # An error string would reach the Auditor as if it were a draft
+            raise AgentError("author", e) from e
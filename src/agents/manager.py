@@ -1,122 +1,552 @@
 import sys
 import os
+import re
 import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 
 # Ensure we can import from src/
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from langchain_ollama import ChatOllama
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
 # Agent Imports 
 from agents.archivist import Archivist
 from agents.author import Author
-from agents.auditor import Auditor
+from agents.auditor import Auditor, parse_verdicts
 from agents.scribe import Scribe
-from ingest_data import ingest_knowledge_base
+from ingest_data import ingest_knowledge_base, knowledge_fingerprint
+from tools.story_parser import parse_story
+from tools.intent_classifier import IntentClassifier, record_decision
+from tools.test_cases import case_id, assign_ids, stitch_drafts, pre_audit
+from tools.progress import ProgressTracker
+from tools.llm_calls import invoke_chain, llm_options, ModelCallError, AgentError, static_prefix, warm_up
+from tools.llm_governor import request_context
+from tools.model_router import shared_router
+from tools.tracing import start_trace, span, current_span
+from tools import metrics
+from tools.checkpoints import CheckpointStore, Run, RunInProgressError
+from tools.stage_memo import MemoStore, Memo, content_key
+from tools.lazy_import import lazy_import
+import config
+
+# LangChain loads on first use, not at import (tools/lazy_import.py)
+ChatOllama = lazy_import("langchain_ollama", "ChatOllama")
+PromptTemplate = lazy_import("langchain_core.prompts", "PromptTemplate")
+StrOutputParser = lazy_import("langchain_core.output_parsers", "StrOutputParser")
+
+# How many analyzed inputs to keep in memory (LRU)
+ANALYSIS_CACHE_SIZE = 128
+VALID_INTENTS = ("QUESTION", "REQUIREMENT")
+
+# Expected shape of the front-end JSON response: field -> type
+ANALYSIS_SCHEMA = {
+    "intent": str,
+    "rules": str,
+    "scenarios": list,
+}
+
+ANALYSIS_TEMPLATE = """
+You are the Team Lead of a QA team. Analyze the input text below.
+
+INSTRUCTIONS:
+1. Decide the Intent:
+   - "QUESTION" if the user asks for info/rules.
+   - "REQUIREMENT" if the user provides a story/scenarios to write tests for.
+2. Extract the "rules": Feature Description, Background and Acceptance Criteria as plain text.
+3. Extract the "scenarios": one list entry per numbered or bulleted scenario, without the numbering.
+   For a QUESTION, return an empty list.
+4. Use plain text only. Do NOT use emoji, symbols, or any non-ASCII characters.
+
+Respond with ONLY a JSON object, no markdown, in exactly this shape:
+{{"intent": "QUESTION or REQUIREMENT", "rules": "...", "scenarios": ["...", "..."]}}
+
+INPUT TEXT:
+"{input}"
+"""
+
+def _load_json(raw):
+    """Parses a model response as JSON, tolerating ```json fences."""
+    text = str(raw).strip()
+    if text.startswith("```"):
+        text = text.strip("`").strip()
+        if text.lower().startswith("json"):
+            text = text[4:]
+    return json.loads(text)
+
+def validate_analysis(data):
+    """
+    Validates the front-end response against ANALYSIS_SCHEMA.
+    Returns a normalized dict or raises ValueError.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Analysis must be a JSON object.")
+
+    for field, expected_type in ANALYSIS_SCHEMA.items():
+        if not isinstance(data.get(field), expected_type):
+            raise ValueError(f"Analysis field '{field}' must be of type {expected_type.__name__}.")
+
+    intent = data["intent"].strip().upper()
+    if intent not in VALID_INTENTS:
+        raise ValueError(f"Unknown intent '{data['intent']}'.")
+
+    scenarios = [str(s).strip() for s in data["scenarios"] if str(s).strip()]
+    if intent == "REQUIREMENT" and not scenarios:
+        raise ValueError("A REQUIREMENT must contain at least one scenario.")
+
+    return {"intent": intent, "rules": data["rules"].strip(), "scenarios": scenarios, "source": "llm"}
+
+def _copy_analysis(analysis):
+    return {**analysis, "scenarios": list(analysis["scenarios"])}
+
+def as_scenario_list(scenarios):
+    """
+    Normalizes scenarios into a list of strings.
+    Accepts a list, or a text blob with one (optionally numbered) scenario per line.
+    """
+    if isinstance(scenarios, (list, tuple)):
+        items = scenarios
+    else:
+        items = str(scenarios or "").splitlines()
+
+    cleaned = []
+    for item in items:
+        text = re.sub(r"^\s*(?:[-*]|\d+[.)])\s*", "", str(item)).strip()
+        if text:
+            cleaned.append(text)
+    return cleaned
+
+def format_scenarios(scenarios):
+    """Renders a scenario list as a numbered text block for prompts."""
+    return "\n".join(f"{i}. {s}" for i, s in enumerate(scenarios, start=1))
+
+def _prompt_of(agent):
+    """The agent's prompt template, or "" (memo keys include it, so prompt edits invalidate)."""
+    template = getattr(getattr(agent, "prompt", None), "template", "")
+    return template if isinstance(template, str) else ""
+
+class AgentInitError(RuntimeError):
+    """An agent could not be built (e.g. no vector store for the Archivist yet)."""
+
+def _lazy_agent(name):
+    """Manager attribute that builds the agent on first access; assigning replaces it."""
+    def get(self):
+        return self._agent(name)
+
+    def set(self, agent):
+        self._agents[name] = agent
+
+    return property(get, set, doc=f"The {name.title()} (built on first use).")
+
+def _lazy_client(name):
+    """Manager attribute for a model client or chain, built on first access; assigning replaces it."""
+    def get(self):
+        client = self._clients.get(name)
+        if client is None:
+            with self._agents_lock:
+                client = self._clients.get(name)
+                if client is None:
+                    client = self._clients[name] = self._client_factories[name]()
+        return client
+
+    def set(self, client):
+        self._clients[name] = client
+
+    return property(get, set)
 
 class Manager:
+    archivist = _lazy_agent("archivist")
+    author = _lazy_agent("author")
+    auditor = _lazy_agent("auditor")
+    scribe = _lazy_agent("scribe")
+    llm = _lazy_client("llm")
+    json_llm = _lazy_client("json_llm")
+    analysis_chain = _lazy_client("analysis_chain")
+
     def __init__(self):
         print("--- Initializing Manager Agent (Team Lead) ---")
+        started = time.perf_counter()
+        # Agents are built on first use: a QUESTION never pays for the Author, Auditor or
+        # Scribe, and startup doesn't open the vector store. The classes are bound now.
+        archivist_cls, author_cls, auditor_cls, scribe_cls = Archivist, Author, Auditor, Scribe
+        self._agent_factories = {
+            "archivist": archivist_cls,
+            "author": author_cls,
+            "auditor": lambda: auditor_cls(archivist_agent=self.archivist),
+            "scribe": scribe_cls,
+        }
+        self._agents = {}
+        self._agents_lock = threading.RLock()
+        # Fast model for decision making
+        self.model_name = "ministral-3:14b-cloud"
+        # Model clients are built on first use too (LangChain isn't imported until then);
+        # json_llm is the same model in JSON mode for the structured front-end call
+        chat_cls, prompt_cls, parser_cls = ChatOllama, PromptTemplate, StrOutputParser
+        self._client_factories = {
+            "llm": lambda: chat_cls(model=self.model_name, **llm_options("manager")),
+            "json_llm": lambda: chat_cls(model=self.model_name, format="json", **llm_options("manager")),
+            "analysis_chain": lambda: (prompt_cls(template=ANALYSIS_TEMPLATE, input_variables=["input"])
+                                       | self.json_llm | parser_cls()),
+        }
+        self._clients = {}
+        self._analysis_cache = OrderedDict()
+        self._tier_chains = {}
+        # Local classifier decides obvious intents without a model call
+        self.intent_classifier = IntentClassifier(threshold=config.INTENT_CONFIDENCE_THRESHOLD)
+        self.intent_log_path = config.INTENT_DECISION_LOG
+        self.intent_log_raw = config.INTENT_LOG_RAW_TEXT
+        self.last_intent_decision = None
+        # Cheap model first, bigger ones only after a rejection (one router per process)
+        self.router = shared_router(config.MODEL_TIERS, config.ROUTING_STATS_PATH)
+        # One trace per process_request, appended here as JSONL
+        self.trace_log_path = config.TRACE_LOG
+        self.last_trace_id = None
+        # Stage outputs per request (SQLite), so a failed or crashed run resumes mid-pipeline
+        self.checkpoint_path = config.CHECKPOINT_DB
+        self._checkpoints = None
+        # Stage outputs shared across requests (SQLite), so an edited story only recomputes what changed
+        self.memo_path = config.STAGE_MEMO_DB
+        self._memo_store = None
+        # Spans feed the Prometheus counters; the endpoint is opt-in
+        metrics.install()
+        if config.METRICS_PORT:
+            self.start_metrics_server()
+        self.startup_ms = round((time.perf_counter() - started) * 1000, 1)
+        print(f"[MANAGER] Ready in {self.startup_ms} ms (agents load on first use).")
+
+    def _agent(self, name):
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+        with self._agents_lock:
+            if name not in self._agents:
+                with span(f"init.{name}"):
+                    try:
+                        self._agents[name] = self._agent_factories[name]()
+                    except Exception as e:
+                        raise AgentInitError(f"{name.title()} could not be initialized: {e}") from e
+            return self._agents[name]
+
+    def build_agents(self):
+        """Builds every agent (and the Manager's own model clients) now instead of on first use."""
+        for name in self._agent_factories:
+            self._agent(name)
+        for name in self._client_factories:
+            getattr(self, name)
+
+    def start_metrics_server(self, host=None, port=None):
+        """Serves /metrics for this process (shared by every Manager). Returns the server or None."""
+        host = host or config.METRICS_HOST
+        port = config.METRICS_PORT if port is None else port
+        try:
+            return metrics.serve(host, port)
+        except OSError as e:
+            print(f"   [SYSTEM] Metrics endpoint not started on {host}:{port}: {e}")
+            return None
+
+    def warm_up_targets(self):
+        """(role, model, static prompt prefix) for every model this team may call."""
+        targets = [("manager", model, static_prefix(ANALYSIS_TEMPLATE))
+                   for model in self.router.tiers.get("manager", [self.model_name])]
+        author_models = self.router.tiers.get("author", [self.author.model_name])
+        targets += [("author", model, static_prefix(self.author.prompt.template)) for model in author_models]
+        targets += [
+            ("auditor", self.auditor.model_name, static_prefix(self.auditor.prompt.template)),
+            ("archivist", self.archivist.model_name, static_prefix(self.archivist.prompt.template)),
+            ("scribe", self.scribe.model_name, static_prefix(self.scribe.prompt.template)),
+        ]
+        seen = set()
+        return [t for t in targets if (t[1], t[2]) not in seen and not seen.add((t[1], t[2]))]
+
+    def prewarm(self, background=True):
+        """
+        Builds the agents (opening the vector store), then loads the models and primes the
+        server's prompt cache (config.LLM_WARMUP), so the first request pays for neither.
+        Runs on a daemon thread by default so startup isn't blocked.
+        """
+        if not background:
+            return self._prewarm()
+        thread = threading.Thread(target=self._prewarm, name="manager-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    def _prewarm(self):
         try:
-            self.archivist = Archivist()
-            self.author = Author()
-            self.auditor = Auditor(archivist_agent=self.archivist)
-            self.scribe = Scribe()
-            # Fast model for decision making
-            self.llm = ChatOllama(model="ministral-3:14b-cloud")
-        except Exception as e:
-            print(f"Error initializing team: {e}")
-            sys.exit(1)
+            self.build_agents()
+        except AgentInitError as e:
+            # Not fatal: the first request syncs the knowledge base and tries again
+            print(f"   [SYSTEM] Pre-warm stopped: {e}")
+            return None
+        if not config.LLM_WARMUP:
+            return None
+        targets = self.warm_up_targets()
+        print(f"[MANAGER] Warming up {len(targets)} model/prompt pair(s)...")
+        return warm_up(targets)
 
     def sync_knowledge(self):
         print("\n[MANAGER] Verifying Knowledge Base state...")
-        status = ingest_knowledge_base()
+        with span("sync") as stage:
+            status = ingest_knowledge_base()
+            stage.set(status=status, up_to_date=str(status).startswith("[OK]"))
         print(f"[MANAGER] Status: {status}")
 
+    def analyze_request(self, user_input):
+        """
+        Single structured front-end call: returns the Intent, the Rules and the
+        Scenario list in one schema-validated JSON response.
+        Results are cached by input hash, so classify_intent() and analyze_input()
+        on the same text share ONE model call.
+
+        Well-structured stories (Feature / Background / Acceptance Criteria /
+        Scenarios) skip the model entirely. The 'source' key reports the path
+        taken: "rules", "llm" or "fallback".
+        """
+        with span("parse", cache_hit=False) as stage:
+            analysis = self._analyze_request(user_input)
+            stage.set(source=analysis["source"], scenarios=len(analysis["scenarios"]))
+            return analysis
+
+    def _analyze_request(self, user_input):
+        parsed = parse_story(user_input, aliases=config.STORY_HEADING_ALIASES)
+        current_span().set(parser_confidence=parsed["confidence"])
+        if parsed["confidence"] >= config.STORY_PARSER_MIN_CONFIDENCE:
+            print(f"[MANAGER] Parse path: RULES (confidence {parsed['confidence']:.2f}, "
+                  f"{len(parsed['scenarios'])} scenarios)")
+            return {"intent": "REQUIREMENT", "rules": parsed["rules"],
+                    "scenarios": parsed["scenarios"], "source": "rules"}
+
+        key = hashlib.sha256(user_input.strip().encode("utf-8")).hexdigest()
+        if key in self._analysis_cache:
+            self._analysis_cache.move_to_end(key)
+            current_span().set(cache_hit=True)
+            print("[MANAGER] Front-end analysis served from cache.")
+            return _copy_analysis(self._analysis_cache[key])
+
+        memo = self.open_memo()
+        memo_key = content_key("analysis", ANALYSIS_TEMPLATE, key)
+        saved = memo.get(memo_key)
+        if memo.enabled:
+            current_span().set(memo_hits=int(saved is not None), memo_misses=int(saved is None))
+        if saved is not None:
+            print("[MANAGER] Front-end analysis served from the stage memo.")
+            self._remember_analysis(key, saved)
+            return _copy_analysis(saved)
+
+        print(f"[MANAGER] Parse path: LLM (parser confidence {parsed['confidence']:.2f})")
+        print("[MANAGER] Analyzing input (intent + rules + scenarios in one call)...")
+        analysis = None
+        for level in range(self.router.levels("manager")):
+            model = self.router.model_for("manager", level, default=self.model_name)
+            started = time.perf_counter()
+            try:
+                raw = invoke_chain("manager", model, self._analysis_chain_for(model), {"input": user_input})
+                analysis = validate_analysis(_load_json(raw))
+            except ModelCallError:
+                raise
+            except Exception as e:
+                print(f"Parsing Error ({model}): {e}")
+                self.router.record("manager", model, False, time.perf_counter() - started)
+                continue
+            self.router.record("manager", model, True, time.perf_counter() - started)
+            break
+
+        if analysis is None:
+            # Fallback: treat everything as a single requirement scenario (not cached)
+            return {"intent": "REQUIREMENT", "rules": "General Requirement",
+                    "scenarios": [user_input], "source": "fallback"}
+
+        self._remember_analysis(key, analysis)
+        memo.put(memo_key, "analysis", analysis)
+        return _copy_analysis(analysis)
+
+    def _remember_analysis(self, key, analysis):
+        self._analysis_cache[key] = analysis
+        if len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+            self._analysis_cache.popitem(last=False)
+
+    def _analysis_chain_for(self, model):
+        """Front-end chain for a routing tier; the Manager's own model uses analysis_chain."""
+        if model == self.model_name:
+            return self.analysis_chain
+        if model not in self._tier_chains:
+            llm = ChatOllama(model=model, format="json", **llm_options("manager"))
+            prompt = PromptTemplate(template=ANALYSIS_TEMPLATE, input_variables=["input"])
+            self._tier_chains[model] = prompt | llm | StrOutputParser()
+        return self._tier_chains[model]
+
     def analyze_input(self, full_text):
         """
         Splits the User Input into 'Rules' (Context) and 'Scenarios' (Tasks).
+        Returns (rules_text, scenario_list).
         """
         print("[MANAGER] Parsing User Input (separating Rules from Scenarios)...")
-        
-        template = """
-        You are a Data parser. Analyze the input text below.
-        
-        INPUT TEXT:
-        "{input}"
-        
-        INSTRUCTIONS:
-        1. Extract the "Rules/Context" (Feature Description, Background, Acceptance Criteria).
-        2. Extract the "Scenarios" (The numbered list or specific test scenarios).
-        3. Use plain text only. Do NOT use emoji, symbols, or any non-ASCII characters in your output.
+        analysis = self.analyze_request(full_text)
+        return analysis["rules"], analysis["scenarios"]
 
-        FORMAT OUTPUT strictly as:
-        --- RULES ---
-        (Paste rules here)
-        --- SCENARIOS ---
-        (Paste scenarios here)
+    def classify_intent(self, user_input):
         """
-        
-        prompt = PromptTemplate(template=template, input_variables=["input"])
-        chain = prompt | self.llm | StrOutputParser()
-        
-        try:
-            result = chain.invoke({"input": full_text})
-            
-            # Simple string parsing
-            rules = ""
-            scenarios = ""
-            
-            if "--- RULES ---" in result and "--- SCENARIOS ---" in result:
-                parts = result.split("--- SCENARIOS ---")
-                rules = parts[0].replace("--- RULES ---", "").strip()
-                scenarios = parts[1].strip()
-            else:
-                # Fallback: Treat everything as scenarios
-                rules = "General Requirement"
-                scenarios = full_text
-                
-            return rules, scenarios
-        except Exception as e:
-            print(f"Parsing Error: {e}")
-            return full_text, full_text
+        Local classifier first (sub-millisecond). Only uncertain inputs escalate
+        to the structured front-end call. Every decision is logged for tuning.
+        """
+        decision = self.intent_classifier.classify(user_input)
+        if decision["intent"] is None:
+            decision = {**decision, "intent": self.analyze_request(user_input)["intent"], "path": "llm"}
 
-    def classify_intent(self, user_input):
-        template = """
-        Analyze the user input and determine the Intent.
-        Input: "{input}"
+        print(f"[MANAGER] Intent path: {decision['path'].upper()} "
+              f"(local confidence {decision['confidence']:.2f}, {decision['elapsed_ms']} ms)")
+        record_decision(self.intent_log_path, user_input, decision, raw=self.intent_log_raw)
+        self.last_intent_decision = decision
+        return decision["intent"]
 
-        Options:
-        1. QUESTION (User asks for info/rules).
-        2. REQUIREMENT (User provides a scenario/story).
+    def _timed_write(self, scenario, model=None, tc_id=None, **kwargs):
+        started = time.perf_counter()
+        if model:
+            kwargs["model"] = model
+        with span("author", tc_id=tc_id, model=model, refining=bool(kwargs.get("feedback"))):
+            draft = self.author.write(scenario, **kwargs)
+        return draft, time.perf_counter() - started
 
-        Return ONLY one word: "QUESTION" or "REQUIREMENT". No emoji. No extra text.
+    def draft_scenarios(self, scenarios, context, feedbacks=None, previous_drafts=None, ids=None,
+                        models=None, timings=None):
         """
-        prompt = PromptTemplate(template=template, input_variables=["input"])
-        chain = prompt | self.llm | StrOutputParser()
-        
-        try:
-            return chain.invoke({"input": user_input}).strip().upper()
-        except Exception:
-            return "REQUIREMENT"
+        Fan-out: one Author call per scenario, at most config.AUTHOR_PARALLELISM at once.
+        feedbacks / previous_drafts / ids / models are parallel lists (one entry per scenario).
+        If `timings` is a list it receives each call's latency in seconds.
+        Returns the drafts in the given order, each carrying its stable ID (TC_01...TC_nn).
+        """
+        feedbacks = feedbacks or [""] * len(scenarios)
+        previous_drafts = previous_drafts or [""] * len(scenarios)
+        ids = ids or [case_id(i) for i in range(1, len(scenarios) + 1)]
+        models = models or [None] * len(scenarios)
+        workers = max(1, min(config.AUTHOR_PARALLELISM, len(scenarios)))
+        print(f"[MANAGER] Drafting {len(scenarios)} scenario(s), {workers} in parallel...")
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Each task runs in a copy of this request's context (priority/session for the governor)
+            futures = [
+                pool.submit(contextvars.copy_context().run, self._timed_write, scenario, model=model, tc_id=tc_id,
+                            context=context, feedback=feedback, previous_draft=previous)
+                for scenario, feedback, previous, model, tc_id in zip(scenarios, feedbacks, previous_drafts, models, ids)
+            ]
+            try:
+                results = [future.result() for future in futures]
+            except ModelCallError:
+                # One scenario failed for good: don't start the ones still queued
+                for future in futures:
+                    future.cancel()
+                raise
+
+        if timings is not None:
+            timings.extend(seconds for _, seconds in results)
+        return [assign_ids(draft, tc_id) for (draft, _), tc_id in zip(results, ids)]
+
+    def _check_progress(self, progress, ids, drafts, feedbacks, rejected, attempt, max_attempts, escalated=()):
+        """
+        Records this round's rejections. When every rejected case has stopped converging
+        and attempts remain, returns an early-stop status instead of burning more model time.
+        Cases that just moved up a model tier get another chance.
+        """
+        reasons = {ids[i]: progress.record(ids[i], drafts[i], feedbacks[i]) for i in rejected}
+        if attempt >= max_attempts or not all(reasons.values()) or any(i in escalated for i in rejected):
+            return None
+        details = "; ".join(f"{tc_id}: {reason}" for tc_id, reason in reasons.items())
+        print(f"\n[MANAGER] No progress detected after attempt {attempt}/{max_attempts}. Stopping early.")
+        return f"Error: Stopped early after attempt {attempt}/{max_attempts} - no progress. {details}"
+
+    def open_run(self, request_id, user_input):
+        """
+        The checkpoint Run for this request. A no-op Run when checkpointing is off or the
+        caller gave no request_id: a run keyed on the story alone would be shared by every
+        caller who submits the same text.
+        """
+        if not self.checkpoint_path or not request_id:
+            return Run()
+        if self._checkpoints is None or self._checkpoints.path != self.checkpoint_path:
+            self._checkpoints = CheckpointStore(self.checkpoint_path, config.CHECKPOINT_MAX_AGE_DAYS)
+        return self._checkpoints.open_run(request_id, user_input)
+
+    def open_memo(self):
+        """The shared stage memo (a no-op Memo when memoization is off)."""
+        if not self.memo_path:
+            return Memo()
+        if self._memo_store is None or self._memo_store.path != self.memo_path:
+            self._memo_store = MemoStore(self.memo_path, config.STAGE_MEMO_MAX_AGE_DAYS)
+        return Memo(self._memo_store)
+
+    def run_generation_workflow(self, user_input, max_attempts=None, request_id=None):
+        """
+        Parse -> duplicate check -> context -> Author/Auditor loop -> Scribe.
+        With a request_id, each completed stage is checkpointed under (request_id, input hash);
+        running the same request again after a crash or a failed model call resumes from there.
+        Raises RunInProgressError while the same request is still running elsewhere.
+        """
+        with self.open_run(request_id, user_input) as run:
+            if run.resumed:
+                print(f"[MANAGER] Resuming from checkpoint. Completed stages: {', '.join(sorted(run.stages))}")
+                if current_span() is not None:
+                    current_span().set(resumed=sorted(run.stages))
+            result = self._run_generation_workflow(user_input, max_attempts, run)
+            # A failed Scribe save keeps the approved drafts for the next try
+            if not result.startswith("Workflow Complete.\n\nError"):
+                run.finish(result.split("\n", 1)[0][:200])
+            return result
 
-    def run_generation_workflow(self, user_input):
+    def _run_generation_workflow(self, user_input, max_attempts, run):
         print("\n[MANAGER] Starting Workflow...")
 
+        # Approved on an earlier try; only the Scribe is left
+        approved = run.get("approved")
+        if approved:
+            return self._publish(approved["drafts"])
+
         # STEP 0: INTELLIGENT PARSING
         # We separate the input so we don't confuse the agents.
-        rules_text, scenarios_text = self.analyze_input(user_input)
+        saved = run.get("analysis")
+        if saved:
+            rules_text, scenarios = saved["rules"], saved["scenarios"]
+        else:
+            rules_text, scenarios = self.analyze_input(user_input)
+            scenarios = as_scenario_list(scenarios) or [user_input]
+            run.save("analysis", {"rules": rules_text, "scenarios": scenarios})
+        scenarios_text = format_scenarios(scenarios)
         
         print(f"\n[MANAGER] Identified Task:")
         print(f"   - Context Source: {len(rules_text)} chars")
-        print(f"   - Scenarios to Write: \n{scenarios_text[:100]}...")
+        print(f"   - Scenarios to Write: {len(scenarios)}\n{scenarios_text[:100]}...")
+
+        # Stage memo: outputs of earlier requests, keyed by what they were computed from.
+        # Knowledge base edits change `knowledge` and so invalidate context and duplicate verdicts.
+        memo = self.open_memo()
+        knowledge = knowledge_fingerprint() if memo.enabled else ""
 
         # STEP 1: DUPLICATION CHECK (Using ONLY Scenarios)
         print(f"\n[MANAGER] Asking Archivist to check for duplicates...")
-        # We only check if these specific SCENARIOS exist. We don't care if the Feature exists.
-        duplication_query = f"Check database for EXISTING test cases strictly covering these scenarios: {scenarios_text}"
-        check_result = self.archivist.ask(duplication_query)
+        saved = run.get("duplicate_check")
+        if saved:
+            check_result = saved["result"]
+        else:
+            # Scenarios already found clean (against this knowledge base) are not asked about again
+            duplicate_keys = [content_key("duplicate", s, knowledge, _prompt_of(self.archivist)) for s in scenarios]
+            unchecked = [i for i, key in enumerate(duplicate_keys) if memo.get(key) is None]
+            with span("duplicate_check") as stage:
+                if unchecked:
+                    # We only check if these specific SCENARIOS exist. We don't care if the Feature exists.
+                    duplication_query = ("Check database for EXISTING test cases strictly covering these scenarios: "
+                                         f"{format_scenarios([scenarios[i] for i in unchecked])}")
+                    check_result = self.archivist.ask(duplication_query)
+                else:
+                    print("[MANAGER] Every scenario was checked on an earlier run. Skipping the duplicate check.")
+                    check_result = "NO_EXISTING (all scenarios cleared on an earlier run)"
+                stage.set(duplicate="FOUND_EXISTING" in check_result)
+                if memo.enabled:
+                    stage.set(memo_hits=len(scenarios) - len(unchecked), memo_misses=len(unchecked))
+            # A clean verdict holds for each scenario asked about; a duplicate can't be pinned on one
+            if "FOUND_EXISTING" not in check_result:
+                for i in unchecked:
+                    memo.put(duplicate_keys[i], "duplicate", {"duplicate": False})
+            run.save("duplicate_check", {"result": check_result})
         
         if "FOUND_EXISTING" in check_result:
              return f"Duplicate detected. Stopping.\n{check_result}"
@@ -125,49 +555,224 @@ class Manager:
         print(f"\n[MANAGER] Gathering context for Author...")
         # We ask Archivist to find docs matching the Feature/Criteria
         context_query = f"Find standard business rules and style guides related to: {rules_text}"
-        retrieved_docs = self.archivist.ask(context_query)
+        context_key = content_key("context", rules_text, knowledge, _prompt_of(self.archivist))
+        saved = run.get("context")
+        if saved:
+            retrieved_docs = saved["docs"]
+        else:
+            with span("context") as stage:
+                memoized = memo.get(context_key)
+                if memoized is not None:
+                    print("[MANAGER] Context bundle served from the stage memo.")
+                    retrieved_docs = memoized["docs"]
+                else:
+                    retrieved_docs = self.archivist.ask(context_query)
+                    memo.put(context_key, "context", {"docs": retrieved_docs})
+                stage.set(chars=len(retrieved_docs))
+                if memo.enabled:
+                    stage.set(memo_hits=int(memoized is not None), memo_misses=int(memoized is None))
+            run.save("context", {"docs": retrieved_docs})
         
         # We combine the User's Rules + Retrieved Docs into one "Master Context"
         full_context = f"USER PROVIDED RULES:\n{rules_text}\n\nSYSTEM DOCS:\n{retrieved_docs}"
 
         # STEP 3: PRODUCTION LOOP
-        topic = scenarios_text  # Author focuses on Scenarios
-        feedback = ""
-        previous_draft = ""
+        # Verdicts are per test case: approved cases are frozen, and a retry only
+        # re-drafts and re-audits the rejected ones.
+        ids = [case_id(i) for i in range(1, len(scenarios) + 1)]
+        drafts = [""] * len(scenarios)
+        feedbacks = [""] * len(scenarios)
+        pending = list(range(len(scenarios)))  # needs a (re)draft
+        held = []                              # passed pre-audit, still awaiting the Auditor
         attempt = 1
-        max_attempts = 2 # Synergized limit
+        max_attempts = max_attempts or config.MAX_ATTEMPTS
+        progress = ProgressTracker(config.DRAFT_SIMILARITY_THRESHOLD, config.FEEDBACK_SIMILARITY_THRESHOLD)
+        levels = [0] * len(scenarios)          # routing tier per test case
+        unscored = {}                          # i -> (model, seconds) of drafts awaiting a verdict
+        drafted = False                        # this attempt's drafts exist, the verdicts don't yet
+
+        # An approved case depends on its scenario, the full context and both prompts
+        case_keys = [content_key("case", s, full_context, _prompt_of(self.author), _prompt_of(self.auditor))
+                     for s in scenarios]
+
+        saved = run.get("loop")
+        if saved:
+            attempt, drafts, feedbacks = saved["attempt"], saved["drafts"], saved["feedbacks"]
+            pending, held, levels = saved["pending"], saved["held"], saved["levels"]
+            progress.history = {tc: [tuple(entry) for entry in entries] for tc, entries in saved["history"].items()}
+            drafted = saved["phase"] == "drafted"
+        elif memo.enabled:
+            # Cases approved on an earlier request are reused as-is (renumbered to their new position)
+            with span("approved_cases", cases=len(scenarios)) as stage:
+                for i, key in enumerate(case_keys):
+                    memoized = memo.get(key)
+                    if memoized is not None:
+                        drafts[i] = assign_ids(memoized["draft"], ids[i])
+                pending = [i for i in pending if not drafts[i]]
+                stage.set(memo_hits=len(scenarios) - len(pending), memo_misses=len(pending))
+            if len(pending) < len(scenarios):
+                print(f"[MANAGER] Reusing {len(scenarios) - len(pending)} approved case(s) from the stage memo.")
+            if not pending:
+                print("\n[MANAGER] Every case was approved on an earlier run.")
+                run.save("approved", {"drafts": drafts})
+                return self._publish(drafts)
+
+        def checkpoint(phase):
+            run.save("loop", {"phase": phase, "attempt": attempt, "drafts": drafts, "feedbacks": feedbacks,
+                              "pending": pending, "held": held, "levels": levels, "history": progress.history})
+
+        def model_for(i):
+            return self.router.model_for("author", levels[i], default=getattr(self.author, "model_name", None))
+
+        def score(cases, accepted):
+            """Records verdicts per routing tier; rejected cases move up a tier. Returns those that did."""
+            escalated = set()
+            for i in cases:
+                if i in unscored:
+                    model, seconds = unscored.pop(i)
+                    self.router.record("author", model, accepted, seconds)
+                if not accepted and self.router.can_escalate("author", levels[i]):
+                    levels[i] = self.router.escalate("author", levels[i])
+                    escalated.add(i)
+                    print(f"[MANAGER] Escalating {ids[i]} to {model_for(i)} "
+                          f"(tier {levels[i] + 1}/{self.router.levels('author')})")
+            return escalated
 
         while attempt <= max_attempts:
-            print(f"\n[Attempt {attempt}/{max_attempts}]")
+            print(f"\n[Attempt {attempt}/{max_attempts}] Working on: {', '.join(ids[i] for i in pending)}")
             
-            # Author works on 'topic' (Scenarios) using 'full_context' (Rules)
-            draft = self.author.write(topic, context=full_context, feedback=feedback, previous_draft=previous_draft)
-            previous_draft = draft
+            # Author drafts each pending Scenario separately (in parallel) using 'full_context' (Rules)
+            if not drafted:
+                timings = []
+                with span("drafting", attempt=attempt, cases=len(pending)):
+                    new_drafts = self.draft_scenarios(
+                        [scenarios[i] for i in pending], full_context,
+                        feedbacks=[feedbacks[i] for i in pending],
+                        previous_drafts=[drafts[i] for i in pending],
+                        ids=[ids[i] for i in pending],
+                        models=[model_for(i) for i in pending],
+                        timings=timings,
+                    )
+                for i, draft, seconds in zip(pending, new_drafts, timings):
+                    drafts[i] = draft
+                    unscored[i] = (model_for(i), seconds)
+                checkpoint("drafted")
+            drafted = False
+            candidates = sorted(pending + held)
 
-            # Auditor checks the Draft against the Scenarios
-            review = self.auditor.review(topic, draft)
-            
-            if "STATUS: APPROVED" in review:
+            # Pre-audit: mechanical defects go straight back to the Author (no Auditor call)
+            with span("pre_audit", attempt=attempt, cases=len(candidates)) as stage:
+                defects = pre_audit({ids[i]: drafts[i] for i in candidates},
+                                    {ids[i]: scenarios[i] for i in candidates})
+                defective = [i for i in candidates if defects[ids[i]]]
+                stage.set(defective=len(defective))
+            if defective:
+                print(f"\n[MANAGER] Pre-audit failed for {', '.join(ids[i] for i in defective)}. "
+                      f"Skipping Auditor, sending back to Author.")
+                for i in defective:
+                    feedbacks[i] = defects[ids[i]]
+                    print(f"Feedback: {feedbacks[i]}")
+                held = [i for i in candidates if i not in defective]
+                pending = defective
+                escalated = score(defective, accepted=False)
+                stalled = self._check_progress(progress, ids, drafts, feedbacks, defective, attempt, max_attempts,
+                                               escalated)
+                if stalled:
+                    return stalled
+                attempt += 1
+                checkpoint("reviewed")
+                continue
+
+            # Auditor checks only the unapproved Drafts against their Scenarios
+            topic = "\n".join(f"{ids[i]}: {scenarios[i]}" for i in candidates)
+            with span("auditor", attempt=attempt, cases=len(candidates)) as stage:
+                review = self.auditor.review(topic, stitch_drafts(drafts[i] for i in candidates))
+                verdicts = parse_verdicts(review, [ids[i] for i in candidates])
+                rejected = [i for i in candidates if verdicts[ids[i]] is not None]
+                stage.set(rejected=len(rejected))
+            for i in rejected:
+                feedbacks[i] = verdicts[ids[i]]
+            for i in candidates:
+                if i not in rejected:
+                    memo.put(case_keys[i], "case", {"draft": drafts[i]})
+            score([i for i in candidates if i not in rejected], accepted=True)
+            escalated = score(rejected, accepted=False)
+
+            if not rejected:
                 print("\n[MANAGER] Quality Gate Passed.")
-                print("[MANAGER] Handing off to Scribe...")
-                # Scribe saves the SINGLE file containing ALL scenarios
-                save_status = self.scribe.save(draft)
-                return f"Workflow Complete.\n\n{save_status}"
+                run.save("approved", {"drafts": drafts})
+                return self._publish(drafts)
             else:
-                print("\n[MANAGER] Quality Gate Failed. Sending back to Author.")
+                print(f"\n[MANAGER] Quality Gate Failed for {', '.join(ids[i] for i in rejected)} "
+                      f"({len(scenarios) - len(rejected)}/{len(scenarios)} approved). Sending back to Author.")
                 print(f"Feedback: {review}")
-                feedback = review
+                pending = rejected
+                held = []
+                stalled = self._check_progress(progress, ids, drafts, feedbacks, rejected, attempt, max_attempts,
+                                               escalated)
+                if stalled:
+                    return stalled
                 attempt += 1
+                checkpoint("reviewed")
 
         return "Error: Max attempts reached. Content could not be approved."
 
-    def process_request(self, user_input):
-        self.sync_knowledge()
-        intent = self.classify_intent(user_input)
-        
-        if "QUESTION" in intent:
-            print(f"[MANAGER] Intent detected: RESEARCH")
-            return f"Archivist Report: {self.archivist.ask(user_input)}"
-        else:
-            print(f"[MANAGER] Intent detected: WORK ORDER")
-            return self.run_generation_workflow(user_input)
\ No newline at end of file
+    def _publish(self, drafts):
+        print("[MANAGER] Handing off to Scribe...")
+        # Scribe saves the SINGLE file containing ALL scenarios
+        with span("scribe", cases=len(drafts)):
+            save_status = self.scribe.save(stitch_drafts(drafts))
+        return f"Workflow Complete.\n\n{save_status}"
+
+    def process_request(self, user_input, max_attempts=None, session=None, sync=True, priority=None,
+                        request_id=None):
+        """
+        Handles one input end to end and returns the result string.
+        sync=False skips the knowledge base check (callers that already synced, e.g. batch.py).
+        priority overrides the governor class for the request's model calls.
+        request_id names the run for checkpointing; resubmitting it resumes an unfinished run.
+        Without one the request is not checkpointed.
+        """
+        with start_trace("process_request", export_path=self.trace_log_path, session=session,
+                         input_chars=len(user_input)) as trace:
+            self.last_trace_id = trace.trace_id
+            print(f"[MANAGER] Trace ID: {trace.trace_id}")
+            result = self._process_request(user_input, max_attempts, session, sync, priority, request_id)
+            current_span().set(outcome=result.split("\n", 1)[0][:80])
+            return result
+
+    def _process_request(self, user_input, max_attempts=None, session=None, sync=True, priority=None,
+                         request_id=None):
+        if sync:
+            self.sync_knowledge()
+        try:
+            with span("intent") as stage:
+                intent = self.classify_intent(user_input)
+                stage.set(intent=intent, **{k: v for k, v in (self.last_intent_decision or {}).items()
+                                           if k in ("path", "confidence")})
+
+            if "QUESTION" in intent:
+                print(f"[MANAGER] Intent detected: RESEARCH")
+                # Interactive lookups jump ahead of queued generation work
+                with request_context(priority=priority or "interactive", session=session):
+                    return f"Archivist Report: {self.archivist.ask(user_input)}"
+            else:
+                print(f"[MANAGER] Intent detected: WORK ORDER")
+                with request_context(priority=priority or "generation", session=session):
+                    return self.run_generation_workflow(user_input, max_attempts=max_attempts,
+                                                        request_id=request_id)
+        except ModelCallError as e:
+            # A failed model call ends the request; nothing downstream sees its output
+            print(f"\n[MANAGER] Model call failed. Stopping workflow: {e}")
+            return f"Error: Model call failed - {e}"
+        except AgentError as e:
+            print(f"\n[MANAGER] Agent failed. Stopping workflow: {e}")
+            return f"Error: {e}"
+        except RunInProgressError as e:
+            print(f"\n[MANAGER] {e}")
+            return f"Error: {e}"
+        except AgentInitError as e:
+            print(f"\n[MANAGER] {e}")
+            return f"Error: {e}"
+        finally:
+            self.router.save()
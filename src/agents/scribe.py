@@ -1,8 +1,14 @@
 import os
-import time
-from langchain_ollama import ChatOllama
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+import config
+from tools.test_cases import parse_test_cases, validate_test_cases, cases_to_csv
+from tools.llm_calls import invoke_chain, llm_options, ModelCallError
+from tools.lazy_import import lazy_import
+from tools.output_sinks import get_sink, sink_for_path, rows_from_csv, new_run_id
+
+# LangChain loads on first use, not at import (tools/lazy_import.py)
+ChatOllama = lazy_import("langchain_ollama", "ChatOllama")
+PromptTemplate = lazy_import("langchain_core.prompts", "PromptTemplate")
+StrOutputParser = lazy_import("langchain_core.output_parsers", "StrOutputParser")
 
 class Scribe:
     def __init__(self):
@@ -13,17 +19,23 @@ class Scribe:
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
+        # csv, xlsx or parquet; with append_to set, every save adds its rows to that one file
+        self.output_format = config.OUTPUT_FORMAT
+        self.append_to = config.OUTPUT_APPEND_TO
+        # Run IDs whose rows in append_to the next save replaces (a rerun of the same story)
+        self.replace_runs = ()
+        self.last_run_id = None
+
         # Initialize LLM for formatting
-        self.llm = ChatOllama(model="ministral-3:14b-cloud")
+        self.model_name = "ministral-3:14b-cloud"
+        self.llm = ChatOllama(model=self.model_name, **llm_options("scribe"))
         
         # Define the Formatter Persona
         # It takes the 'Human Readable' text and turns it into 'Machine Readable' CSV
+        # Static instructions first, the text to format last (prompt-cache friendly)
         template = """
         You are 'The Scribe'. Your job is to format Test Cases into a clean CSV string.
         
-        Input Text:
-        {test_cases}
-        
         Instructions:
         1. Extract the Test Case ID, Title, Pre-conditions, Steps, and Expected Result.
         2. Format output strictly as CSV (Comma Separated Values).
@@ -31,6 +43,9 @@ class Scribe:
         4. Wrap fields in quotes if they contain commas.
         5. Do NOT include any intro text or markdown (like ```csv). Just the raw CSV data.
         6. Use plain text only. Do NOT use emoji, symbols, or any non-ASCII characters in your output.
+
+        Input Text:
+        {test_cases}
         """
         
         self.prompt = PromptTemplate(
@@ -40,29 +55,49 @@ class Scribe:
         
         self.chain = self.prompt | self.llm | StrOutputParser()
 
-    def save(self, content):
+    def format_csv(self, content):
         """
-        Converts content to CSV and saves it to a file.
+        Deterministic path: parse the Author's fixed layout and write it with the csv module.
+        The LLM is only used when the parse fails validation.
+        """
+        cases = parse_test_cases(content)
+        problems = validate_test_cases(cases)
+        if not problems:
+            print(f"Scribe is formatting {len(cases)} test cases for Excel...")
+            return cases_to_csv(cases)
+
+        print(f"Scribe could not parse the draft ({problems[0]}). Falling back to LLM formatting...")
+        csv_content = invoke_chain("scribe", self.model_name, self.chain, {"test_cases": content})
+
+        # Clean up potential markdown formatting from LLM
+        return csv_content.replace("```csv", "").replace("```", "").strip()
+
+    def save(self, content, run_id=None):
+        """
+        Converts content to test case rows and writes them with the configured sink:
+        a new test_cases_<run id>.<format> file, or appended to `append_to`.
+        Either way the file is replaced atomically.
         """
         if not content:
             return "Error: No content to save."
 
         try:
-            print("Scribe is formatting data for Excel...")
-            csv_content = self.chain.invoke({"test_cases": content})
-            
-            # Clean up potential markdown formatting from LLM
-            csv_content = csv_content.replace("```csv", "").replace("```", "").strip()
+            csv_content = self.format_csv(content)
+            header, rows = rows_from_csv(csv_content)
+            run_id = run_id or new_run_id()
 
-            # Generate Filename with Timestamp
-            filename = f"test_cases_{int(time.time())}.csv"
-            filepath = os.path.join(self.output_dir, filename)
+            if self.append_to:
+                filepath = self.append_to
+                sink_for_path(filepath).append(filepath, header, rows, run_id=run_id, replace=self.replace_runs)
+            else:
+                sink = get_sink(self.output_format)
+                filepath = os.path.join(self.output_dir, f"test_cases_{run_id}.{sink.extension}")
+                sink.write(filepath, header, rows)
 
-            # Write to file
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(csv_content)
-            
+            self.last_run_id = run_id
             return f"Success. File saved to: {filepath}"
-            
+
+        except ModelCallError:
+            raise
         except Exception as e:
-            return f"Error saving file: {e}"
\ No newline at end of file
+            return f"Error saving file: {e}"
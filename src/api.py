@@ -0,0 +1,241 @@
+"""
+Local HTTP job API around the Manager. Submitting returns at once; the story runs
+on a background worker.
+
+    POST /jobs                      {"story": "...", "max_attempts": 2, "request_id": "ADO-123"}
+                                    -> 202 {"id": ...}; resubmitting a request_id resumes it
+    GET  /jobs                      all known jobs
+    GET  /jobs/<id>                 status, result, artifact name, queue position
+    GET  /jobs/<id>/events?after=N  Server-Sent Events until the job finishes
+    GET  /jobs/<id>/artifact        the generated CSV
+    GET  /health                    queue stats
+    GET  /metrics                   Prometheus metrics (tools/metrics.py)
+
+Run with:  python src/api.py --port 8765 --workers 2
+"""
+import os
+import sys
+import json
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from dotenv import load_dotenv
+from agents.manager import Manager
+from tools.jobs import JobQueue
+from tools.output_sinks import media_type
+from tools import metrics
+import config
+
+load_dotenv()
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "TraceJobs/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_body(self, body, content_type, status=200, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, payload, status=200, headers=None):
+        self._send_body(json.dumps(payload).encode("utf-8"), "application/json", status, headers)
+
+    def _error(self, status, message):
+        self._send_json({"error": message}, status=status)
+
+    def _job_view(self, job):
+        view = job.to_dict()
+        view["position"] = self.server.jobs.position(job)
+        view["links"] = {
+            "self": f"/jobs/{job.id}",
+            "events": f"/jobs/{job.id}/events",
+            "artifact": f"/jobs/{job.id}/artifact",
+        }
+        return view
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        jobs = self.server.jobs
+
+        if parts == ["health"]:
+            return self._send_json({"status": "ok", **jobs.stats()})
+        if parts == ["metrics"]:
+            return self._send_body(metrics.REGISTRY.render().encode("utf-8"),
+                                   "text/plain; version=0.0.4; charset=utf-8")
+        if parts == ["jobs"]:
+            return self._send_json({"jobs": [self._job_view(job) for job in jobs.list()]})
+        if len(parts) < 2 or parts[0] != "jobs" or len(parts) > 3:
+            return self._error(404, f"unknown path {url.path}")
+
+        job = jobs.get(parts[1])
+        if job is None:
+            return self._error(404, f"unknown job {parts[1]}")
+        if len(parts) == 2:
+            return self._send_json(self._job_view(job))
+        if parts[2] == "events":
+            return self._stream_events(job, parse_qs(url.query))
+        if parts[2] == "artifact":
+            return self._send_artifact(job)
+        return self._error(404, f"unknown path {url.path}")
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip("/") != "/jobs":
+            return self._error(404, f"unknown path {self.path}")
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True   # without a length the body can't be skipped
+            return self._error(400, "invalid Content-Length")
+        if length > self.server.max_body:
+            self.close_connection = True   # the unread body must not be parsed as a request
+            return self._error(413, f"body larger than {self.server.max_body} bytes")
+        raw = self.rfile.read(length) if length else b""
+
+        # JSON {"story": ...} or the story itself as text/plain
+        options = {}
+        if (self.headers.get("Content-Type") or "").startswith("application/json"):
+            try:
+                options = json.loads(raw or b"{}")
+            except ValueError:
+                options = None
+            if not isinstance(options, dict):
+                return self._error(400, "invalid JSON body")
+            story = str(options.get("story") or "").strip()
+        else:
+            story = raw.decode("utf-8", errors="replace").strip()
+        if not story:
+            return self._error(400, "no story given")
+
+        max_attempts = options.get("max_attempts")
+        if max_attempts is not None and (not isinstance(max_attempts, int) or isinstance(max_attempts, bool)
+                                         or max_attempts < 1):
+            return self._error(400, "max_attempts must be a positive integer")
+
+        request_id = options.get("request_id")
+        job = self.server.jobs.submit(story, max_attempts=max_attempts, session=options.get("session"),
+                                      request_id=str(request_id) if request_id is not None else None)
+        self._send_json(self._job_view(job), status=202, headers={"Location": f"/jobs/{job.id}"})
+
+    def _stream_events(self, job, query):
+        """Server-Sent Events: one 'data:' line per job event, a comment as keep-alive."""
+        try:
+            after = int(query.get("after", ["-1"])[0])
+        except ValueError:
+            return self._error(400, "after must be an integer")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            while True:
+                events = job.wait_events(after, timeout=self.server.keepalive)
+                for event in events:
+                    self.wfile.write(f"id: {event['seq']}\nevent: {event['type']}\n"
+                                     f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                    after = event["seq"]
+                if not events:
+                    self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+                if job.finished and after >= len(job.events) - 1:
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def _send_artifact(self, job):
+        if not job.finished:
+            return self._error(409, f"job is {job.status}")
+        if not job.artifact or not os.path.isfile(job.artifact):
+            return self._error(404, "job produced no artifact")
+        with open(job.artifact, "rb") as f:
+            body = f.read()
+        name = os.path.basename(job.artifact)
+        self._send_body(body, media_type(job.artifact),
+                        headers={"Content-Disposition": f'attachment; filename="{name}"'})
+
+class JobServer:
+    """
+    HTTP server plus its JobQueue. Use as a context manager or call start()/stop().
+    port=0 picks a free port (see .url).
+    """
+
+    def __init__(self, host=None, port=None, workers=None, manager_factory=None, output_dir=None,
+                 max_body=None, keepalive=15.0, verbose=False):
+        self.jobs = JobQueue(manager_factory or Manager, workers=workers or config.API_WORKERS,
+                             output_dir=output_dir, history=config.API_JOB_HISTORY)
+        self._httpd = ThreadingHTTPServer((host or config.API_HOST, config.API_PORT if port is None else port),
+                                          _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.jobs = self.jobs
+        self._httpd.max_body = max_body or config.API_MAX_BODY
+        self._httpd.keepalive = keepalive
+        self._httpd.verbose = verbose
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serves from a background thread."""
+        self.jobs.start()
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="job-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serves from the calling thread until interrupted."""
+        self.jobs.start()
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+            self.jobs.stop(timeout=1)
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self.jobs.stop(timeout=1)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local HTTP job API for the TRACE engine.")
+    parser.add_argument("--host", default=config.API_HOST)
+    parser.add_argument("--port", type=int, default=config.API_PORT)
+    parser.add_argument("--workers", type=int, default=config.API_WORKERS)
+    parser.add_argument("--output", help="folder for job outputs (default: data/outputs/jobs)")
+    parser.add_argument("--verbose", action="store_true", help="log every HTTP request")
+    args = parser.parse_args()
+
+    server = JobServer(args.host, args.port, workers=args.workers, output_dir=args.output, verbose=args.verbose)
+    metrics.install()
+    print(f"TRACE job API listening on {server.url} ({args.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+
+if __name__ == "__main__":
+    sys.exit(main())
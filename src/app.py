@@ -1,14 +1,16 @@
 import streamlit as st
 import sys
 import os
-import re
-import contextlib
-from io import StringIO
+import time
+import uuid
 
 # Add the current directory to path so we can import our agents
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from agents.manager import Manager
+from tools.jobs import JobQueue
+from tools.output_sinks import media_type
+import config
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -33,11 +35,38 @@ with col2:
     st.title("Trace AI: QA Automation Engine")
     st.caption("Auto-generate robust Test Cases from User Stories using Multi-Agent AI.")
 
+# --- AGENT INITIALIZATION (Cached) ---
+def build_manager():
+    manager = Manager()
+    manager.prewarm()
+    return manager
+
+@st.cache_resource
+def get_jobs():
+    """
+    One job queue per server, shared by every browser session. Each worker owns a
+    Manager; each job keeps its own console output (job.log), so sessions never mix logs.
+    """
+    return JobQueue(build_manager, workers=config.APP_WORKERS, capture_logs=True).start()
+
+STAGE_LABELS = {
+    "intent": "Intent detected",
+    "parse": "Story parsed",
+    "duplicate_check": "Duplicate check",
+    "context": "Context gathered",
+    "drafting": "Drafts written",
+    "pre_audit": "Pre-audit",
+    "auditor": "Auditor review",
+    "scribe": "File published",
+}
+
 # --- SIDEBAR (CONTROLS) ---
 with st.sidebar:
     st.header("⚙️ Controls")
     
     if st.button("🔄 Reset Agents", help="Clear memory and reload agents"):
+        # Running jobs finish on the old workers; new submissions get fresh agents
+        get_jobs().stop(timeout=0)
         st.cache_resource.clear()
         st.toast("Agents have been reset!", icon="✅")
     
@@ -51,11 +80,6 @@ with st.sidebar:
     - 📝 **Scribe:** File Publisher
     """)
 
-# --- AGENT INITIALIZATION (Cached) ---
-@st.cache_resource
-def get_manager():
-    return Manager()
-
 # --- MAIN UI ---
 st.subheader("1. Input Requirements")
 user_input = st.text_area(
@@ -64,53 +88,69 @@ user_input = st.text_area(
     placeholder="Feature: Search...\n\nAcceptance Criteria:\n1. ...\n\nScenarios:\n- Search by ID..."
 )
 
+job = st.session_state.get("job")
+busy = job is not None and not job.finished
+
 col_run, col_status = st.columns([1, 4])
 with col_run:
-    run_btn = st.button("🚀 Generate Tests", type="primary", use_container_width=True)
+    run_btn = st.button("🚀 Generate Tests", type="primary", use_container_width=True, disabled=busy)
 
 # --- EXECUTION LOGIC ---
+# The story runs on a background worker; this script only submits it and then
+# re-renders every config.APP_POLL_SECONDS, so the page never blocks and other sessions keep working.
 if run_btn:
     if not user_input.strip():
         st.error("Please provide input first.")
     else:
-        # Create a container for the logs
-        st.subheader("2. Agent Workflow Logs")
-        log_box = st.empty()
-        
-        # Capture the terminal output
-        output_buffer = StringIO()
-        manager = get_manager()
-        
-        try:
-            with st.spinner("Agents are collaborating..."):
-                with contextlib.redirect_stdout(output_buffer):
-                    # --- CALL THE MANAGER ---
-                    result = manager.process_request(user_input)
-                
-                # Display logs in a code block
-                log_box.code(output_buffer.getvalue(), language="text")
-
-            # --- DISPLAY RESULTS ---
-            st.subheader("3. Final Output")
-            
-            if "CRITICAL FAILURE" in result:
-                st.error(result)
-            else:
-                st.success("Test Cases Generated Successfully!")
-                st.text(result)
-                
-                # Check for CSV file creation to show download button
-                match = re.search(r"saved: (.*\.csv)", result)
-                if match:
-                    csv_path = match.group(1)
-                    if os.path.exists(csv_path):
-                        with open(csv_path, "rb") as file:
-                            st.download_button(
-                                label="📥 Download CSV File",
-                                data=file,
-                                file_name=os.path.basename(csv_path),
-                                mime="text/csv"
-                            )
-
-        except Exception as e:
-            st.error(f"System Error: {e}")
\ No newline at end of file
+        # The session name gives each browser session a fair share of the model queue
+        session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+        job = get_jobs().submit(user_input, session=f"app:{session_id}")
+        st.session_state["job"] = job
+        busy = True
+
+if job is not None:
+    with col_status:
+        position = get_jobs().position(job)
+        if position:
+            st.info(f"Queued (position {position})...")
+        elif busy:
+            st.info("Agents are collaborating...")
+
+    # Stages finished so far, from the job's trace events
+    stages = [e for e in job.wait_events(timeout=0) if e["type"] == "span" and e["name"] in STAGE_LABELS]
+    if stages:
+        st.progress(min(1.0, len({e["name"] for e in stages}) / len(STAGE_LABELS)),
+                    text=STAGE_LABELS[stages[-1]["name"]])
+
+    st.subheader("2. Agent Workflow Logs")
+    st.code(job.log.text() or "Waiting for a worker...", language="text")
+
+    if not job.finished:
+        time.sleep(config.APP_POLL_SECONDS)
+        st.rerun()
+
+    # --- DISPLAY RESULTS ---
+    st.subheader("3. Final Output")
+
+    if job.status == "failed":
+        st.error(job.result)
+    elif job.status == "answered":
+        # QUESTION intent: the Archivist's answer is the output
+        st.info("Answered from the knowledge base.")
+        st.markdown(job.result)
+    elif job.status == "duplicate":
+        st.info("These scenarios are already covered by existing test cases.")
+        st.text(job.result)
+    else:
+        st.success("Test Cases Generated Successfully!")
+        st.text(job.result)
+
+        # Show a download button for the file the Scribe wrote (CSV, XLSX or Parquet)
+        if job.artifact and os.path.exists(job.artifact):
+            with open(job.artifact, "rb") as file:
+                st.download_button(
+                    label=f"📥 Download {os.path.splitext(job.artifact)[1].lstrip('.').upper()} File",
+                    data=file,
+                    file_name=os.path.basename(job.artifact),
+                    mime=media_type(job.artifact)
+                )
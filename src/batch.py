@@ -0,0 +1,258 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+from agents.manager import Manager
+from ingest_data import ingest_knowledge_base
+from tools.jobs import classify_result, saved_file
+from tools.log_capture import capture, DISCARD
+from tools.manager_pool import ManagerPool
+from tools.output_sinks import get_sink
+import config
+
+load_dotenv()
+
+STORY_EXTENSIONS = (".txt", ".md")
+RESULT_FILE = "result.json"
+SUMMARY_FILE = "summary.json"
+CONSOLIDATED_NAME = "test_cases"
+
+# Statuses that count as done: a rerun skips them unless --force
+DONE_STATUSES = ("completed", "duplicate", "answered")
+
+def safe_id(story_id):
+    """A story ID usable as a folder name."""
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", str(story_id)).strip("._") or "story"
+
+def story_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+def load_stories(source):
+    """
+    Returns [(story_id, text)] from either:
+    - a folder: every .txt / .md file (recursively), ID = relative path without extension
+    - a JSONL file: one {"id": ..., "story": ...} object per line ("text" also accepted)
+    Empty stories are dropped. Duplicate IDs raise ValueError.
+    """
+    stories = []
+    if os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for name in files:
+                if name.lower().endswith(STORY_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    with open(path, "r", encoding="utf-8") as f:
+                        text = f.read().strip()
+                    stories.append((os.path.splitext(os.path.relpath(path, source))[0], text))
+        stories.sort()
+    elif os.path.isfile(source):
+        with open(source, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{source}:{number} is not valid JSON: {e}")
+                text = str(item.get("story") or item.get("text") or "").strip()
+                stories.append((str(item.get("id") or f"line-{number}"), text))
+    else:
+        raise FileNotFoundError(f"No such folder or JSONL file: {source}")
+
+    seen = set()
+    for story_id, _ in stories:
+        key = safe_id(story_id)
+        if key in seen:
+            raise ValueError(f"Duplicate story ID: {story_id}")
+        seen.add(key)
+    return [(story_id, text) for story_id, text in stories if text]
+
+def read_result(story_dir):
+    try:
+        with open(os.path.join(story_dir, RESULT_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_json(path, data):
+    """Writes via a temp file so an interrupted batch never leaves half a record."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+def is_done(story_dir, text):
+    """True when this exact story text already finished in an earlier run."""
+    previous = read_result(story_dir)
+    return bool(previous) and previous.get("status") in DONE_STATUSES and previous.get("hash") == story_hash(text)
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--"
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m {seconds:02d}s"
+
+class Progress:
+    """Thread-safe done/failed counters with throughput and ETA."""
+
+    def __init__(self, total, stream=None):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def update(self, story_id, status, seconds):
+        with self._lock:
+            self.done += 1
+            self.failed += status == "failed"
+            elapsed = time.perf_counter() - self.started
+            rate = self.done / elapsed if elapsed else 0.0
+            eta = (self.total - self.done) / rate if rate else None
+            print(f"[BATCH] {self.done}/{self.total} {story_id}: {status} in {seconds:.1f}s | "
+                  f"{rate * 60:.1f} stories/min | ETA {format_eta(eta)}", file=self.stream, flush=True)
+
+def run_batch(stories, output_dir, workers=None, max_attempts=None, force=False,
+              manager_factory=None, verbose=False, output_format=None, consolidate=False):
+    """
+    Processes (story_id, text) pairs over `workers` threads sharing a pool of `workers` Managers.
+    Each story gets <output_dir>/<id>/ with a result.json and the Scribe's test cases
+    (`output_format`, default config.OUTPUT_FORMAT). With `consolidate`, every story's rows
+    are appended to one <output_dir>/test_cases.<format> instead.
+    Stories already done with the same text are skipped. The knowledge base is
+    synced once up front. Writes and returns the summary dict.
+    """
+    workers = max(1, workers or config.BATCH_WORKERS)
+    manager_factory = manager_factory or Manager
+    output_format = get_sink(output_format or config.OUTPUT_FORMAT).extension
+    consolidated = os.path.join(output_dir, f"{CONSOLIDATED_NAME}.{output_format}") if consolidate else None
+    os.makedirs(output_dir, exist_ok=True)
+    stream = sys.stdout
+
+    skipped, todo = [], []
+    for story_id, text in stories:
+        story_dir = os.path.join(output_dir, safe_id(story_id))
+        if not force and is_done(story_dir, text):
+            skipped.append(story_id)
+        else:
+            todo.append((story_id, text, story_dir))
+    print(f"[BATCH] {len(stories)} stories: {len(todo)} to run, {len(skipped)} already done. "
+          f"Workers: {workers}", file=stream)
+
+    records = {}
+    progress = Progress(len(todo), stream)
+    started = time.perf_counter()
+    if todo:
+        print(f"[BATCH] Sync: {ingest_knowledge_base()}", file=stream)
+
+        managers = ManagerPool(manager_factory, workers)
+
+        def process(story_id, text, story_dir):
+            # Agent logs from parallel workers interleave; keep them only when asked.
+            # Only this worker's context is silenced, never the process's stdout.
+            with contextlib.nullcontext() if verbose else capture(DISCARD):
+                return run_story(story_id, text, story_dir)
+
+        def run_story(story_id, text, story_dir):
+            os.makedirs(story_dir, exist_ok=True)
+            # A rerun (--force or an edited story) replaces its earlier rows in the consolidated file
+            previous_run = (read_result(story_dir) or {}).get("run_id") if consolidated else None
+            t0 = time.perf_counter()
+            trace_id = run_id = None
+            try:
+                with managers.acquire() as manager:
+                    manager.scribe.output_dir = story_dir
+                    manager.scribe.output_format = output_format
+                    manager.scribe.append_to = consolidated
+                    manager.scribe.replace_runs = [previous_run] if previous_run else []
+                    manager.scribe.last_run_id = None
+                    # request_id lets a rerun resume a story that failed mid-pipeline
+                    result = manager.process_request(text, max_attempts=max_attempts, session=f"batch:{story_id}",
+                                                     sync=False, priority="batch", request_id=f"batch:{story_id}")
+                    trace_id = getattr(manager, "last_trace_id", None)
+                    run_id = manager.scribe.last_run_id
+            except Exception as e:
+                result = f"Error: {type(e).__name__}: {e}"
+            record = {
+                "id": story_id,
+                "hash": story_hash(text),
+                "status": classify_result(result),
+                "seconds": round(time.perf_counter() - t0, 3),
+                "file": saved_file(result),
+                "trace_id": trace_id,
+                # Run ID of this story's rows in the consolidated file (kept if this run saved none)
+                "run_id": run_id or previous_run,
+                "result": result,
+            }
+            write_json(os.path.join(story_dir, RESULT_FILE), record)
+            return record
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+            futures = [pool.submit(process, *item) for item in todo]
+            for future in as_completed(futures):
+                record = future.result()
+                records[record["id"]] = record
+                progress.update(record["id"], record["status"], record["seconds"])
+
+    wall = time.perf_counter() - started
+    counts = {}
+    for record in records.values():
+        counts[record["status"]] = counts.get(record["status"], 0) + 1
+    summary = {
+        "total": len(stories),
+        "run": len(todo),
+        "skipped": len(skipped),
+        "statuses": counts,
+        "workers": workers,
+        "consolidated": consolidated,
+        "wall_s": round(wall, 3),
+        "stories_per_min": round(len(todo) / wall * 60, 2) if todo and wall else 0.0,
+        "stories": [
+            {k: v for k, v in records[story_id].items() if k != "result"} if story_id in records
+            else {"id": story_id, "status": "skipped"}
+            for story_id, _ in stories
+        ],
+    }
+    write_json(os.path.join(output_dir, SUMMARY_FILE), summary)
+    print(f"[BATCH] Done: {counts or 'nothing to run'} in {wall:.1f}s. "
+          f"Summary: {os.path.join(output_dir, SUMMARY_FILE)}", file=stream)
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate test cases for many stories at once.")
+    parser.add_argument("source", help="folder of .txt/.md stories or a JSONL file ({'id':..., 'story':...})")
+    parser.add_argument("--output", help="output folder (default: data/outputs/batch/<source name>)")
+    parser.add_argument("--workers", type=int, default=config.BATCH_WORKERS)
+    parser.add_argument("--max-attempts", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="rerun stories that already completed")
+    parser.add_argument("--format", choices=["csv", "xlsx", "parquet"], default=config.OUTPUT_FORMAT,
+                        help="test case file format")
+    parser.add_argument("--consolidate", action="store_true",
+                        help="append every story's test cases to one <output>/test_cases.<format>")
+    parser.add_argument("--verbose", action="store_true", help="show the agents' logs")
+    args = parser.parse_args(argv)
+
+    try:
+        stories = load_stories(args.source)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    output_dir = args.output or os.path.join(
+        os.getcwd(), "data", "outputs", "batch", safe_id(os.path.splitext(os.path.basename(os.path.normpath(args.source)))[0]))
+    summary = run_batch(stories, output_dir, workers=args.workers, max_attempts=args.max_attempts,
+                        force=args.force, verbose=args.verbose, output_format=args.format,
+                        consolidate=args.consolidate)
+    return 0 if not summary["statuses"].get("failed") else 2
+
+if __name__ == "__main__":
+    sys.exit(main())
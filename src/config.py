@@ -1,7 +1,6 @@
 import os
 import sys
 from dotenv import load_dotenv
-from langchain_ollama import ChatOllama
 load_dotenv()
 
 #  MASTER SWITCH: "ollama" or "openai"
@@ -36,6 +35,161 @@ TEMPERATURES = {
     "auditor": 0.0,    # STRICT: Logic checking must be robotic
     "scribe": 0.0      # STRICT: JSON formatting must not fail
 }
+
+# STORY PARSING (Zero-LLM fast path)
+# Stories laid out as Feature / Background / Acceptance Criteria / Scenarios are split
+# by tools/story_parser.py. Below this confidence the Manager falls back to the LLM.
+STORY_PARSER_MIN_CONFIDENCE = 0.8
+
+# Extra heading aliases per section, e.g. {"scenarios": ["test ideas"], "acceptance": ["done when"]}
+STORY_HEADING_ALIASES = {}
+
+# INTENT CLASSIFICATION (Local fast path)
+# tools/intent_classifier.py decides obvious QUESTION/REQUIREMENT inputs locally.
+# Below this confidence the Manager escalates to the LLM front-end call.
+INTENT_CONFIDENCE_THRESHOLD = 0.85
+
+# Every decision (path, confidence, reasons) is appended here for tuning. None disables.
+INTENT_DECISION_LOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   "data", "logs", "intent_decisions.jsonl")
+
+# Log rows keep a hash and a short snippet of the request. True logs the full text
+# (needed to retrain on the log) - only turn it on where stories may be stored.
+INTENT_LOG_RAW_TEXT = False
+
+# AUTHOR FAN-OUT
+# Each scenario is drafted by its own Author call; this caps how many run at once.
+AUTHOR_PARALLELISM = 4
+
+# AUTHOR / AUDITOR LOOP
+# Default attempt limit (can be overridden per request via process_request(max_attempts=...)).
+MAX_ATTEMPTS = 2
+
+# Stop early when a rejected case stops converging (see tools/progress.py):
+# a draft this similar to an earlier one, or feedback this similar to the last one.
+DRAFT_SIMILARITY_THRESHOLD = 0.95
+FEEDBACK_SIMILARITY_THRESHOLD = 0.9
+
+# PROMPT BUDGETS (tokens, estimated by tools/prompt_budget.py)
+# Rendered prompts above budget are compressed: dedupe -> diff-only previous draft
+# -> drop low-relevance context -> truncate context. None disables the check for a role.
+PROMPT_BUDGETS = {
+    "author": 6000,
+    "auditor": 8000,
+}
+
+# LLM CONCURRENCY GOVERNOR (tools/llm_governor.py)
+# Max concurrent calls per model on one endpoint; anything else gets the default.
+LLM_DEFAULT_CONCURRENCY = 4
+LLM_CONCURRENCY = {
+    "gemma3:27b-cloud": 2,
+}
+# Directory for lock files that extend the limits across processes (POSIX). None = this process only.
+LLM_LOCK_DIR = os.getenv("TRACE_LLM_LOCK_DIR") or None
+
+# RESILIENT MODEL CALLS (tools/llm_calls.py)
+# Seconds one attempt may run once it has a governor slot. None = wait forever.
+LLM_TIMEOUTS = {
+    "manager": 60,
+    "archivist": 90,
+    "author": 240,
+    "auditor": 240,
+    "scribe": 120,
+}
+
+# Transient failures (connection errors, timeouts, 429/5xx) are retried with full-jitter backoff
+LLM_MAX_RETRIES = 2
+LLM_BACKOFF_BASE = 1.0   # seconds before the first retry (upper bound)
+LLM_BACKOFF_MAX = 10.0
+
+# Hedging: when a call runs longer than the role's recent p95 latency, send one duplicate
+# and take whichever answers first. Costs model time, so only for short, cheap calls.
+LLM_HEDGE_ROLES = ("manager", "archivist")
+LLM_HEDGE_PERCENTILE = 95
+LLM_HEDGE_MIN_SAMPLES = 20
+
+# KEEP-ALIVE & WARM-UP
+# How long the server keeps each role's model loaded after a call (Ollama duration string,
+# or -1 for forever). Stable values also avoid reloads between calls.
+LLM_KEEP_ALIVE = {
+    "manager": "30m",
+    "archivist": "30m",
+    "author": "30m",
+    "auditor": "30m",
+    "scribe": "10m",
+}
+# Manager.prewarm() loads every model and primes the prompt cache with each role's static
+# prompt prefix at startup. Set TRACE_LLM_WARMUP=0 to disable.
+LLM_WARMUP = os.getenv("TRACE_LLM_WARMUP", "1") != "0"
+LLM_WARMUP_TIMEOUT = 120
+
+# TIERED MODEL ROUTING (tools/model_router.py)
+# Per role, cheapest first. A test case moves up one tier after an Auditor rejection
+# or a pre-audit failure; the front-end analysis moves up after a schema failure.
+# Roles not listed use the agent's own model.
+MODEL_TIERS = {
+    "manager": ["ministral-3:14b-cloud"],
+    "author": ["ministral-3:8b-cloud", "ministral-3:14b-cloud"],
+}
+# Per-tier calls, success rate and latency, accumulated across runs. None disables.
+ROUTING_STATS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "data", "logs", "model_routing.json")
+
+# TRACING (tools/tracing.py)
+# One JSON line per process_request with its spans (stage, model, tokens, latency).
+# Summarize with: python src/tools/tracing.py. None disables the export.
+TRACE_LOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         "data", "logs", "traces.jsonl")
+
+# METRICS (tools/metrics.py)
+# Prometheus text format on http://METRICS_HOST:METRICS_PORT/metrics. Set TRACE_METRICS_PORT
+# (e.g. 9464) to enable; counters are collected either way.
+METRICS_HOST = os.getenv("TRACE_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("TRACE_METRICS_PORT", "0")) or None
+
+# BATCH (src/batch.py)
+# Stories processed at once; each worker holds its own Manager. Model calls still
+# queue in the governor at "batch" priority, behind interactive and generation work.
+BATCH_WORKERS = 2
+
+# JOB API (src/api.py)
+# Local HTTP server: submit a story, poll or stream its progress, download the CSV.
+API_HOST = os.getenv("TRACE_API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("TRACE_API_PORT", "8765"))
+API_WORKERS = 2               # jobs run at once, one Manager each
+API_JOB_HISTORY = 500         # finished jobs kept in memory
+API_MAX_BODY = 1024 * 1024    # bytes per submitted story
+
+# CHECKPOINTS (tools/checkpoints.py)
+# Each stage of run_generation_workflow is saved per (request ID, input hash); running the
+# same request again after a crash or failed model call resumes there. Only requests that
+# carry a request_id (batch.py, the API's "request_id") are checkpointed, and a request_id
+# already running with the same input is refused until it ends. None disables.
+CHECKPOINT_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "data", "state", "checkpoints.sqlite")
+CHECKPOINT_MAX_AGE_DAYS = 7   # unfinished runs older than this are dropped
+
+# STAGE MEMO (tools/stage_memo.py)
+# Stage outputs shared across requests, keyed by their inputs: parsed stories, per-scenario
+# duplicate verdicts, context bundles and approved test cases. A re-submitted story with one
+# scenario added only drafts and audits that scenario. None disables.
+STAGE_MEMO_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "data", "state", "stage_memo.sqlite")
+STAGE_MEMO_MAX_AGE_DAYS = 30  # entries unused for this long are dropped
+
+# STREAMLIT APP (app.py)
+# Stories run on a shared background job queue; each browser session polls its own job
+# and sees only that job's logs.
+APP_WORKERS = 2               # stories generated at once across all sessions
+APP_POLL_SECONDS = 1.0        # page refresh interval while a job is running
+
+# OUTPUT (tools/output_sinks.py)
+# The Scribe writes data/outputs/test_cases_<run id>.<format>; formats: csv, xlsx (needs
+# openpyxl), parquet (needs pyarrow). Set TRACE_OUTPUT_APPEND_TO to a .csv/.xlsx/.parquet
+# path to append every run's rows (tagged with its run ID) to that one file instead.
+OUTPUT_FORMAT = os.getenv("TRACE_OUTPUT_FORMAT", "csv")
+OUTPUT_APPEND_TO = os.getenv("TRACE_OUTPUT_APPEND_TO") or None
+
 # If using OpenAI, set key here or in Environment Variables
 ##OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "sk-proj-...")
 
@@ -80,5 +234,7 @@ def get_llm(role):
 
     else:
         # Default to Ollama
+        from langchain_ollama import ChatOllama  # imported here so `import config` stays light
+
         print(f"   [SYSTEM] Connecting {role.upper()} -> {model_name} (Temp: {temp})")
         return ChatOllama(model=model_name, temperature=temp)
\ No newline at end of file
@@ -1,7 +1,15 @@
 import os
 import json
+import hashlib
+import threading
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
+try:
+    import fcntl  # POSIX only; elsewhere syncs are serialized within the process
+except ImportError:
+    fcntl = None
+
 # 1. REUSE YOUR EXISTING TOOLS
 # We import the folder list from file_ops so we scan the exact same places
 from tools.file_ops import load_documents_dynamically, TARGET_FOLDERS
@@ -12,6 +20,9 @@ load_dotenv()
 # Location of the "Logbook" file
 STATE_FILE = os.path.join(os.getcwd(), "data", ".ingest_state.json")
 
+# One sync at a time: parallel syncs would both see stale state and ingest the same chunks
+_sync_lock = threading.Lock()
+
 def get_current_file_state():
     """
     Scans the TARGET_FOLDERS from file_ops.py to create a timestamp fingerprint.
@@ -29,12 +40,40 @@ def get_current_file_state():
                         current_state[filepath] = os.path.getmtime(filepath)
     return current_state
 
+def knowledge_fingerprint():
+    """
+    Short hash of the current file state. Anything derived from the knowledge base
+    (retrieved context, duplicate verdicts) is only reusable while it stays the same.
+    """
+    state = json.dumps(get_current_file_state(), sort_keys=True)
+    return hashlib.sha256(state.encode("utf-8")).hexdigest()[:16]
+
+@contextmanager
+def _sync_guard():
+    """Serializes syncs across threads and, on POSIX, processes (lock file next to STATE_FILE)."""
+    with _sync_lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+        handle = os.open(f"{STATE_FILE}.lock", os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(handle)  # releases the flock
+
 def ingest_knowledge_base():
     """
     The Smart Manager Logic:
     1. Check timestamps (Fast).
     2. If changed, call file_ops and knowledge_base (Slow).
+    A sync started while another is running waits for it, then usually finds nothing to do.
     """
+    with _sync_guard():
+        return _ingest_knowledge_base()
+
+def _ingest_knowledge_base():
     print("--- [SMART SYNC] Checking for file updates... ---")
     
     # A. Get Fingerprints
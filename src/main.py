@@ -42,9 +42,11 @@ def main():
     print("Trace STLC Engine Starting...")
 
     # 1. Initialize the Boss (Manager)
+    # Agents and the vector store load on first use; prewarm() builds them in the background
     try:
         manager = Manager()
-        print("System Ready. (Manager is listening)")
+        manager.prewarm()
+        print(f"System Ready in {manager.startup_ms} ms. (Manager is listening)")
     except Exception as e:
         print(f"Critical System Error: {e}")
         sys.exit(1)
@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl  # POSIX only; elsewhere a run is only guarded within the process
+except ImportError:
+    fcntl = None
+
+# Runs open in this process, as (lock_dir, run_key)
+_open_runs = set()
+_open_runs_lock = threading.Lock()
+
+# Run lifecycle: only "running" runs are resumed; finished ones start over
+RUNNING, FINISHED = "running", "finished"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_key     TEXT PRIMARY KEY,
+    request_id  TEXT,
+    input_hash  TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    outcome     TEXT,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    run_key     TEXT NOT NULL,
+    stage       TEXT NOT NULL,
+    data        TEXT NOT NULL,
+    saved_at    REAL NOT NULL,
+    PRIMARY KEY (run_key, stage)
+);
+"""
+
+def input_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def run_key(request_id, text):
+    """
+    Same request ID + same input -> same run. The ID is required: keyed on the input
+    alone, identical stories from different callers would share (and resume) one run.
+    """
+    if not request_id:
+        raise ValueError("A checkpointed run needs a request_id.")
+    return hashlib.sha256(f"{request_id}\n{input_hash(text)}".encode("utf-8")).hexdigest()[:32]
+
+class RunInProgressError(RuntimeError):
+    """The same request (request ID + input) is already running; its checkpoints are not shared."""
+
+class CheckpointStore:
+    """
+    SQLite-backed stage outputs per run, so a crashed or failed request resumes
+    from its last completed stage. One short connection per operation keeps it
+    safe across threads and processes (WAL mode). A run is open in one place at a
+    time: it holds a lock file in <path>.runs/ until closed, which a crash releases.
+    """
+
+    def __init__(self, path, max_age_days=7):
+        self.path = path
+        self.lock_dir = f"{path}.runs"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+        if max_age_days:
+            self.prune(max_age_days * 86400)
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:  # commits, or rolls back on error
+                yield db
+        finally:
+            db.close()
+
+    def _claim(self, key):
+        """Marks the run as open. Returns a release() callable, or None if it is already open."""
+        claim = (self.lock_dir, key)
+        with _open_runs_lock:
+            if claim in _open_runs:
+                return None
+            _open_runs.add(claim)
+        handle = None
+        if fcntl is not None:
+            try:
+                os.makedirs(self.lock_dir, exist_ok=True)
+                handle = open(os.path.join(self.lock_dir, f"{key}.lock"), "a")
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                if handle:
+                    handle.close()
+                with _open_runs_lock:
+                    _open_runs.discard(claim)
+                return None
+
+        def release():
+            if handle:
+                handle.close()
+            with _open_runs_lock:
+                _open_runs.discard(claim)
+        return release
+
+    def open_run(self, request_id, text):
+        """
+        Returns the Run for this request; its saved stages are kept only while it is unfinished.
+        Raises RunInProgressError while another thread or process has the same run open.
+        """
+        key = run_key(request_id, text)
+        release = self._claim(key)
+        if release is None:
+            raise RunInProgressError(f"Request '{request_id}' is already running with this input.")
+        try:
+            self._start(key, request_id, text)
+            return Run(self, key, release)
+        except BaseException:
+            release()
+            raise
+
+    def _start(self, key, request_id, text):
+        now = time.time()
+        with self._lock, self._connect() as db:
+            row = db.execute("SELECT status FROM runs WHERE run_key = ?", (key,)).fetchone()
+            if row and row[0] != RUNNING:
+                db.execute("DELETE FROM checkpoints WHERE run_key = ?", (key,))
+            db.execute(
+                "INSERT INTO runs (run_key, request_id, input_hash, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(run_key) DO UPDATE SET status = excluded.status, outcome = NULL, "
+                "updated_at = excluded.updated_at",
+                (key, request_id, input_hash(text), RUNNING, now, now))
+
+    def load(self, key):
+        with self._lock, self._connect() as db:
+            rows = db.execute("SELECT stage, data FROM checkpoints WHERE run_key = ?", (key,)).fetchall()
+        return {stage: json.loads(data) for stage, data in rows}
+
+    def save(self, key, stage, data):
+        now = time.time()
+        with self._lock, self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO checkpoints (run_key, stage, data, saved_at) VALUES (?, ?, ?, ?)",
+                       (key, stage, json.dumps(data), now))
+            db.execute("UPDATE runs SET updated_at = ? WHERE run_key = ?", (now, key))
+
+    def finish(self, key, outcome):
+        with self._lock, self._connect() as db:
+            db.execute("DELETE FROM checkpoints WHERE run_key = ?", (key,))
+            db.execute("UPDATE runs SET status = ?, outcome = ?, updated_at = ? WHERE run_key = ?",
+                       (FINISHED, outcome, time.time(), key))
+
+    def prune(self, max_age_s):
+        """Forgets runs (and their stages) not touched for `max_age_s` seconds."""
+        cutoff = time.time() - max_age_s
+        with self._lock, self._connect() as db:
+            stale = [r[0] for r in db.execute("SELECT run_key FROM runs WHERE updated_at < ?", (cutoff,))]
+            db.executemany("DELETE FROM checkpoints WHERE run_key = ?", [(k,) for k in stale])
+            db.executemany("DELETE FROM runs WHERE run_key = ?", [(k,) for k in stale])
+        for key in stale:
+            try:
+                os.remove(os.path.join(self.lock_dir, f"{key}.lock"))
+            except OSError:
+                pass
+        return len(stale)
+
+    def runs(self):
+        with self._lock, self._connect() as db:
+            rows = db.execute("SELECT run_key, request_id, status, outcome, updated_at FROM runs "
+                              "ORDER BY updated_at DESC").fetchall()
+        return [dict(zip(("run_key", "request_id", "status", "outcome", "updated_at"), r)) for r in rows]
+
+class Run:
+    """
+    Checkpoints of one request. With store=None every call is a no-op (checkpointing off).
+    close() (or leaving a `with` block) lets the same request run again; finish() also closes.
+    """
+
+    def __init__(self, store=None, key=None, release=None):
+        self.store = store
+        self.key = key
+        self._release = release
+        self.stages = store.load(key) if store else {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        release, self._release = self._release, None
+        if release:
+            release()
+
+    @property
+    def resumed(self):
+        return bool(self.stages)
+
+    def get(self, stage):
+        return self.stages.get(stage)
+
+    def save(self, stage, data):
+        self.stages[stage] = data
+        if self.store:
+            self.store.save(self.key, stage, data)
+
+    def finish(self, outcome):
+        self.stages = {}
+        if self.store:
+            self.store.finish(self.key, outcome)
+        self.close()
@@ -1,5 +1,9 @@
 import os
-from langchain_community.document_loaders import PyPDFLoader, CSVLoader, TextLoader, Docx2txtLoader
+from tools.lazy_import import lazy_import
+
+# Document loaders (pypdf, docx2txt) load on first use, not at import (tools/lazy_import.py)
+PyPDFLoader, CSVLoader, TextLoader, Docx2txtLoader = lazy_import(
+    "langchain_community.document_loaders", "PyPDFLoader", "CSVLoader", "TextLoader", "Docx2txtLoader")
 
 # 1. Calculate the Root Directory so we always know where 'data/' is
 # (We go up 3 levels: file_ops.py -> tools -> src -> ROOT)
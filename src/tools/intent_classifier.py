@@ -0,0 +1,204 @@
+import os
+import re
+import sys
+import json
+import math
+import time
+import zlib
+import hashlib
+import random
+
+# Ensure we can import from src/ when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.story_parser import parse_story
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODEL_PATH = os.path.join(BASE_DIR, "data", "models", "intent_model.json")
+SEED_PATH = os.path.join(BASE_DIR, "data", "models", "intent_seed.jsonl")
+
+QUESTION_STARTS = (
+    "what", "how", "which", "why", "when", "where", "who", "is", "are", "does", "do",
+    "can", "could", "should", "explain", "tell me", "list", "describe", "show me",
+)
+REQUIREMENT_KEYWORDS = (
+    "verify", "scenario", "test case", "given", "then", "as a", "i want", "so that",
+    "acceptance criteria", "feature", "must", "user story", "generate", "write test",
+)
+
+# Hashed n-gram model settings (must match the shipped artifact)
+DEFAULT_DIM = 2 ** 12
+WORD = re.compile(r"[a-z0-9']+")
+
+# Characters of the request kept in a decision log row unless raw logging is on
+LOG_SNIPPET_CHARS = 40
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, x))))
+
+def heuristic_logit(text):
+    """
+    Keyword/structure score in log-odds: > 0 leans REQUIREMENT, < 0 leans QUESTION.
+    Returns (logit, reasons).
+    """
+    lowered = text.strip().lower()
+    reasons = []
+    logit = 0.0
+
+    if parse_story(text)["confidence"] >= 0.8:
+        return 8.0, ["structured-story"]
+
+    list_items = len(re.findall(r"^\s*(?:\d+[.)]|[-*])\s+\S", text, re.MULTILINE))
+    if list_items >= 2:
+        logit += 2.5
+        reasons.append(f"list-items:{list_items}")
+    if lowered.endswith("?"):
+        logit -= 2.5
+        reasons.append("ends-with-?")
+    if lowered.startswith(QUESTION_STARTS):
+        logit -= 1.5
+        reasons.append("question-opening")
+
+    hits = [k for k in REQUIREMENT_KEYWORDS if re.search(rf"\b{re.escape(k)}\b", lowered)]
+    if hits:
+        logit += 1.2 * min(3, len(hits))
+        reasons.append("keywords:" + ",".join(hits[:3]))
+
+    if len(lowered.split()) > 60:
+        logit += 1.0
+        reasons.append("long-input")
+
+    return logit, reasons
+
+def hashed_features(text, dim=DEFAULT_DIM, ngrams=2):
+    """Word uni/bi-grams hashed into `dim` buckets (crc32, stable across processes)."""
+    words = WORD.findall(text.lower())
+    feats = {}
+    for n in range(1, ngrams + 1):
+        for i in range(len(words) - n + 1):
+            idx = zlib.crc32(" ".join(words[i:i + n]).encode("utf-8")) % dim
+            feats[idx] = feats.get(idx, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in feats.values())) or 1.0
+    return {k: v / norm for k, v in feats.items()}
+
+def model_logit(model, text):
+    feats = hashed_features(text, model["dim"], model["ngrams"])
+    weights = model["weights"]
+    return model["bias"] + sum(weights.get(str(k), 0.0) * v for k, v in feats.items())
+
+def load_model(path=MODEL_PATH):
+    """Loads the optional n-gram model artifact. Returns None if it is missing or unreadable."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def train_model(samples, dim=DEFAULT_DIM, ngrams=2, epochs=40, lr=0.5, l2=1e-4, seed=7):
+    """
+    Logistic regression over hashed n-grams with plain SGD.
+    samples: iterable of {"text": ..., "intent": "QUESTION"|"REQUIREMENT"}.
+    """
+    data = [(hashed_features(s["text"], dim, ngrams), 1.0 if s["intent"] == "REQUIREMENT" else 0.0)
+            for s in samples if s.get("text") and s.get("intent") in ("QUESTION", "REQUIREMENT")]
+    rng = random.Random(seed)
+    weights = {}
+    bias = 0.0
+    for _ in range(epochs):
+        rng.shuffle(data)
+        for feats, label in data:
+            z = bias + sum(weights.get(k, 0.0) * v for k, v in feats.items())
+            grad = _sigmoid(z) - label
+            bias -= lr * grad
+            for k, v in feats.items():
+                weights[k] = weights.get(k, 0.0) * (1 - lr * l2) - lr * grad * v
+
+    return {
+        "dim": dim,
+        "ngrams": ngrams,
+        "bias": round(bias, 5),
+        "weights": {str(k): round(w, 5) for k, w in weights.items() if abs(w) >= 1e-4},
+        "trained_on": len(data),
+    }
+
+class IntentClassifier:
+    """
+    Local QUESTION / REQUIREMENT classifier.
+    Obvious cases are decided by heuristics; the optional n-gram model settles
+    borderline ones; anything still uncertain is escalated (intent=None).
+    """
+
+    def __init__(self, model_path=MODEL_PATH, threshold=0.85):
+        self.threshold = threshold
+        self.model = load_model(model_path)
+
+    def _decision(self, logit, path, reasons, started):
+        p = _sigmoid(logit)
+        confidence = max(p, 1 - p)
+        intent = None
+        if confidence >= self.threshold:
+            intent = "REQUIREMENT" if p >= 0.5 else "QUESTION"
+        return {
+            "intent": intent,
+            "path": path if intent else "escalate",
+            "confidence": round(confidence, 3),
+            "reasons": reasons,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def classify(self, text):
+        started = time.perf_counter()
+        logit, reasons = heuristic_logit(text)
+        decision = self._decision(logit, "heuristic", reasons, started)
+        if decision["intent"] or self.model is None:
+            return decision
+        return self._decision(logit + model_logit(self.model, text), "model", reasons + ["ngram-model"], started)
+
+def record_decision(log_path, text, decision, raw=False):
+    """
+    Appends one decision to a JSONL log. Stories can hold sensitive data, so by
+    default a row keeps only a hash and a short snippet of the request; with
+    raw=True it keeps the text (up to 2000 chars) and doubles as training data.
+    """
+    if not log_path:
+        return
+    try:
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        if raw:
+            logged = {"text": text[:2000]}
+        else:
+            logged = {"text_sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+                      "snippet": text[:LOG_SNIPPET_CHARS]}
+        row = {"ts": round(time.time(), 3), **logged, **decision}
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(row) + "\n")
+    except OSError as e:
+        print(f"   [SYSTEM] Could not record intent decision: {e}")
+
+def _read_jsonl(path):
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rows.append(json.loads(line))
+    return rows
+
+def main():
+    """
+    Retrain the artifact: python src/tools/intent_classifier.py [extra.jsonl ...]
+    Uses the seed set plus any decision logs passed in (only rows logged with
+    INTENT_LOG_RAW_TEXT on carry the text to train on).
+    """
+    samples = _read_jsonl(SEED_PATH)
+    for path in sys.argv[1:]:
+        samples.extend(_read_jsonl(path))
+    model = train_model(samples)
+    os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
+    with open(MODEL_PATH, "w", encoding="utf-8") as f:
+        json.dump(model, f, separators=(",", ":"))
+    print(f"Trained on {model['trained_on']} samples -> {MODEL_PATH} ({len(model['weights'])} weights)")
+
+if __name__ == "__main__":
+    main()
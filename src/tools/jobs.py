@@ -0,0 +1,235 @@
+import os
+import re
+import time
+import uuid
+import queue
+import threading
+import contextvars
+from collections import OrderedDict
+
+from tools.tracing import add_listener
+from tools.log_capture import LogBuffer, capture
+from tools.manager_pool import ManagerPool
+
+# Job lifecycle. The last three map process_request results (see classify_result).
+QUEUED, RUNNING = "queued", "running"
+FINISHED_STATUSES = ("completed", "duplicate", "answered", "failed")
+
+# Job whose request is running in this context; lets span events reach the right job
+_current_job = contextvars.ContextVar("trace_job", default=None)
+
+def classify_result(result):
+    """Maps a process_request result string to a job status."""
+    if result.startswith("Workflow Complete") and "File saved to:" in result:
+        return "completed"
+    if result.startswith("Duplicate detected"):
+        return "duplicate"
+    if result.startswith("Archivist Report"):
+        return "answered"
+    return "failed"
+
+def saved_file(result):
+    """Path of the file the Scribe wrote, taken from the result string (or None)."""
+    match = re.search(r"File saved to: (.+)", result)
+    return match.group(1).strip() if match else None
+
+class Job:
+    """One submitted story: status, result, an append-only event log and its console output."""
+
+    def __init__(self, story, max_attempts=None, session=None, request_id=None):
+        self.id = uuid.uuid4().hex
+        self.story = story
+        self.max_attempts = max_attempts
+        self.session = session
+        self.request_id = request_id
+        self.status = QUEUED
+        self.result = None
+        self.artifact = None
+        self.trace_id = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+        self.log = LogBuffer()
+        self._cond = threading.Condition()
+        self.emit("queued")
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATUSES
+
+    def emit(self, event_type, **data):
+        self._record(event_type, data)
+
+    def start(self):
+        self.started_at = time.time()
+        self._record("started", {}, status=RUNNING)
+
+    def finish(self, result, artifact=None):
+        self.result = result
+        self.artifact = artifact
+        self.finished_at = time.time()
+        status = classify_result(result)
+        seconds = round(self.finished_at - (self.started_at or self.created_at), 3)
+        self._record("finished", {"status": status, "seconds": seconds}, status=status)
+
+    def _record(self, event_type, data, status=None):
+        # Status and its event change together, so a reader never sees one without the other
+        with self._cond:
+            if status is not None:
+                self.status = status
+            self.events.append({"seq": len(self.events), "time": round(time.time(), 3),
+                                "type": event_type, **data})
+            self._cond.notify_all()
+
+    def wait_events(self, after=-1, timeout=None):
+        """
+        Events with seq > after. Blocks up to `timeout` seconds when there are none yet
+        and the job is still going; returns [] on timeout or once finished.
+        """
+        with self._cond:
+            if len(self.events) <= after + 1 and not self.finished:
+                self._cond.wait(timeout)
+            return list(self.events[after + 1:])
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "request_id": self.request_id,
+            "status": self.status,
+            "created_at": round(self.created_at, 3),
+            "started_at": round(self.started_at, 3) if self.started_at else None,
+            "finished_at": round(self.finished_at, 3) if self.finished_at else None,
+            "trace_id": self.trace_id,
+            "result": self.result,
+            "artifact": os.path.basename(self.artifact) if self.artifact else None,
+            "events": len(self.events),
+        }
+
+class JobQueue:
+    """
+    In-process FIFO of Jobs served by `workers` threads, drawing Managers from a pool
+    of the same size (built lazily by `manager_factory`). Each job writes into <output_dir>/<job id>/.
+    Finished jobs beyond `history` are forgotten, oldest first.
+    capture_logs=True keeps each job's console output in job.log instead of stdout.
+    The knowledge base is synced by whichever worker starts a job first, at most once
+    per `sync_interval` seconds; the others skip the check instead of ingesting alongside it.
+    """
+
+    def __init__(self, manager_factory, workers=2, output_dir=None, history=500, capture_logs=False,
+                 sync_interval=60.0):
+        self.manager_factory = manager_factory
+        self.capture_logs = capture_logs
+        self.sync_interval = sync_interval
+        self._synced_at = None
+        self._sync_lock = threading.Lock()
+        self.workers = max(1, workers)
+        self.output_dir = output_dir or os.path.join(os.getcwd(), "data", "outputs", "jobs")
+        self.history = history
+        self._jobs = OrderedDict()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+        self.managers = ManagerPool(lambda: self.manager_factory(), self.workers)
+        add_listener(_forward_span)
+
+    def start(self):
+        for _ in range(self.workers - len(self._threads)):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{len(self._threads)}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=None):
+        """Lets running jobs finish, then stops the workers. Queued jobs stay queued."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, story, max_attempts=None, session=None, request_id=None):
+        """request_id: client-chosen name of the run; resubmitting it resumes from its checkpoints."""
+        job = Job(story, max_attempts=max_attempts, session=session, request_id=request_id)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._forget_old()
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def position(self, job):
+        """1-based place in the queue for a queued job, else None."""
+        if job.status != QUEUED:
+            return None
+        with self._lock:
+            queued = [j for j in self._jobs.values() if j.status == QUEUED]
+        return queued.index(job) + 1 if job in queued else None
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self.workers, "queued": counts.get(QUEUED, 0), "running": counts.get(RUNNING, 0),
+                "statuses": counts}
+
+    def _forget_old(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            job.start()
+            token = _current_job.set(job)
+            try:
+                if self.capture_logs:
+                    with capture(job.log):
+                        result = self._run(job)
+                else:
+                    result = self._run(job)
+            finally:
+                _current_job.reset(token)
+            job.finish(result, saved_file(result))
+
+    def _run(self, job):
+        """Runs one job and returns its result string. Never raises."""
+        try:
+            with self.managers.acquire() as manager:
+                job_dir = os.path.join(self.output_dir, job.id)
+                os.makedirs(job_dir, exist_ok=True)
+                manager.scribe.output_dir = job_dir
+                self._sync(manager)
+                result = manager.process_request(job.story, max_attempts=job.max_attempts,
+                                                 session=job.session or f"job:{job.id}", sync=False,
+                                                 request_id=job.request_id)
+                job.trace_id = getattr(manager, "last_trace_id", None)
+        except (Exception, SystemExit) as e:
+            result = f"Error: {type(e).__name__}: {e}"
+        return result
+
+    def _sync(self, manager):
+        with self._sync_lock:
+            if self._synced_at is not None and time.monotonic() - self._synced_at < self.sync_interval:
+                return
+            manager.sync_knowledge()
+            self._synced_at = time.monotonic()
+
+def _forward_span(data, trace):
+    """Tracing listener: a finished stage of a running job becomes one of its events."""
+    job = _current_job.get()
+    if job is not None:
+        job.emit("span", name=data["name"], status=data["status"], duration_ms=data["duration_ms"],
+                 attributes=data["attributes"])
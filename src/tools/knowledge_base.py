@@ -1,7 +1,12 @@
 import os
-from langchain_chroma import Chroma
-from langchain_ollama import OllamaEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from tools.tracing import span
+from tools.lazy_import import lazy_import
+
+# Chroma, embeddings and the splitter load on first use, not at import (tools/lazy_import.py)
+Chroma = lazy_import("langchain_chroma", "Chroma")
+OllamaEmbeddings = lazy_import("langchain_ollama", "OllamaEmbeddings")
+RunnableLambda = lazy_import("langchain_core.runnables", "RunnableLambda")
+RecursiveCharacterTextSplitter = lazy_import("langchain_text_splitters", "RecursiveCharacterTextSplitter")
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 VECTOR_STORE_PATH = os.path.join(BASE_DIR, "data", "vector_store")
@@ -33,7 +38,12 @@ def update_vector_store(documents, interactive=True):
     1. Adds chunks for NEW files only.
     2. Removes chunks for DELETED files - asks confirmation when interactive=True,
        skips silently when interactive=False (automated/pipeline mode).
+    Recorded as an 'ingest' span (files added/deleted, chunks added).
     """
+    with span("ingest", files_added=0, files_deleted=0, chunks=0) as stage:
+        _update_vector_store(documents, interactive, stage)
+
+def _update_vector_store(documents, interactive, stage):
     embedding_function = get_embedding_function()
     vector_store = Chroma(
         persist_directory=VECTOR_STORE_PATH,
@@ -68,6 +78,7 @@ def update_vector_store(documents, interactive=True):
             print("Removing obsolete records...")
             for file_path in deleted_files:
                 _delete_by_source(vector_store, file_path)
+            stage.set(files_deleted=len(deleted_files))
             print("Cleanup complete.")
         else:
             print("Skipping deletion. Old data remains.")
@@ -81,18 +92,28 @@ def update_vector_store(documents, interactive=True):
         if chunks:
             print(f"Adding {len(chunks)} new chunks to Vector Store...")
             vector_store.add_documents(chunks)
+            stage.set(files_added=len(new_files), chunks=len(chunks))
             print("Success: New data added.")
         else:
             print("Warning: New files were empty.")
     else:
         print("\nNo new files to add.")
 
+def timed_retriever(retriever):
+    """Wraps a retriever so every lookup is recorded as a 'retrieval' span."""
+    def search(query):
+        with span("retrieval") as stage:
+            docs = retriever.invoke(query)
+            stage.set(documents=len(docs))
+            return docs
+    return RunnableLambda(search, name="retriever")
+
 def get_retriever():
-    """Returns the ChromaDB retriever (top-3 results)."""
+    """Returns the ChromaDB retriever (top-3 results), timed per lookup."""
     if not os.path.exists(VECTOR_STORE_PATH):
         raise FileNotFoundError("Vector Store not found. Run ingestion first.")
     vector_store = Chroma(
         persist_directory=VECTOR_STORE_PATH,
         embedding_function=get_embedding_function()
     )
-    return vector_store.as_retriever(search_kwargs={"k": 3})
\ No newline at end of file
+    return timed_retriever(vector_store.as_retriever(search_kwargs={"k": 3}))
\ No newline at end of file
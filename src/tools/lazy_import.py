@@ -0,0 +1,34 @@
+import importlib
+
+class LazyImport:
+    """
+    Stand-in for `from module import name` that imports the module on first use
+    (a call or an attribute lookup), so heavy dependencies load only on the paths
+    that need them. Being a plain module attribute, it can still be replaced with
+    unittest.mock.patch("pkg.module.name").
+    """
+
+    def __init__(self, module, name):
+        self._lazy_module = module
+        self._lazy_name = name
+
+    def resolve(self):
+        # No caching: import_module is a dict lookup once loaded, and this always
+        # agrees with sys.modules
+        return getattr(importlib.import_module(self._lazy_module), self._lazy_name)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        if attr.startswith("_lazy_"):
+            raise AttributeError(attr)
+        return getattr(self.resolve(), attr)
+
+    def __repr__(self):
+        return f"<lazy {self._lazy_module}.{self._lazy_name}>"
+
+def lazy_import(module, *names):
+    """lazy_import("langchain_ollama", "ChatOllama") -> one LazyImport (a tuple for several names)."""
+    proxies = tuple(LazyImport(module, name) for name in names)
+    return proxies[0] if len(proxies) == 1 else proxies
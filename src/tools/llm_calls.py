@@ -0,0 +1,299 @@
+import re
+import sys
+import time
+import random
+import threading
+import contextvars
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import config
+from tools.llm_governor import Governor, current_endpoint
+from tools.prompt_budget import count_tokens
+from tools.tracing import span
+
+TRANSIENT_ERRORS = (ConnectionError, TimeoutError)
+
+# One governor per process: every agent's model call queues here
+GOVERNOR = Governor(
+    limits=config.LLM_CONCURRENCY,
+    default_limit=config.LLM_DEFAULT_CONCURRENCY,
+    lock_dir=config.LLM_LOCK_DIR,
+)
+
+# Attempts run here so the caller can stop waiting on a hung call. Each one already
+# holds its governor slot when submitted, so these threads never queue on the governor.
+_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-call")
+
+class ModelCallError(Exception):
+    """A model call that failed for good (after retries). Stops the workflow."""
+
+    def __init__(self, role, model, message, attempts=1):
+        super().__init__(f"{role} call to '{model}' failed after {attempts} attempt(s): {message}")
+        self.role = role
+        self.model = model
+        self.attempts = attempts
+
+class ModelTimeoutError(ModelCallError):
+    """The model did not answer within the role's timeout."""
+
+class AgentError(Exception):
+    """An agent failed without a model failure (missing inputs, a bug). Stops the workflow too."""
+
+    def __init__(self, role, message):
+        super().__init__(f"{role} failed: {message}")
+        self.role = role
+
+def is_transient(error):
+    """Connection problems, timeouts, rate limits and 5xx responses are worth retrying."""
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    # Transport errors raised by the ollama client. httpx is not imported here: if it
+    # isn't loaded yet, nothing can have raised one.
+    httpx = sys.modules.get("httpx")
+    if httpx is not None and isinstance(error, httpx.TransportError):
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+def backoff_delay(retry):
+    """Full-jitter exponential backoff for the Nth retry (1-based), in seconds."""
+    ceiling = min(config.LLM_BACKOFF_MAX, config.LLM_BACKOFF_BASE * (2 ** (retry - 1)))
+    return random.uniform(0, ceiling)
+
+class LatencyStats:
+    """Recent successful call latencies per role; drives the hedging delay."""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, role, seconds):
+        with self._lock:
+            self._samples.setdefault(role, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, role, pct, min_samples=1):
+        """None until `min_samples` calls have been recorded for the role."""
+        with self._lock:
+            samples = sorted(self._samples.get(role, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+LATENCY = LatencyStats()
+
+def client_kwargs(role):
+    """
+    HTTP client settings for an agent's ChatOllama. The socket timeout sits a little
+    above the role timeout, so an abandoned attempt's request ends soon after.
+    """
+    timeout = config.LLM_TIMEOUTS.get(role)
+    return {"timeout": timeout + 5} if timeout else {}
+
+def llm_options(role):
+    """Keyword arguments for an agent's ChatOllama: client timeout plus the role's keep_alive."""
+    options = {"client_kwargs": client_kwargs(role)}
+    if config.LLM_KEEP_ALIVE.get(role) is not None:
+        options["keep_alive"] = config.LLM_KEEP_ALIVE[role]
+    return options
+
+def static_prefix(template):
+    """The part of a prompt template before its first variable, as it renders."""
+    match = re.search(r"(?<!\{)\{(?!\{)", template)
+    prefix = template[:match.start()] if match else template
+    return prefix.replace("{{", "{").replace("}}", "}")
+
+def warm_up(targets, client=None):
+    """
+    Loads each model and primes the server's prompt cache with the role's static prefix.
+    targets: iterable of (role, model, prefix). Returns {model: seconds or error string}.
+    Runs before real traffic, so it skips the governor and never raises.
+    """
+    if client is None:
+        try:
+            import ollama
+            client = ollama.Client(host=current_endpoint(), timeout=config.LLM_WARMUP_TIMEOUT)
+        except Exception as e:
+            print(f"   [SYSTEM] Warm-up skipped: {e}")
+            return {}
+
+    results = {}
+    for role, model, prefix in targets:
+        started = time.perf_counter()
+        try:
+            client.chat(model=model, messages=[{"role": "user", "content": prefix}],
+                        options={"num_predict": 1}, keep_alive=config.LLM_KEEP_ALIVE.get(role))
+            results[model] = round(time.perf_counter() - started, 2)
+            print(f"   [SYSTEM] Warmed up {role.upper()} -> {model} in {results[model]}s")
+        except Exception as e:
+            results[model] = f"Error: {e}"
+            print(f"   [SYSTEM] Warm-up failed for {model}: {e}")
+    return results
+
+@lru_cache(maxsize=None)
+def _usage_collector():
+    """The UsageCollector callback class, defined on first use (langchain_core loads then); None without it."""
+    try:
+        from langchain_core.callbacks import BaseCallbackHandler
+    except ImportError:
+        return None
+    if not isinstance(BaseCallbackHandler, type):  # stubbed out
+        return None
+
+    class UsageCollector(BaseCallbackHandler):
+        """Collects the token counts and load time Ollama reports for one model call."""
+
+        def __init__(self, usage):
+            super().__init__()
+            self.usage = usage
+
+        def on_llm_end(self, response, **kwargs):
+            for generations in response.generations:
+                for generation in generations:
+                    meta = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    info = generation.generation_info or {}
+                    self.usage["prompt_tokens"] = meta.get("input_tokens", info.get("prompt_eval_count"))
+                    self.usage["completion_tokens"] = meta.get("output_tokens", info.get("eval_count"))
+                    if info.get("load_duration") is not None:
+                        self.usage["load_ms"] = round(info["load_duration"] / 1e6, 3)
+
+    return UsageCollector
+
+def _attempt(chain, inputs, usage, release):
+    try:
+        collector = _usage_collector()
+        if collector is None:
+            return chain.invoke(inputs)
+        return chain.invoke(inputs, config={"callbacks": [collector(usage)]})
+    finally:
+        release()
+
+def _launch(model, chain, inputs, usage, blocking=True):
+    """
+    Takes a governor slot in the calling thread (so the caller's priority decides when),
+    then starts one attempt in the request's context. Returns (future, release), or None
+    when blocking=False and no slot is free.
+    """
+    acquired = GOVERNOR.acquire(model, blocking=blocking)
+    if acquired is None:
+        return None
+    waited, release = acquired
+    if blocking:
+        usage["queue_ms"] = round(waited * 1000, 3)
+    try:
+        future = _EXECUTOR.submit(contextvars.copy_context().run, _attempt, chain, inputs, usage, release)
+    except BaseException:
+        release()
+        raise
+    return future, release
+
+def _abandon(attempts):
+    """
+    Gives up on attempts still running: cancels any not yet started and frees every
+    slot at once, so the retry or hedge replacing them doesn't queue behind them.
+    """
+    for future, release in attempts:
+        if not future.done():
+            future.cancel()
+            release()
+
+def _run_once(role, model, chain, inputs, usage):
+    """
+    One attempt, bounded by the role timeout (counted from when the governor lets
+    it run, not while it queues). Fires a hedged duplicate once the attempt has
+    been running longer than the role's recent p95 latency. Attempts that time out
+    or lose to a hedge are abandoned and their slots freed.
+    """
+    timeout = config.LLM_TIMEOUTS.get(role)
+    attempts = [_launch(model, chain, inputs, usage)]
+    try:
+        return _wait_for_attempts(role, model, chain, inputs, usage, timeout, attempts)
+    finally:
+        _abandon(attempts)
+
+def _wait_for_attempts(role, model, chain, inputs, usage, timeout, attempts):
+    t0 = time.perf_counter()
+    deadline = t0 + timeout if timeout else None
+    running = {attempts[0][0]}
+
+    hedge_after = None
+    if role in config.LLM_HEDGE_ROLES:
+        hedge_after = LATENCY.percentile(role, config.LLM_HEDGE_PERCENTILE, config.LLM_HEDGE_MIN_SAMPLES)
+
+    error = None
+    while running:
+        now = time.perf_counter()
+        remaining = None if deadline is None else deadline - now
+        if remaining is not None and remaining <= 0:
+            break
+        wait_for = remaining
+        if hedge_after is not None:
+            wait_for = max(0.0, min(wait_for if wait_for is not None else hedge_after, t0 + hedge_after - now))
+
+        done, running = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+        for finished in done:
+            try:
+                result = finished.result()
+            except Exception as e:
+                error = e
+                continue
+            LATENCY.record(role, time.perf_counter() - t0)
+            return result
+
+        if hedge_after is not None and time.perf_counter() - t0 >= hedge_after:
+            # A hedge that had to queue would only add load, so it needs a free slot now
+            hedge = _launch(model, chain, inputs, usage, blocking=False)
+            if hedge is not None:
+                print(f"   [SYSTEM] {role.upper()} slower than p{config.LLM_HEDGE_PERCENTILE} "
+                      f"({hedge_after:.1f}s). Sending a hedged request...")
+                attempts.append(hedge)
+                running = set(running) | {hedge[0]}
+                usage["hedged"] = True
+            hedge_after = None
+
+    if error is not None and not running:
+        raise error
+    raise TimeoutError(f"no response within {timeout}s")
+
+def invoke_chain(role, model, chain, inputs):
+    """
+    The single path every agent uses to call a model.
+    Each attempt waits for a governor slot for `model` and is bounded by
+    config.LLM_TIMEOUTS[role]. Transient failures are retried with jittered backoff
+    (config.LLM_MAX_RETRIES). Anything that still fails raises ModelCallError
+    (ModelTimeoutError for timeouts) instead of returning an error string.
+    Each call is a 'llm.<role>' span carrying model, tokens, queue wait and retries.
+    """
+    with span(f"llm.{role}", role=role, model=model) as call:
+        usage = {}
+        try:
+            result = _call_with_retries(role, model, chain, inputs, usage, call)
+        finally:
+            call.set(**usage)
+        if usage.get("prompt_tokens") is None:
+            # Mocked or non-Ollama chains report nothing: fall back to the budget estimate
+            call.set(prompt_tokens=count_tokens(" ".join(str(v) for v in _values(inputs))),
+                     completion_tokens=count_tokens(str(result)), tokens_estimated=True)
+        return result
+
+def _values(inputs):
+    return inputs.values() if isinstance(inputs, dict) else [inputs]
+
+def _call_with_retries(role, model, chain, inputs, usage, call):
+    attempts = 0
+    while True:
+        attempts += 1
+        call.set(attempts=attempts)
+        try:
+            return _run_once(role, model, chain, inputs, usage)
+        except Exception as e:
+            if attempts > config.LLM_MAX_RETRIES or not is_transient(e):
+                error_type = ModelTimeoutError if isinstance(e, TimeoutError) else ModelCallError
+                raise error_type(role, model, e, attempts) from e
+            delay = backoff_delay(attempts)
+            print(f"   [SYSTEM] {role.upper()} call failed ({e}). Retry {attempts}/{config.LLM_MAX_RETRIES} "
+                  f"in {delay:.1f}s...")
+            time.sleep(delay)
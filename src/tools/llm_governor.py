@@ -0,0 +1,183 @@
+import os
+import time
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+
+try:
+    import fcntl  # POSIX only; cross-process limits are skipped elsewhere
+except ImportError:
+    fcntl = None
+
+# Priority classes: lower value is served first
+PRIORITIES = {"interactive": 0, "generation": 1, "batch": 2}
+DEFAULT_PRIORITY = "generation"
+DEFAULT_ENDPOINT = "http://localhost:11434"
+
+# Who is calling: set once per request, read by every model call beneath it
+_request = contextvars.ContextVar("trace_request", default=None)
+
+@contextmanager
+def request_context(priority=None, session=None):
+    """
+    Tags every model call made inside the block (including threads started with
+    contextvars.copy_context()) with a priority class and a session for fair sharing.
+    Values already set by an outer block win, so a batch job stays 'batch'.
+    """
+    outer = _request.get() or {}
+    token = _request.set({
+        "priority": outer.get("priority") or priority or DEFAULT_PRIORITY,
+        "session": outer.get("session") or session or "default",
+    })
+    try:
+        yield _request.get()
+    finally:
+        _request.reset(token)
+
+def current_request():
+    return _request.get() or {"priority": DEFAULT_PRIORITY, "session": "default"}
+
+def current_endpoint():
+    return os.getenv("OLLAMA_HOST") or DEFAULT_ENDPOINT
+
+class _Lane:
+    """State for one (endpoint, model) pair."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        self.waiting = []          # [(priority, seq, session)]
+        self.active_by_session = {}
+        self.served = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+class Governor:
+    """
+    Process-wide gate in front of every model call.
+    - caps concurrent calls per (endpoint, model)
+    - serves waiting calls by priority class, then by the session with the
+      fewest calls in flight (fair sharing), then first-come-first-served
+    - optionally also caps across processes with lock files (POSIX)
+    """
+
+    def __init__(self, limits=None, default_limit=4, lock_dir=None):
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self.lock_dir = lock_dir if fcntl else None
+        self._lanes = {}
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+
+    def _lane(self, key, model):
+        if key not in self._lanes:
+            self._lanes[key] = _Lane(self.limits.get(model, self.default_limit))
+        return self._lanes[key]
+
+    def _next_up(self, lane):
+        return min(lane.waiting, key=lambda w: (w[0], lane.active_by_session.get(w[2], 0), w[1]))
+
+    @contextmanager
+    def slot(self, model, endpoint=None, priority=None, session=None):
+        waited, release = self.acquire(model, endpoint, priority, session)
+        try:
+            yield waited
+        finally:
+            release()
+
+    def acquire(self, model, endpoint=None, priority=None, session=None, blocking=True):
+        """
+        Waits for a slot. Returns (seconds waited, release), where release() hands the
+        slot back and may be called from any thread, more than once. With blocking=False,
+        returns None unless a slot is free right now and nobody is queued for it.
+        """
+        context = current_request()
+        priority = priority or context["priority"]
+        session = session or context["session"]
+        key = f"{endpoint or current_endpoint()}|{model}"
+        waiter = (PRIORITIES.get(priority, PRIORITIES[DEFAULT_PRIORITY]), next(self._seq), session)
+        started = time.perf_counter()
+
+        with self._cond:
+            lane = self._lane(key, model)
+            if not blocking and (lane.active >= lane.limit or lane.waiting):
+                return None
+            lane.waiting.append(waiter)
+            try:
+                while lane.active >= lane.limit or self._next_up(lane) != waiter:
+                    self._cond.wait()
+            finally:
+                # Leaving the queue changes who is next up: wake the others to re-check,
+                # or a second free slot would sit idle until some later release
+                lane.waiting.remove(waiter)
+                self._cond.notify_all()
+            lane.active += 1
+            lane.active_by_session[session] = lane.active_by_session.get(session, 0) + 1
+
+        released = []
+        lock = None
+
+        def release():
+            with self._cond:
+                if released:
+                    return
+                released.append(True)
+                if lock:
+                    lock.close()
+                lane.active -= 1
+                lane.active_by_session[session] -= 1
+                if not lane.active_by_session[session]:
+                    del lane.active_by_session[session]
+                self._cond.notify_all()
+
+        try:
+            lock = self._acquire_process_slot(key, lane.limit, blocking)
+        except BaseException:
+            release()
+            raise
+        if lock is False:
+            release()
+            return None
+        waited = time.perf_counter() - started
+        with self._cond:
+            lane.wait_total += waited
+            lane.wait_max = max(lane.wait_max, waited)
+            lane.served += 1
+        return waited, release
+
+    def _acquire_process_slot(self, key, limit, blocking=True):
+        """
+        Holds one of `limit` lock files shared by every process using lock_dir.
+        False when blocking=False and all of them are taken.
+        """
+        if not self.lock_dir:
+            return None
+        os.makedirs(self.lock_dir, exist_ok=True)
+        safe = "".join(c if c.isalnum() else "_" for c in key)
+        while True:
+            for i in range(limit):
+                handle = open(os.path.join(self.lock_dir, f"{safe}.{i}.lock"), "a")
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return handle
+                except OSError:
+                    handle.close()
+            if not blocking:
+                return False
+            time.sleep(0.05)
+
+    def snapshot(self):
+        """Queue depth, in-flight calls and wait times per (endpoint, model)."""
+        with self._cond:
+            return {
+                key: {
+                    "limit": lane.limit,
+                    "active": lane.active,
+                    "queued": len(lane.waiting),
+                    "served": lane.served,
+                    "wait_avg_ms": round(lane.wait_total / lane.served * 1000, 2) if lane.served else 0.0,
+                    "wait_max_ms": round(lane.wait_max * 1000, 2),
+                }
+                for key, lane in self._lanes.items()
+            }
@@ -0,0 +1,116 @@
+"""
+Per-request log capture without swapping sys.stdout around each request.
+
+install() replaces sys.stdout ONCE with a router. Text printed inside capture(sink),
+including threads started with contextvars.copy_context() (the Author fan-out, model
+calls), goes to that sink; everything else reaches the real stdout. A logging handler
+sends log records to the same sink, so concurrent requests never see each other's output.
+"""
+import io
+import sys
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Log of the request running in this context (None = print to the real stdout)
+_sink = contextvars.ContextVar("trace_log_sink", default=None)
+_lock = threading.Lock()
+
+class LogBuffer:
+    """Thread-safe text log of one request. Keeps the last `max_chars` characters."""
+
+    def __init__(self, max_chars=1_000_000):
+        self.max_chars = max_chars
+        self._parts = []
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        if not text:
+            return 0
+        with self._lock:
+            self._parts.append(text)
+            self._size += len(text)
+            if self._size > self.max_chars:
+                joined = "".join(self._parts)[-self.max_chars:]
+                self._parts, self._size = [joined], len(joined)
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def text(self):
+        with self._lock:
+            return "".join(self._parts)
+
+class _Discard:
+    """Sink that drops everything (capture(DISCARD) silences a context)."""
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+DISCARD = _Discard()
+
+class _StdoutRouter(io.TextIOBase):
+    """sys.stdout stand-in: writes go to the current context's sink, else to `target`."""
+
+    def __init__(self, target):
+        self.target = target
+
+    def write(self, text):
+        sink = _sink.get()
+        if sink is None:
+            return self.target.write(text)
+        return sink.write(text)
+
+    def flush(self):
+        if _sink.get() is None:
+            self.target.flush()
+
+    def isatty(self):
+        return self.target.isatty()
+
+    def fileno(self):
+        return self.target.fileno()
+
+    @property
+    def encoding(self):
+        return getattr(self.target, "encoding", "utf-8")
+
+class SessionLogHandler(logging.Handler):
+    """Logging handler: records emitted inside capture() go to that capture's sink."""
+
+    def emit(self, record):
+        sink = _sink.get()
+        if sink is None:
+            return
+        try:
+            sink.write(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+
+_HANDLER = SessionLogHandler()
+_HANDLER.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+
+def install():
+    """Routes sys.stdout and root logging through the per-context sinks (idempotent)."""
+    with _lock:
+        if not isinstance(sys.stdout, _StdoutRouter):
+            sys.stdout = _StdoutRouter(sys.stdout)
+        root = logging.getLogger()
+        if _HANDLER not in root.handlers:
+            root.addHandler(_HANDLER)
+
+@contextmanager
+def capture(sink):
+    """Sends this context's prints and log records to `sink` (anything with write())."""
+    install()
+    token = _sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _sink.reset(token)
@@ -0,0 +1,80 @@
+import time
+import threading
+from contextlib import contextmanager
+
+class PoolTimeout(TimeoutError):
+    """No Manager became free within the acquire timeout."""
+
+class ManagerPool:
+    """
+    Bounded pool of Managers for serving concurrent requests in one process.
+    A Manager (its agents, chains and model clients) serves one request at a time;
+    at most `size` exist, built lazily by `factory`, and further callers wait.
+    A Manager whose request raised is dropped and rebuilt on demand.
+    """
+
+    def __init__(self, factory, size, timeout=None):
+        self.factory = factory
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle = []
+        self._created = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        """Lends a Manager for the duration of the block. Raises PoolTimeout after `timeout` seconds."""
+        manager = self._checkout(self.timeout if timeout is None else timeout)
+        try:
+            yield manager
+        except BaseException:
+            self._release(manager, healthy=False)
+            raise
+        self._release(manager)
+
+    def process_request(self, user_input, **kwargs):
+        """Manager.process_request on whichever Manager is free."""
+        with self.acquire() as manager:
+            return manager.process_request(user_input, **kwargs)
+
+    def _checkout(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._waiting += 1
+            try:
+                while not self._idle and self._created >= self.size:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise PoolTimeout(f"No Manager free after {timeout}s ({self.size} in use).")
+                    self._cond.wait(remaining)
+                self._in_use += 1
+                if self._idle:
+                    return self._idle.pop()
+                self._created += 1
+            finally:
+                self._waiting -= 1
+        # Built outside the lock: constructing a Manager takes a while
+        try:
+            return self.factory()
+        except BaseException:
+            with self._cond:
+                self._created -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, manager, healthy=True):
+        with self._cond:
+            self._in_use -= 1
+            if healthy:
+                self._idle.append(manager)
+            else:
+                self._created -= 1
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {"size": self.size, "created": self._created, "idle": len(self._idle),
+                    "in_use": self._in_use, "waiting": self._waiting}
@@ -0,0 +1,273 @@
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from tools.tracing import add_listener
+
+# Seconds; covers a cached retrieval up to a slow 27B review
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only go up.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}"
+                                for k, v in items]
+
+class Gauge(_Metric):
+    """A value that goes up and down. With `collect`, values are read at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), collect=None):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self):
+        if self.collect is not None:
+            try:
+                for labels, value in self.collect():
+                    self.set(value, **labels)
+            except Exception as e:
+                print(f"   [SYSTEM] Could not collect {self.name}: {e}")
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}"
+                                for k, v in items]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels):
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+        return entry[0][-1] if entry else 0
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, (list(c), s)) for k, (c, s) in self._values.items())
+        lines = self.header()
+        for key, (counts, total) in items:
+            for bound, count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+class Registry:
+    """Named metrics of one process, rendered in the Prometheus text format (0.0.4)."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric '{name}' is already registered as a {metric.kind}.")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=(), collect=None):
+        return self._get(Gauge, name, documentation, labelnames, collect=collect)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.counter("trace_requests_total", "Requests handled, by detected intent.", ["intent"])
+REQUEST_SECONDS = REGISTRY.histogram("trace_request_seconds", "End-to-end process_request latency.", ["status"])
+REQUEST_ATTEMPTS = REGISTRY.histogram("trace_request_attempts", "Author/Auditor attempts used per generation request.",
+                                      buckets=(1, 2, 3, 4, 5, 8))
+ATTEMPTS = REGISTRY.counter("trace_workflow_attempts_total", "Author drafting rounds and Auditor reviews.", ["stage"])
+REJECTIONS = REGISTRY.counter("trace_rejections_total", "Test cases sent back, by the stage that rejected them.",
+                              ["stage"])
+LLM_SECONDS = REGISTRY.histogram("trace_llm_call_seconds", "Model call latency per agent (incl. retries).",
+                                 ["role", "model"])
+LLM_CALLS = REGISTRY.counter("trace_llm_calls_total", "Model calls per agent and outcome.", ["role", "model", "status"])
+LLM_TOKENS = REGISTRY.counter("trace_llm_tokens_total", "Tokens per agent, prompt or completion.",
+                              ["role", "model", "kind"])
+LLM_QUEUE_SECONDS = REGISTRY.histogram("trace_llm_queue_seconds", "Time spent waiting for a governor slot.", ["role"])
+RETRIEVAL_SECONDS = REGISTRY.histogram("trace_retrieval_seconds", "Vector store lookup latency.")
+CACHE = REGISTRY.counter("trace_cache_requests_total", "Cache lookups by cache and result (hit/miss).",
+                         ["cache", "result"])
+INGEST_SECONDS = REGISTRY.histogram("trace_ingest_seconds", "Vector store sync duration.")
+INGEST_CHUNKS = REGISTRY.counter("trace_ingest_chunks_total", "Chunks added to the vector store.")
+INGEST_FILES = REGISTRY.counter("trace_ingest_files_total", "Files added to or removed from the vector store.",
+                                ["change"])
+
+def _governor_lanes(field):
+    def collect():
+        from tools.llm_calls import GOVERNOR
+        for key, lane in GOVERNOR.snapshot().items():
+            endpoint, model = key.rsplit("|", 1)
+            yield {"endpoint": endpoint, "model": model}, lane[field]
+    return collect
+
+QUEUE_DEPTH = REGISTRY.gauge("trace_llm_queue_depth", "Model calls waiting for a governor slot.",
+                             ["endpoint", "model"], collect=_governor_lanes("queued"))
+IN_FLIGHT = REGISTRY.gauge("trace_llm_in_flight", "Model calls currently running.",
+                           ["endpoint", "model"], collect=_governor_lanes("active"))
+
+def record_span(data, trace):
+    """Tracing listener: turns finished spans into metric updates."""
+    name, attrs = data["name"], data["attributes"]
+    seconds = (data["duration_ms"] or 0.0) / 1000
+
+    if name.startswith("llm."):
+        role, model = attrs.get("role", name[4:]), attrs.get("model", "unknown")
+        LLM_SECONDS.observe(seconds, role=role, model=model)
+        LLM_CALLS.inc(role=role, model=model, status=data["status"])
+        for kind in ("prompt", "completion"):
+            if attrs.get(f"{kind}_tokens"):
+                LLM_TOKENS.inc(attrs[f"{kind}_tokens"], role=role, model=model, kind=kind)
+        if attrs.get("queue_ms") is not None:
+            LLM_QUEUE_SECONDS.observe(attrs["queue_ms"] / 1000, role=role)
+    elif name == "retrieval":
+        RETRIEVAL_SECONDS.observe(seconds)
+    elif name == "intent":
+        intent = str(attrs.get("intent", ""))
+        REQUESTS.inc(intent="question" if "QUESTION" in intent else "requirement" if intent else "unknown")
+    elif name == "parse":
+        CACHE.inc(cache="analysis", result="hit" if attrs.get("cache_hit") else "miss")
+    elif name == "sync":
+        CACHE.inc(cache="ingest_state", result="hit" if attrs.get("up_to_date") else "miss")
+    elif name == "ingest":
+        INGEST_SECONDS.observe(seconds)
+        INGEST_CHUNKS.inc(attrs.get("chunks", 0))
+        INGEST_FILES.inc(attrs.get("files_added", 0), change="added")
+        INGEST_FILES.inc(attrs.get("files_deleted", 0), change="deleted")
+    elif name == "drafting":
+        ATTEMPTS.inc(stage="author")
+    elif name == "pre_audit":
+        REJECTIONS.inc(attrs.get("defective", 0), stage="pre_audit")
+    elif name == "auditor":
+        ATTEMPTS.inc(stage="auditor")
+        REJECTIONS.inc(attrs.get("rejected", 0), stage="auditor")
+    elif name == "process_request":
+        REQUEST_SECONDS.observe(seconds, status=data["status"])
+        if trace is not None:
+            rounds = [s["attributes"].get("attempt", 0) for s in trace.spans if s["name"] == "drafting"]
+            if rounds:
+                REQUEST_ATTEMPTS.observe(max(rounds))
+
+    # Stage memo lookups (tools/stage_memo.py) on any stage: memo_parse, memo_context, ...
+    if "memo_hits" in attrs:
+        CACHE.inc(attrs["memo_hits"], cache=f"memo_{name}", result="hit")
+        CACHE.inc(attrs.get("memo_misses", 0), cache=f"memo_{name}", result="miss")
+
+def install():
+    """Starts feeding the registry from finished spans (idempotent)."""
+    add_listener(record_span)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+def serve(host="127.0.0.1", port=9464, registry=REGISTRY):
+    """
+    Exposes `registry` on http://host:port/metrics from a daemon thread.
+    One server per (host, port) per process; later calls return the running one.
+    port=0 picks a free port (see server.server_address).
+    """
+    with _servers_lock:
+        if port and (host, port) in _servers:
+            return _servers[(host, port)]
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+        server = ThreadingHTTPServer((host, port), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+        _servers[(host, server.server_address[1])] = server
+        print(f"   [SYSTEM] Metrics available at http://{host}:{server.server_address[1]}/metrics")
+        return server
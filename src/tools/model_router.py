@@ -0,0 +1,136 @@
+import os
+import json
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl  # POSIX only; elsewhere saves are serialized within the process
+except ImportError:
+    fcntl = None
+
+_EMPTY_ENTRY = {"calls": 0, "accepted": 0, "rejected": 0, "latency_total_s": 0.0, "latency_max_s": 0.0}
+
+# One router per (stats file, tiers) in this process: see shared_router()
+_shared = {}
+_shared_lock = threading.Lock()
+
+def shared_router(tiers=None, stats_path=None):
+    """
+    The process-wide router for this stats file and tier table. Every Manager in a
+    process (pool, batch workers, job queue) records into the same counters.
+    """
+    key = (stats_path, json.dumps(tiers or {}, sort_keys=True))
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = ModelRouter(tiers, stats_path)
+        return _shared[key]
+
+def merge_stats(into, delta):
+    """Adds the counters of `delta` ({role: {model: entry}}) to `into`, in place."""
+    for role, models in delta.items():
+        for model, entry in models.items():
+            total = into.setdefault(role, {}).setdefault(model, dict(_EMPTY_ENTRY))
+            for field in ("calls", "accepted", "rejected"):
+                total[field] = total.get(field, 0) + entry.get(field, 0)
+            total["latency_total_s"] = round(total.get("latency_total_s", 0.0) + entry.get("latency_total_s", 0.0), 3)
+            total["latency_max_s"] = round(max(total.get("latency_max_s", 0.0), entry.get("latency_max_s", 0.0)), 3)
+    return into
+
+class ModelRouter:
+    """
+    Tiered model routing per role: cheapest model first, the next tier only
+    after that tier's output was rejected (Auditor) or failed validation.
+    Records calls, approvals and latency per (role, model) so the tiers can be
+    tuned from real runs; the totals are kept in a small JSON file. save() adds
+    only what this router recorded since its last save to what is on disk, so
+    several routers or processes sharing the file don't overwrite each other.
+    """
+
+    def __init__(self, tiers=None, stats_path=None):
+        self.tiers = {role: list(models) for role, models in (tiers or {}).items() if models}
+        self.stats_path = stats_path
+        self._lock = threading.Lock()
+        self._stats = self._load()
+        self._unsaved = {}
+
+    def _load(self):
+        if not self.stats_path or not os.path.exists(self.stats_path):
+            return {}
+        try:
+            with open(self.stats_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def levels(self, role):
+        return max(1, len(self.tiers.get(role, ())))
+
+    def model_for(self, role, level=0, default=None):
+        """Model for the given tier (clamped to the top tier). Roles without tiers get `default`."""
+        models = self.tiers.get(role)
+        if not models:
+            return default
+        return models[min(max(0, level), len(models) - 1)]
+
+    def escalate(self, role, level):
+        """Next tier up, or the same level when already at the top."""
+        return min(level + 1, self.levels(role) - 1)
+
+    def can_escalate(self, role, level):
+        return level + 1 < self.levels(role)
+
+    def record(self, role, model, success, latency=None):
+        """One routed call: success=True when its output was accepted."""
+        delta = {"calls": 1, "accepted": int(bool(success)), "rejected": int(not success),
+                 "latency_total_s": latency or 0.0, "latency_max_s": latency or 0.0}
+        with self._lock:
+            merge_stats(self._stats, {role: {model: delta}})
+            merge_stats(self._unsaved, {role: {model: delta}})
+
+    def stats(self):
+        """Per role and model: calls, accept/reject counts, success rate and latency."""
+        with self._lock:
+            report = {}
+            for role, models in self._stats.items():
+                tiers = self.tiers.get(role, [])
+                report[role] = {}
+                for model, entry in models.items():
+                    calls = entry["calls"] or 1
+                    report[role][model] = {
+                        **entry,
+                        "tier": tiers.index(model) if model in tiers else None,
+                        "success_rate": round(entry["accepted"] / calls, 3),
+                        "latency_avg_s": round(entry["latency_total_s"] / calls, 3),
+                    }
+            return report
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.stats_path}.lock", "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def save(self):
+        """Merges the calls recorded since the last save into the stats file (atomically)."""
+        if not self.stats_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.stats_path), exist_ok=True)
+            with self._lock, self._file_lock():
+                if not self._unsaved:
+                    return
+                totals = merge_stats(self._load(), self._unsaved)
+                # Temp file + rename: a crash mid-write never leaves broken JSON behind
+                tmp = f"{self.stats_path}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(totals, f, indent=2)
+                os.replace(tmp, self.stats_path)
+                self._stats, self._unsaved = totals, {}
+        except OSError as e:
+            print(f"   [SYSTEM] Could not save routing stats: {e}")
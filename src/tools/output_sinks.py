@@ -0,0 +1,281 @@
+"""
+Where the Scribe's test cases end up. A sink writes one table (header + rows) as CSV,
+XLSX or Parquet.
+
+- write(path, ...) goes to a temp file next to `path` and is renamed into place, so a
+  reader never sees half a file and a crash never leaves one behind.
+- Files are named by run ID (timestamp + random suffix), so two saves in the same
+  second no longer overwrite each other.
+- append(path, ...) adds the rows of one run to a consolidated file (one per sprint or
+  batch) under a lock. CSV appends in place. XLSX and Parquet can't be extended, so
+  their old rows are streamed into a new copy, never loaded at once. A run that brings
+  a new column widens the file's header (a CSV is then rewritten once too).
+"""
+import io
+import os
+import csv
+import time
+import uuid
+import tempfile
+import importlib
+import threading
+from itertools import chain
+from contextlib import contextmanager
+
+try:
+    import fcntl  # POSIX only; elsewhere appends are serialized within the process
+except ImportError:
+    fcntl = None
+
+# First column of a consolidated file: which run each row came from
+RUN_ID_COLUMN = "Run ID"
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+def new_run_id():
+    """Sortable and unique across threads and processes, e.g. 20260101T120000Z-1a2b3c4d."""
+    return f"{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}-{uuid.uuid4().hex[:8]}"
+
+def rows_from_csv(text):
+    """
+    (header, rows) of a CSV string. Short rows are padded to the header; cells beyond
+    it (an unquoted comma in LLM output) are folded into the last column.
+    """
+    records = [r for r in csv.reader(io.StringIO(text or "")) if any(cell.strip() for cell in r)]
+    if not records:
+        raise ValueError("No CSV content to write.")
+    header, width = records[0], len(records[0])
+    rows = []
+    for record in records[1:]:
+        if len(record) > width:
+            record = record[:width - 1] + [",".join(record[width - 1:])]
+        rows.append(record + [""] * (width - len(record)))
+    return header, rows
+
+def _require(module, package, fmt):
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise ImportError(f"Error: Run 'pip install {package}' to write {fmt} files.")
+
+@contextmanager
+def atomic_path(path):
+    """Yields a temp path in the target's folder; it replaces `path` only if the block succeeds."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    handle, tmp = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    os.close(handle)
+    try:
+        yield tmp
+        os.chmod(tmp, 0o644)  # mkstemp creates it owner-only
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+@contextmanager
+def locked(path):
+    """Serializes appends to `path` across threads and, on POSIX, processes."""
+    path = os.path.abspath(path)
+    with _locks_guard:
+        lock = _locks.setdefault(path, threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        lock_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.lock")
+        with open(lock_path, "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+def _widen(header, extra):
+    """`header` plus the columns of `extra` it doesn't have yet, in order."""
+    return list(header) + [name for name in extra if name not in header]
+
+def _align(header, rows, target):
+    """Reorders each row's cells to the `target` header by column name ("" where missing)."""
+    if header == target:
+        return rows
+    positions = {name: i for i, name in enumerate(header)}
+    return ([row[positions[name]] if name in positions else "" for name in target] for row in rows)
+
+class Sink:
+    """One output format. Subclasses implement _write(path, header, rows) and _read(path)."""
+    extension = None
+    media_type = "application/octet-stream"
+
+    def write(self, path, header, rows):
+        """Writes a new file (atomically). Returns the number of rows."""
+        rows = list(rows)
+        with atomic_path(path) as tmp:
+            self._write(tmp, header, rows)
+        return len(rows)
+
+    def append(self, path, header, rows, run_id=None, replace=()):
+        """
+        Adds rows to the consolidated file at `path`, tagged with `run_id`. Columns are
+        matched by name, so a later run with reordered columns still lines up.
+        Columns the file doesn't have yet are added to its header (blank in older rows).
+        Rows of the runs in `replace` (earlier runs of the same story) are dropped first.
+        Returns the number of rows added.
+        """
+        run_id = run_id or new_run_id()
+        header = [RUN_ID_COLUMN] + list(header)
+        rows = [[run_id] + list(row) for row in rows]
+        with locked(path):
+            self._append(path, header, rows, set(replace or ()))
+        return len(rows)
+
+    def _append(self, path, header, rows, replace):
+        """Rewrites the file with `rows` added (called under the lock). CsvSink appends in place."""
+        if os.path.exists(path):
+            old_header, old_rows = self._read(path)
+            if replace and RUN_ID_COLUMN in old_header:
+                column = old_header.index(RUN_ID_COLUMN)
+                old_rows = (row for row in old_rows if row[column] not in replace)
+            target = _widen(old_header, header)
+            combined = chain(_align(old_header, old_rows, target), _align(header, rows, target))
+            header = target
+        else:
+            combined = iter(rows)
+        with atomic_path(path) as tmp:
+            self._write(tmp, header, combined)
+
+    def read(self, path):
+        """(header, list of rows) of a file this sink wrote."""
+        header, rows = self._read(path)
+        return header, list(rows)
+
+    def _write(self, path, header, rows):
+        raise NotImplementedError
+
+    def _read(self, path):
+        raise NotImplementedError
+
+class CsvSink(Sink):
+    extension = "csv"
+    media_type = "text/csv; charset=utf-8"
+
+    def _write(self, path, header, rows):
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    def _append(self, path, header, rows, replace):
+        """Adds the rows to the end of the file; only a new file, a new column or `replace` rewrites it."""
+        old_header = self._read(path)[0] if os.path.exists(path) else []
+        if not old_header or replace or _widen(old_header, header) != old_header:
+            return super()._append(path, header, rows, replace)
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(_align(header, rows, old_header))
+        with open(path, "a", encoding="utf-8", newline="") as f:
+            size = f.tell()
+            try:
+                f.write(buffer.getvalue())
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException:
+                # Don't leave part of this run behind (a crash mid-write still can)
+                f.truncate(size)
+                raise
+
+    def _read(self, path):
+        def rows():
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                yield from reader
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            header = next(csv.reader(f), [])
+        return header, rows()
+
+class XlsxSink(Sink):
+    """Excel workbook (needs openpyxl). Written and read in openpyxl's streaming modes."""
+    extension = "xlsx"
+    media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    sheet = "Test Cases"
+
+    def _write(self, path, header, rows):
+        openpyxl = _require("openpyxl", "openpyxl", "XLSX")
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet(self.sheet)
+        sheet.append(header)
+        for row in rows:
+            sheet.append(row)
+        workbook.save(path)
+
+    def _read(self, path):
+        openpyxl = _require("openpyxl", "openpyxl", "XLSX")
+        workbook = openpyxl.load_workbook(path, read_only=True)
+        values = workbook.worksheets[0].iter_rows(values_only=True)
+        header = ["" if cell is None else str(cell) for cell in next(values, ())]
+
+        def rows():
+            try:
+                for row in values:
+                    yield ["" if cell is None else str(cell) for cell in row]
+            finally:
+                workbook.close()
+        return header, rows()
+
+class ParquetSink(Sink):
+    """Parquet file of string columns (needs pyarrow), written one row group per chunk."""
+    extension = "parquet"
+    media_type = "application/vnd.apache.parquet"
+    chunk_rows = 10_000
+
+    def _write(self, path, header, rows):
+        pa = _require("pyarrow", "pyarrow", "Parquet")
+        pq = _require("pyarrow.parquet", "pyarrow", "Parquet")
+        schema = pa.schema([(name, pa.string()) for name in header])
+
+        def flush(writer, chunk):
+            columns = [[str(row[i]) for row in chunk] for i in range(len(header))]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+        with pq.ParquetWriter(path, schema) as writer:
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= self.chunk_rows:
+                    flush(writer, chunk)
+                    chunk = []
+            if chunk:
+                flush(writer, chunk)
+
+    def _read(self, path):
+        pq = _require("pyarrow.parquet", "pyarrow", "Parquet")
+        parquet = pq.ParquetFile(path)
+        header = list(parquet.schema_arrow.names)
+
+        def rows():
+            for batch in parquet.iter_batches(batch_size=self.chunk_rows):
+                yield from (list(row) for row in zip(*(column.to_pylist() for column in batch.columns)))
+        return header, rows()
+
+SINKS = {sink.extension: sink for sink in (CsvSink, XlsxSink, ParquetSink)}
+
+def get_sink(fmt):
+    """Sink for a format name ("csv", "xlsx", "parquet"); ValueError for anything else."""
+    key = str(fmt or "").lower().lstrip(".")
+    if key not in SINKS:
+        raise ValueError(f"Unknown output format '{fmt}'. Choose one of: {', '.join(SINKS)}.")
+    return SINKS[key]()
+
+def sink_for_path(path):
+    """Sink matching a file's extension."""
+    return get_sink(os.path.splitext(path)[1])
+
+def media_type(path):
+    """Content type for serving a file written by one of the sinks."""
+    try:
+        return sink_for_path(path).media_type
+    except ValueError:
+        return Sink.media_type
@@ -0,0 +1,40 @@
+from difflib import SequenceMatcher
+
+def similarity(a, b):
+    """0.0 - 1.0 text similarity (difflib ratio, whitespace-normalized)."""
+    a = " ".join((a or "").split())
+    b = " ".join((b or "").split())
+    if not a and not b:
+        return 1.0
+    matcher = SequenceMatcher(None, a, b)
+    # quick_ratio() is an upper bound and much cheaper; skip the full diff when it already says "different"
+    if matcher.quick_ratio() < 0.5:
+        return matcher.quick_ratio()
+    return matcher.ratio()
+
+class ProgressTracker:
+    """
+    Remembers every rejected draft and its feedback per Test Case ID and
+    reports when a case stops converging:
+    - the Author returned a draft nearly identical to an earlier one (covers A -> B -> A), or
+    - the Auditor returned essentially the same feedback twice in a row.
+    """
+
+    def __init__(self, draft_threshold=0.95, feedback_threshold=0.9):
+        self.draft_threshold = draft_threshold
+        self.feedback_threshold = feedback_threshold
+        self.history = {}
+
+    def record(self, tc_id, draft, feedback):
+        """Stores one rejected attempt. Returns a no-progress reason or None."""
+        previous = self.history.setdefault(tc_id, [])
+        reason = None
+        if previous:
+            draft_sim = max(similarity(draft, old_draft) for old_draft, _ in previous)
+            feedback_sim = similarity(feedback, previous[-1][1])
+            if draft_sim >= self.draft_threshold:
+                reason = f"Author returned a near-identical draft (similarity {draft_sim:.2f})"
+            elif feedback_sim >= self.feedback_threshold:
+                reason = f"Auditor repeated the same feedback (similarity {feedback_sim:.2f})"
+        previous.append((draft, feedback))
+        return reason
@@ -0,0 +1,134 @@
+import re
+import math
+
+# Rough tokenizer-free estimate: ~4 characters per token for English prose.
+# Good enough for budgeting; we never need the exact count the server sees.
+CHARS_PER_TOKEN = 4
+
+WORD = re.compile(r"[a-z0-9]{3,}")
+STOPWORDS = {"the", "and", "for", "with", "that", "this", "are", "was", "from", "must", "will",
+             "should", "when", "then", "user", "test", "case"}
+
+def count_tokens(text):
+    return math.ceil(len(str(text or "")) / CHARS_PER_TOKEN)
+
+def prompt_tokens(prompt, inputs):
+    """Tokens of the fully rendered prompt (falls back to the raw inputs if rendering fails)."""
+    try:
+        return count_tokens(prompt.format(**inputs))
+    except Exception:
+        return count_tokens(" ".join(str(v) for v in inputs.values()))
+
+def _paragraphs(text):
+    return [p for p in re.split(r"\n\s*\n", text or "") if p.strip()]
+
+def dedupe(text):
+    """Drops whole paragraphs repeated verbatim (whitespace and case aside), keeping first occurrences."""
+    seen = set()
+    kept = []
+    for paragraph in _paragraphs(text):
+        key = " ".join(paragraph.split()).lower()
+        if key not in seen:
+            seen.add(key)
+            kept.append(paragraph)
+    return "\n\n".join(kept)
+
+def _keywords(text):
+    return {w for w in WORD.findall((text or "").lower()) if w not in STOPWORDS}
+
+def trim_context(context, focus, max_tokens):
+    """
+    Keeps the paragraphs most relevant to `focus` (keyword overlap) that fit in
+    max_tokens, in their original order. Section headers like 'USER PROVIDED RULES:'
+    always survive.
+    """
+    paragraphs = _paragraphs(context)
+    focus_words = _keywords(focus)
+
+    def score(paragraph):
+        if paragraph.strip().endswith(":") or re.match(r"^[A-Z ]+:", paragraph.strip()):
+            return float("inf")
+        words = _keywords(paragraph)
+        return len(words & focus_words) / (1 + math.log(1 + len(words)))
+
+    ranked = sorted(range(len(paragraphs)), key=lambda i: score(paragraphs[i]), reverse=True)
+    keep = set()
+    used = 0
+    for i in ranked:
+        cost = count_tokens(paragraphs[i]) + 1
+        if used + cost <= max_tokens:
+            keep.add(i)
+            used += cost
+    return "\n\n".join(paragraphs[i] for i in sorted(keep))
+
+def focus_previous_draft(previous_draft, feedback):
+    """
+    Diff-only view of a rejected draft: keeps the ID/Title lines plus the sections
+    the feedback points at, and marks the rest as unchanged.
+    """
+    sections = re.split(r"\n(?=\s*(?:\*\*)?(?:Title|Pre-conditions|Steps|Expected Results?)\s*:)",
+                        previous_draft or "", flags=re.IGNORECASE)
+    feedback_lower = (feedback or "").lower()
+    kept = []
+    omitted = 0
+    for section in sections:
+        label = section.strip().split(":", 1)[0].strip("* ").lower()
+        if label in ("test case id", "title") or label.rstrip("s") in feedback_lower or label in feedback_lower:
+            kept.append(section.strip())
+        else:
+            omitted += 1
+    if omitted:
+        kept.append(f"({omitted} section(s) unchanged and omitted - keep them as they were)")
+    return "\n".join(kept)
+
+def enforce_budget(prompt, inputs, budget, focus="", context_field="context"):
+    """
+    Measures the rendered prompt and, when it is over `budget` tokens, applies
+    extractive compression in order of increasing loss:
+      1. dedupe the context (repeated paragraphs only; drafts and feedback are never deduped)
+      2. diff-only previous draft (sections named by the feedback)
+      3. drop low-relevance context paragraphs
+      4. hard-truncate the context
+    Returns (inputs, report) where report = {"before", "after", "budget", "steps"}.
+    """
+    before = prompt_tokens(prompt, inputs)
+    report = {"before": before, "after": before, "budget": budget, "steps": []}
+    if not budget or before <= budget:
+        return inputs, report
+
+    inputs = dict(inputs)
+
+    def over():
+        return prompt_tokens(prompt, inputs) - budget
+
+    if isinstance(inputs.get(context_field), str) and inputs[context_field] not in ("", "None"):
+        inputs[context_field] = dedupe(inputs[context_field])
+        report["steps"].append("dedupe")
+
+    if over() > 0 and inputs.get("previous_draft") not in (None, "", "None"):
+        inputs["previous_draft"] = focus_previous_draft(inputs["previous_draft"], inputs.get("feedback", ""))
+        report["steps"].append("diff-previous-draft")
+
+    excess = over()
+    if excess > 0 and inputs.get(context_field):
+        allowed = max(0, count_tokens(inputs[context_field]) - excess)
+        inputs[context_field] = trim_context(inputs[context_field], focus, allowed)
+        report["steps"].append("trim-context")
+
+    excess = over()
+    if excess > 0 and inputs.get(context_field):
+        keep_chars = max(0, len(inputs[context_field]) - excess * CHARS_PER_TOKEN)
+        inputs[context_field] = inputs[context_field][:keep_chars]
+        report["steps"].append("truncate-context")
+
+    report["after"] = prompt_tokens(prompt, inputs)
+    return inputs, report
+
+def log_budget(role, report):
+    """Prints what enforce_budget did, and a warning when the prompt is still over budget."""
+    if report["steps"]:
+        print(f"   [BUDGET] {role.upper()} prompt {report['before']} -> {report['after']} tokens "
+              f"(budget {report['budget']}: {', '.join(report['steps'])})")
+    if report["budget"] and report["after"] > report["budget"]:
+        print(f"   [BUDGET] {role.upper()} prompt is {report['after']} tokens, "
+              f"{report['after'] - report['budget']} over budget with nothing left to compress. Sending it anyway.")
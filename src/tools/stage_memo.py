@@ -0,0 +1,101 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memo (
+    key         TEXT PRIMARY KEY,
+    stage       TEXT NOT NULL,
+    data        TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    used_at     REAL NOT NULL
+);
+DROP TABLE IF EXISTS memo_deps;
+"""
+
+def content_key(stage, *parts):
+    """
+    Content address of a stage output: the stage name plus everything the output
+    was computed from. Change any part and the key (so the cached entry) changes.
+    """
+    digest = hashlib.sha256(stage.encode("utf-8"))
+    for part in parts:
+        digest.update(b"\x00")
+        digest.update(str(part).encode("utf-8"))
+    return f"{stage}:{digest.hexdigest()[:40]}"
+
+class MemoStore:
+    """
+    SQLite-backed stage outputs shared by every request (unlike checkpoints, which
+    belong to one run). Nothing is ever invalidated: a key covers everything its value
+    was computed from (for KB-derived stages, the knowledge base fingerprint), so a
+    changed input simply misses and stale entries age out through prune().
+    """
+
+    def __init__(self, path, max_age_days=30):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+        if max_age_days:
+            self.prune(max_age_days * 86400)
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:  # commits, or rolls back on error
+                yield db
+        finally:
+            db.close()
+
+    def get(self, key):
+        """The stored value, or None. A hit counts as a use (see prune)."""
+        with self._lock, self._connect() as db:
+            row = db.execute("SELECT data FROM memo WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE memo SET used_at = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, stage, value):
+        now = time.time()
+        with self._lock, self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO memo (key, stage, data, created_at, used_at) VALUES (?, ?, ?, ?, ?)",
+                       (key, stage, json.dumps(value), now, now))
+
+    def prune(self, max_age_s):
+        """Forgets entries not used for `max_age_s` seconds."""
+        cutoff = time.time() - max_age_s
+        with self._lock, self._connect() as db:
+            removed = db.execute("DELETE FROM memo WHERE used_at < ?", (cutoff,)).rowcount
+        return removed
+
+    def stats(self):
+        """Entry count per stage."""
+        with self._lock, self._connect() as db:
+            rows = db.execute("SELECT stage, COUNT(*) FROM memo GROUP BY stage").fetchall()
+        return dict(rows)
+
+class Memo:
+    """Stage memo as seen by one request. With store=None every call is a no-op (memoization off)."""
+
+    def __init__(self, store=None):
+        self.store = store
+
+    @property
+    def enabled(self):
+        return self.store is not None
+
+    def get(self, key):
+        return self.store.get(key) if self.store else None
+
+    def put(self, key, stage, value):
+        if self.store:
+            self.store.put(key, stage, value)
@@ -0,0 +1,146 @@
+import re
+from functools import lru_cache
+
+# Canonical section -> headings that introduce it (case-insensitive).
+# Extra aliases can be supplied per call (see config.STORY_HEADING_ALIASES).
+DEFAULT_HEADING_ALIASES = {
+    "feature": ["feature", "user story", "story", "epic"],
+    "background": ["background", "context", "description", "business rules", "rules"],
+    "acceptance": ["acceptance criteria", "acceptance criterion", "ac", "criteria"],
+    "scenarios": ["scenarios", "test scenarios", "scenario list", "scenario", "scenario outline"],
+}
+
+# Gherkin headings that name ONE scenario inline ("Scenario: Valid login"); the lines
+# under them are its steps, not a list of scenarios
+GHERKIN_SCENARIO = ("scenario", "scenario outline")
+
+# Sections that end up in the 'Rules' half of the split
+RULE_SECTIONS = ("feature", "background", "acceptance")
+
+LIST_ITEM = re.compile(r"^\s*(?:\d+[.)]|[-*])\s+(.*\S)\s*$")
+
+def _merge_aliases(aliases):
+    """Returns a hashable {section: names} view of defaults + extra aliases."""
+    merged = {section: list(names) for section, names in DEFAULT_HEADING_ALIASES.items()}
+    for section, names in (aliases or {}).items():
+        merged.setdefault(section, []).extend(names)
+    return tuple((section, tuple(n.lower() for n in names)) for section, names in merged.items())
+
+@lru_cache(maxsize=16)
+def _heading_pattern(aliases):
+    """One regex that matches any known heading, longest alias first."""
+    names = sorted({n for _, group in aliases for n in group}, key=len, reverse=True)
+    alternation = "|".join(re.escape(n) for n in names)
+    return re.compile(rf"^\s*(?:#+\s*)?(?:\*\*)?({alternation})(?:\*\*)?\s*:\s*(.*)$", re.IGNORECASE)
+
+def _section_for(heading, aliases):
+    heading = heading.lower()
+    for section, names in aliases:
+        if heading in names:
+            return section
+    return None
+
+def split_sections(text, aliases=None):
+    """
+    Splits a story into [(section, heading_line, body_lines)] in document order.
+    The heading line keeps any inline text ("Feature: User Login").
+    Text before the first heading is returned under section None.
+    """
+    aliases = _merge_aliases(aliases)
+    pattern = _heading_pattern(aliases)
+
+    sections = [(None, "", [])]
+    for line in text.splitlines():
+        match = pattern.match(line)
+        if match:
+            sections.append((_section_for(match.group(1), aliases), line.strip(), []))
+        else:
+            sections[-1][2].append(line)
+    return [(s, h, body) for s, h, body in sections if s is not None or any(l.strip() for l in body)]
+
+def extract_list_items(lines):
+    """
+    Returns (items, stray_lines) from a numbered/bulleted block.
+    Indented continuation lines are joined onto the previous item.
+    """
+    items = []
+    stray = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        match = LIST_ITEM.match(line)
+        if match:
+            items.append(match.group(1).strip())
+        elif items and line[:1].isspace():
+            items[-1] = f"{items[-1]} {line.strip()}"
+        else:
+            stray += 1
+    return items, stray
+
+def inline_items(text):
+    """Scenarios listed on the heading line itself: "Scenarios: login; logout" (or commas)."""
+    separator = ";" if ";" in text else ","
+    return [item.strip() for item in text.split(separator) if item.strip()]
+
+def gherkin_scenario(title, lines):
+    """One Gherkin scenario as a single line: its title, then its steps."""
+    steps = [line.strip() for line in lines if line.strip()]
+    return f"{title}: {'; '.join(steps)}" if steps else title
+
+def _scenarios_in(heading, body, aliases):
+    """(scenarios, stray line count) of one scenarios section."""
+    match = _heading_pattern(_merge_aliases(aliases)).match(heading)
+    name, inline = match.group(1).lower(), match.group(2).strip()
+    if inline and name in GHERKIN_SCENARIO:
+        return [gherkin_scenario(inline, body)], 0
+    items, stray = extract_list_items(body)
+    return inline_items(inline) + items if inline else items, stray
+
+def parse_story(text, aliases=None):
+    """
+    Zero-LLM parser for stories laid out as Feature / Background /
+    Acceptance Criteria / Scenarios, or written in Gherkin (one "Scenario:" per case).
+    Returns {"rules", "scenarios", "confidence"}; confidence is 0.0 when
+    no scenario list could be found.
+    """
+    result = {"rules": "", "scenarios": [], "confidence": 0.0}
+    if not text or not text.strip():
+        return result
+
+    sections = split_sections(text, aliases)
+    found = {s for s, _, _ in sections}
+    if "scenarios" not in found:
+        return result
+
+    rule_blocks = []
+    scenarios = []
+    stray_lines = 0
+    for section, heading, body in sections:
+        if section == "scenarios":
+            items, stray = _scenarios_in(heading, body, aliases)
+            scenarios.extend(items)
+            stray_lines += stray
+        elif section in RULE_SECTIONS:
+            rule_blocks.append("\n".join([heading] + body).strip())
+        else:
+            # Preamble or unknown text: keep it as rules but trust the layout less
+            rule_blocks.append("\n".join(body).strip())
+            stray_lines += 1
+
+    if not scenarios:
+        return result
+
+    confidence = 0.6
+    if "feature" in found:
+        confidence += 0.2
+    if "background" in found or "acceptance" in found:
+        confidence += 0.1
+    if stray_lines == 0:
+        confidence += 0.1
+    else:
+        confidence -= min(0.3, 0.1 * stray_lines)
+
+    result["rules"] = "\n\n".join(b for b in rule_blocks if b)
+    result["scenarios"] = scenarios
+    result["confidence"] = round(max(0.0, min(1.0, confidence)), 2)
+    return result
@@ -0,0 +1,428 @@
+"""
+Deterministic stand-in for an Ollama server, for offline end-to-end runs and benchmarks.
+
+Speaks the parts of the Ollama HTTP API the engine uses:
+  POST /api/chat, /api/generate   (streaming NDJSON or a single JSON body)
+  POST /api/embed, /api/embeddings
+  GET  /api/tags, /api/ps, /api/version, /
+  GET  /stub/stats                 (request counts and simulated timings)
+
+Responses come from a script (regex rules, see ScriptedResponder) or, when no rule
+matches, from built-in responders that recognise each TRACE agent's prompt and answer
+in the format that agent expects. Latency (time to first token), generation speed
+(tokens/s) and model load time are configurable and seeded, so runs are repeatable.
+
+Run standalone:  python src/tools/stub_ollama.py --port 11435 --latency uniform:0.05,0.2 --tokens-per-s 80
+Then point the engine at it with OLLAMA_HOST=http://127.0.0.1:11435
+"""
+import re
+import sys
+import json
+import math
+import time
+import zlib
+import random
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+DEFAULT_KEEP_ALIVE = 300
+EMBEDDING_DIM = 768   # nomic-embed-text
+
+def parse_latency(spec):
+    """
+    'fixed:0.2' | 'uniform:0.1,0.5' | 'normal:0.2,0.05' | 'lognormal:-1.5,0.4' (seconds).
+    Returns a function rng -> seconds (never negative).
+    """
+    if spec in (None, "", 0, "0"):
+        return lambda rng: 0.0
+    if isinstance(spec, (int, float)):
+        return lambda rng: float(spec)
+    kind, _, args = str(spec).partition(":")
+    values = [float(v) for v in args.split(",") if v.strip()]
+    samplers = {
+        "fixed": lambda rng: values[0],
+        "uniform": lambda rng: rng.uniform(values[0], values[1]),
+        "normal": lambda rng: rng.gauss(values[0], values[1]),
+        "lognormal": lambda rng: rng.lognormvariate(values[0], values[1]),
+    }
+    if kind not in samplers:
+        raise ValueError(f"Unknown latency distribution '{kind}'. Use one of: {', '.join(samplers)}.")
+    sampler = samplers[kind]
+    return lambda rng: max(0.0, sampler(rng))
+
+def parse_duration(value):
+    """Ollama keep_alive: '30m', '10s', '1h', seconds as a number, or negative for forever."""
+    if value is None:
+        return DEFAULT_KEEP_ALIVE
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.fullmatch(r"\s*(-?\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*", str(value))
+    if not match:
+        return DEFAULT_KEEP_ALIVE
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, None: 1}[match.group(2)]
+    return float(match.group(1)) * scale
+
+def count_tokens(text):
+    """Same rough estimate the engine budgets with (~4 chars per token)."""
+    return max(1, math.ceil(len(text or "") / 4))
+
+def embed_text(text, dim=EMBEDDING_DIM):
+    """Hashed bag-of-words vector: deterministic, and similar texts land close together."""
+    vector = [0.0] * dim
+    for word in re.findall(r"[a-z0-9]+", (text or "").lower()):
+        bucket = zlib.crc32(word.encode("utf-8"))
+        vector[bucket % dim] += 1.0 if bucket & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+# ---------------------------------------------------------------------------
+# Built-in responders, one per TRACE agent prompt
+# ---------------------------------------------------------------------------
+
+def _quoted_after(label, prompt):
+    match = re.search(re.escape(label) + r'[^\n]*\n\s*"(.*?)"\s*\n', prompt, re.DOTALL)
+    return match.group(1).strip() if match else ""
+
+def _author_response(prompt):
+    topic = _quoted_after("SCENARIO TO AUTOMATE", prompt) or "Scenario"
+    return ("--- THOUGHTS ---\n* (Strategy: stub maps the scenario to the business rules.)\n--- END THOUGHTS ---\n\n"
+            f"Test Case ID: TC_01\nTitle: {topic}\nPre-conditions: The application is available.\n"
+            f"Steps:\n1. Open the application.\n2. Perform: {topic}\n"
+            "Expected Result: The system behaves as the acceptance criteria describe.")
+
+def _auditor_response(prompt):
+    drafts = prompt.split("Draft Test Cases:", 1)[-1]
+    ids = list(dict.fromkeys(re.findall(r"Test Case ID:\s*\[?(TC_\d+(?:_\d+)?)", drafts)))
+    verdicts = "\n".join(f"{tc_id}: APPROVED" for tc_id in ids)
+    return ("--- ANALYSIS ---\n* (Scope: stub checked every scenario.)\n--- END ANALYSIS ---\n\n"
+            f"STATUS: APPROVED\nVERDICTS:\n{verdicts}\nFEEDBACK: None")
+
+def _archivist_response(prompt):
+    question = prompt.rsplit("User Question:", 1)[-1]
+    if "Check database for EXISTING" in question:
+        return "NO_EXISTING_TESTS: The stub knowledge base has no matching test cases."
+    return "The requirements state the behaviour described in the loaded documentation."
+
+def _manager_response(prompt):
+    text = prompt.rsplit("INPUT TEXT:", 1)[-1].strip().strip('"').strip()
+    if text.endswith("?"):
+        return json.dumps({"intent": "QUESTION", "rules": "", "scenarios": []})
+    lines = [re.sub(r"^\s*(?:[-*]|\d+[.)])\s*", "", line).strip() for line in text.splitlines()]
+    scenarios = [line for line in lines if line] or [text]
+    return json.dumps({"intent": "REQUIREMENT", "rules": text, "scenarios": scenarios})
+
+def _scribe_response(prompt):
+    return 'ID,Title,Pre-conditions,Steps,Expected Result\nTC_01,Stub,None,"1. Step",Pass'
+
+BUILTIN_RESPONDERS = [
+    ("You are 'The Author'", _author_response),
+    ("You are 'The Auditor'", _auditor_response),
+    ("You are 'The Archivist'", _archivist_response),
+    ("Team Lead of a QA team", _manager_response),
+    ("You are 'The Scribe'", _scribe_response),
+]
+
+class ScriptedResponder:
+    """
+    Picks the reply for a prompt. Script format (JSON):
+      {"rules": [{"match": "regex", "model": "optional exact name",
+                  "response": "text" | ["first", "second", ...], "times": optional max uses}],
+       "models": {"name": {"latency": "uniform:0.1,0.3", "tokens_per_s": 40, "load_seconds": 2}}}
+    A list response is served in order (the last entry repeats). Unmatched prompts go
+    to the built-in agent responders, then to a plain 'OK'.
+    """
+
+    def __init__(self, script=None):
+        script = script or {}
+        self.rules = [dict(rule, used=0, pattern=re.compile(rule["match"], re.DOTALL))
+                      for rule in script.get("rules", [])]
+        self.models = script.get("models", {})
+        self._lock = threading.Lock()
+
+    def reply(self, model, prompt):
+        with self._lock:
+            for rule in self.rules:
+                if rule.get("model") and rule["model"] != model:
+                    continue
+                if rule.get("times") is not None and rule["used"] >= rule["times"]:
+                    continue
+                if rule["pattern"].search(prompt):
+                    response = rule["response"]
+                    if isinstance(response, list):
+                        response = response[min(rule["used"], len(response) - 1)]
+                    rule["used"] += 1
+                    return response
+        for marker, responder in BUILTIN_RESPONDERS:
+            if marker in prompt:
+                return responder(prompt)
+        return "OK"
+
+# ---------------------------------------------------------------------------
+# HTTP server
+# ---------------------------------------------------------------------------
+
+def _now():
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "StubOllama/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.stub.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b"{}"
+        try:
+            return json.loads(raw or b"{}")
+        except ValueError:
+            return None
+
+    def do_GET(self):
+        stub = self.server.stub
+        if self.path in ("/", ""):
+            body = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path == "/api/version":
+            self._send_json({"version": "0.0.0-stub"})
+        elif self.path == "/api/tags":
+            self._send_json({"models": [{"name": m, "model": m} for m in sorted(stub.known_models())]})
+        elif self.path == "/api/ps":
+            self._send_json({"models": [{"name": m, "model": m} for m in sorted(stub.loaded_models())]})
+        elif self.path == "/stub/stats":
+            self._send_json(stub.stats())
+        else:
+            self._send_json({"error": f"unknown path {self.path}"}, status=404)
+
+    def do_POST(self):
+        payload = self._read_json()
+        if payload is None:
+            return self._send_json({"error": "invalid JSON body"}, status=400)
+        routes = {
+            "/api/chat": self._generate,
+            "/api/generate": self._generate,
+            "/api/embed": self._embed,
+            "/api/embeddings": self._embed,
+        }
+        handler = routes.get(self.path)
+        if handler is None:
+            return self._send_json({"error": f"unknown path {self.path}"}, status=404)
+        handler(payload)
+
+    def _embed(self, payload):
+        stub = self.server.stub
+        model = payload.get("model", "")
+        if self.path == "/api/embeddings":
+            stub.count("/api/embeddings", model)
+            return self._send_json({"embedding": embed_text(payload.get("prompt", ""), stub.embedding_dim)})
+        texts = payload.get("input", "")
+        texts = [texts] if isinstance(texts, str) else list(texts)
+        stub.count("/api/embed", model, texts=len(texts))
+        self._send_json({"model": model, "embeddings": [embed_text(t, stub.embedding_dim) for t in texts],
+                         "prompt_eval_count": sum(count_tokens(t) for t in texts)})
+
+    def _generate(self, payload):
+        stub = self.server.stub
+        chat = self.path == "/api/chat"
+        model = payload.get("model", "")
+        if chat:
+            prompt = "\n".join(str(m.get("content", "")) for m in payload.get("messages", []))
+        else:
+            prompt = "\n".join(filter(None, [payload.get("system"), payload.get("prompt")]))
+
+        load_seconds = stub.load(model, payload.get("keep_alive"))
+        settings = stub.model_settings(model)
+        first_token = settings["latency"](stub.rng())
+        text = stub.responder.reply(model, prompt)
+        if payload.get("options", {}).get("num_predict") == 1:
+            text = text.split()[0] if text.split() else text
+        prompt_tokens = count_tokens(prompt)
+        eval_tokens = count_tokens(text)
+        stub.count(self.path, model, prompt_tokens=prompt_tokens, eval_tokens=eval_tokens)
+
+        time.sleep(load_seconds + first_token)
+        started = time.perf_counter()
+        pieces = re.findall(r"\S+\s*|\s+", text) or [""]
+        tokens_per_s = settings["tokens_per_s"]
+
+        def chunk(piece, done=False):
+            base = {"model": model, "created_at": _now(), "done": done}
+            if chat:
+                base["message"] = {"role": "assistant", "content": piece}
+            else:
+                base["response"] = piece
+            return base
+
+        def final():
+            eval_ns = int((time.perf_counter() - started) * 1e9)
+            return {**chunk("", done=True), "done_reason": "stop",
+                    "total_duration": int((load_seconds + first_token) * 1e9) + eval_ns,
+                    "load_duration": int(load_seconds * 1e9),
+                    "prompt_eval_count": prompt_tokens, "prompt_eval_duration": int(first_token * 1e9),
+                    "eval_count": eval_tokens, "eval_duration": eval_ns}
+
+        if payload.get("stream", True) is False:
+            if tokens_per_s:
+                time.sleep(eval_tokens / tokens_per_s)
+            body = final()
+            if chat:
+                body["message"]["content"] = text
+            else:
+                body["response"] = text
+            return self._send_json(body)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        for piece in pieces:
+            if tokens_per_s:
+                time.sleep(count_tokens(piece) / tokens_per_s)
+            self.wfile.write((json.dumps(chunk(piece)) + "\n").encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write((json.dumps(final()) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+class StubOllamaServer:
+    """
+    In-process stub server. Use as a context manager or call start()/stop().
+    latency: time-to-first-token distribution (see parse_latency).
+    tokens_per_s: streaming speed (None = instant).
+    load_seconds: simulated load time when a model isn't loaded (honours keep_alive).
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, script=None, latency=None, tokens_per_s=None,
+                 load_seconds=0.0, seed=0, embedding_dim=EMBEDDING_DIM, verbose=False):
+        self.responder = ScriptedResponder(script)
+        self.latency = parse_latency(latency)
+        self.tokens_per_s = tokens_per_s
+        self.load_seconds = load_seconds
+        self.embedding_dim = embedding_dim
+        self.verbose = verbose
+        self._seed = seed
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._loaded = {}   # model -> expiry (perf_counter) or None for forever
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def rng(self):
+        """Per-thread RNG seeded from the server seed, so latencies are repeatable per run."""
+        if not hasattr(self._local, "rng"):
+            with self._lock:
+                self._seed += 1
+                self._local.rng = random.Random(self._seed)
+        return self._local.rng
+
+    def model_settings(self, model):
+        override = self.responder.models.get(model, {})
+        return {
+            "latency": parse_latency(override["latency"]) if "latency" in override else self.latency,
+            "tokens_per_s": override.get("tokens_per_s", self.tokens_per_s),
+            "load_seconds": override.get("load_seconds", self.load_seconds),
+        }
+
+    def load(self, model, keep_alive):
+        """Marks `model` loaded for keep_alive; returns the simulated load time for this call."""
+        keep = parse_duration(keep_alive)
+        now = time.perf_counter()
+        with self._lock:
+            expiry = self._loaded.get(model, 0)
+            cold = model not in self._loaded or (expiry is not None and expiry < now)
+            if keep == 0:
+                self._loaded.pop(model, None)
+            else:
+                self._loaded[model] = None if keep < 0 else now + keep
+        return self.model_settings(model)["load_seconds"] if cold else 0.0
+
+    def loaded_models(self):
+        now = time.perf_counter()
+        with self._lock:
+            return [m for m, expiry in self._loaded.items() if expiry is None or expiry >= now]
+
+    def known_models(self):
+        with self._lock:
+            return {model for (_, model) in self._counts} | set(self.responder.models)
+
+    def count(self, path, model, **numbers):
+        with self._lock:
+            entry = self._counts.setdefault((path, model), {"requests": 0})
+            entry["requests"] += 1
+            for key, value in numbers.items():
+                entry[key] = entry.get(key, 0) + value
+
+    def stats(self):
+        """{path: {model: {"requests", "prompt_tokens", "eval_tokens", ...}}}"""
+        with self._lock:
+            report = {}
+            for (path, model), entry in self._counts.items():
+                report.setdefault(path, {})[model] = dict(entry)
+            return report
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic stub Ollama server for offline runs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--script", help="JSON file with response rules and per-model settings")
+    parser.add_argument("--latency", default="fixed:0", help="time to first token, e.g. uniform:0.05,0.2")
+    parser.add_argument("--tokens-per-s", type=float, default=None)
+    parser.add_argument("--load-seconds", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script, "r", encoding="utf-8") as f:
+            script = json.load(f)
+
+    server = StubOllamaServer(args.host, args.port, script=script, latency=args.latency,
+                              tokens_per_s=args.tokens_per_s, load_seconds=args.load_seconds,
+                              seed=args.seed, verbose=args.verbose)
+    print(f"Stub Ollama listening on {server.url} (set OLLAMA_HOST={server.url})")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+if __name__ == "__main__":
+    sys.exit(main())
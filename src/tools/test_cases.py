@@ -0,0 +1,152 @@
+import io
+import re
+import csv
+
+# Column order of every CSV we publish
+CSV_HEADER = ["ID", "Title", "Pre-conditions", "Steps", "Expected Result"]
+
+# Fields a test case must fill in to be usable
+REQUIRED_FIELDS = ("ID", "Title", "Steps", "Expected Result")
+
+# Labels the Author emits (and common variants) -> CSV column
+FIELD_LABELS = {
+    "test case id": "ID",
+    "tc id": "ID",
+    "title": "Title",
+    "pre-conditions": "Pre-conditions",
+    "preconditions": "Pre-conditions",
+    "pre-condition": "Pre-conditions",
+    "pre-requisites": "Pre-conditions",
+    "steps": "Steps",
+    "test steps": "Steps",
+    "expected result": "Expected Result",
+    "expected results": "Expected Result",
+}
+
+_LABEL_NAMES = "|".join(re.escape(l) for l in sorted(FIELD_LABELS, key=len, reverse=True))
+LABEL_LINE = re.compile(rf"^\s*(?:[*#>-]\s*)*(?:\*\*)?({_LABEL_NAMES})(?:\*\*)?\s*:\s*(?:\*\*)?\s*(.*?)\s*$",
+                        re.IGNORECASE)
+
+def _clean_id(value):
+    return value.strip().strip("[]*").strip()
+
+def parse_test_cases(text):
+    """
+    Parses the Author's fixed layout into a list of dicts keyed by CSV_HEADER.
+    A new case starts at every 'Test Case ID:' line; unlabelled lines continue
+    the current field, so multi-line Steps and Expected Results are kept.
+    """
+    cases = []
+    current = None
+    field = None
+
+    for line in (text or "").splitlines():
+        match = LABEL_LINE.match(line)
+        if match:
+            field = FIELD_LABELS[match.group(1).lower()]
+            value = match.group(2)
+            if field == "ID":
+                current = {name: [] for name in CSV_HEADER}
+                cases.append(current)
+                value = _clean_id(value)
+            if current is not None and value:
+                current[field].append(value)
+        elif current is not None and field and line.strip() and not set(line.strip()) <= set("-=*_"):
+            current[field].append(line.strip())
+
+    return [{name: "\n".join(parts).strip() for name, parts in case.items()} for case in cases]
+
+def validate_test_cases(cases):
+    """Returns a list of problems (empty list means the parse is publishable)."""
+    if not cases:
+        return ["No test cases found in the draft."]
+
+    problems = []
+    seen = set()
+    for index, case in enumerate(cases, start=1):
+        label = case.get("ID") or f"Test case #{index}"
+        for name in REQUIRED_FIELDS:
+            if not case.get(name):
+                problems.append(f"{label}: missing '{name}'.")
+        if case.get("ID"):
+            if case["ID"] in seen:
+                problems.append(f"{label}: duplicate Test Case ID.")
+            seen.add(case["ID"])
+    return problems
+
+def cases_to_csv(cases):
+    """Serializes parsed cases with the csv module (quoting handled for us)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    for case in cases:
+        writer.writerow([case.get(name, "") for name in CSV_HEADER])
+    return buffer.getvalue()
+
+ID_LINE = re.compile(r"^([ \t]*(?:[*#>-][ \t]*)*(?:\*\*)?(?:test case id|tc id)(?:\*\*)?[ \t]*:[ \t]*(?:\*\*)?[ \t]*)(.*?)[ \t]*$",
+                     re.IGNORECASE | re.MULTILINE)
+
+def case_id(index):
+    """Stable ID for the Nth scenario (1-based): TC_01, TC_02, ..."""
+    return f"TC_{index:02d}"
+
+def extra_case_id(base_id, count):
+    """ID of the count-th case written for one scenario: base_id, then base_id_2, base_id_3..."""
+    return base_id if count == 1 else f"{base_id}_{count}"
+
+def owner_id(tc_id, base_ids):
+    """The base ID in `base_ids` that `tc_id` is, or is an extra case of (TC_01_2 -> TC_01); None otherwise."""
+    tc_id = _clean_id(str(tc_id)).upper()
+    for base in base_ids:
+        if tc_id == base.upper():
+            return base
+    for base in base_ids:
+        if re.fullmatch(rf"{re.escape(base.upper())}_\d+", tc_id):
+            return base
+    return None
+
+def assign_ids(draft, base_id):
+    """
+    Rewrites the 'Test Case ID:' lines of one scenario's draft to base_id.
+    Extra cases written for the same scenario become base_id_2, base_id_3...
+    Lines that already carry the right ID are left untouched.
+    """
+    count = 0
+
+    def _replace(match):
+        nonlocal count
+        count += 1
+        new_id = extra_case_id(base_id, count)
+        if _clean_id(match.group(2)) == new_id:
+            return match.group(0)
+        return f"{match.group(1)}{new_id}"
+
+    return ID_LINE.sub(_replace, draft or "")
+
+def stitch_drafts(drafts):
+    """Joins per-scenario drafts (already carrying their IDs) into one document."""
+    return "\n\n".join(d.strip() for d in drafts if d and d.strip())
+
+def pre_audit(drafts_by_id, scenarios_by_id):
+    """
+    Mechanical checks run before the Auditor model sees anything:
+    scenario coverage, required fields and ID uniqueness.
+    Returns {tc_id: feedback or None}; feedback is phrased for the Author.
+    """
+    results = {}
+    seen = {}
+    for tc_id, draft in drafts_by_id.items():
+        cases = parse_test_cases(draft)
+        if not cases:
+            problems = [f"No test case was written for scenario '{scenarios_by_id[tc_id]}'. "
+                        f"Write it using the 'Test Case ID: {tc_id}' layout."]
+        else:
+            problems = validate_test_cases(cases)
+            for case in cases:
+                if case["ID"] in seen and seen[case["ID"]] != tc_id:
+                    problems.append(f"{case['ID']}: ID already used by another test case.")
+                seen.setdefault(case["ID"], tc_id)
+
+        results[tc_id] = ("STATUS: REJECTED\nFEEDBACK: Pre-audit found mechanical defects:\n- "
+                          + "\n- ".join(problems)) if problems else None
+    return results
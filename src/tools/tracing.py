@@ -0,0 +1,194 @@
+import os
+import sys
+import json
+import time
+import uuid
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Active trace and span for the current request (copied into worker threads
+# together with the rest of the context, see Manager.draft_scenarios)
+_trace = contextvars.ContextVar("trace_trace", default=None)
+_span = contextvars.ContextVar("trace_span", default=None)
+
+# Called with every finished span dict (e.g. to feed metrics)
+_listeners = []
+
+def add_listener(callback):
+    """Registers callback(span_dict, trace) to run whenever a span ends."""
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+def remove_listener(callback):
+    if callback in _listeners:
+        _listeners.remove(callback)
+
+class Span:
+    """One timed stage. Attributes can be added while it runs with set()."""
+
+    def __init__(self, trace, name, parent_id, attributes):
+        self.trace = trace
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.status = "ok"
+        self.error = None
+        self._t0 = time.perf_counter()
+        self.duration_ms = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def to_dict(self):
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ms": round((self._t0 - self.trace.t0) * 1000, 3) if self.trace else 0.0,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+class Trace:
+    """All spans of one request, identified by trace_id."""
+
+    def __init__(self, name, attributes):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.attributes = dict(attributes)
+        self.started_at = time.time()
+        self.t0 = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            self.spans.append(span.to_dict())
+
+    def to_dict(self):
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start_ms"])
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": round(self.started_at, 3),
+            "duration_ms": round((time.perf_counter() - self.t0) * 1000, 3),
+            "attributes": self.attributes,
+            "spans": spans,
+        }
+
+def current_trace():
+    return _trace.get()
+
+def current_span():
+    return _span.get()
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Times a stage of the current trace. Nested spans get this one as parent.
+    Outside a trace it still times the block (listeners run) but nothing is exported.
+    """
+    trace = _trace.get()
+    parent = _span.get()
+    current = Span(trace, name, parent.span_id if parent else None, attributes)
+    token = _span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _span.reset(token)
+        current.duration_ms = round((time.perf_counter() - current._t0) * 1000, 3)
+        if trace is not None:
+            trace.add(current)
+        data = current.to_dict()
+        for listener in list(_listeners):
+            try:
+                listener(data, trace)
+            except Exception as e:
+                print(f"   [SYSTEM] Trace listener failed: {e}")
+
+@contextmanager
+def start_trace(name, export_path=None, **attributes):
+    """
+    Starts a new trace (with a root span of the same name) unless one is already
+    active, in which case this is just a nested span. On exit the whole trace is
+    appended to `export_path` as one JSON line.
+    """
+    if _trace.get() is not None:
+        with span(name, **attributes):
+            yield _trace.get()
+        return
+
+    trace = Trace(name, attributes)
+    token = _trace.set(trace)
+    try:
+        with span(name, **attributes):
+            yield trace
+    finally:
+        _trace.reset(token)
+        export_trace(trace, export_path)
+
+def export_trace(trace, path):
+    """Appends one trace as a JSON line. Never raises."""
+    if not path:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        line = json.dumps(trace.to_dict(), default=str)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        print(f"   [SYSTEM] Could not export trace: {e}")
+
+def summarize(path):
+    """
+    Where the time goes: per span name, count / total / average / p95 duration,
+    plus token totals for model calls. Returns rows sorted by total time.
+    """
+    by_name = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for s in json.loads(line)["spans"]:
+                entry = by_name.setdefault(s["name"], {"durations": [], "prompt_tokens": 0, "completion_tokens": 0})
+                entry["durations"].append(s["duration_ms"] or 0.0)
+                entry["prompt_tokens"] += s["attributes"].get("prompt_tokens") or 0
+                entry["completion_tokens"] += s["attributes"].get("completion_tokens") or 0
+
+    rows = []
+    for name, entry in by_name.items():
+        durations = sorted(entry["durations"])
+        rows.append({
+            "span": name,
+            "count": len(durations),
+            "total_s": round(sum(durations) / 1000, 3),
+            "avg_ms": round(sum(durations) / len(durations), 1),
+            "p95_ms": round(durations[min(len(durations) - 1, int(round(0.95 * (len(durations) - 1))))], 1),
+            "prompt_tokens": entry["prompt_tokens"],
+            "completion_tokens": entry["completion_tokens"],
+        })
+    return sorted(rows, key=lambda r: r["total_s"], reverse=True)
+
+def main():
+    """Summarize an export: python src/tools/tracing.py [data/logs/traces.jsonl]"""
+    default = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           "data", "logs", "traces.jsonl")
+    path = sys.argv[1] if len(sys.argv) > 1 else default
+    rows = summarize(path)
+    print(f"{'SPAN':<28}{'COUNT':>7}{'TOTAL s':>10}{'AVG ms':>10}{'P95 ms':>10}{'PROMPT TOK':>12}{'COMPL TOK':>11}")
+    for r in rows:
+        print(f"{r['span']:<28}{r['count']:>7}{r['total_s']:>10}{r['avg_ms']:>10}{r['p95_ms']:>10}"
+              f"{r['prompt_tokens']:>12}{r['completion_tokens']:>11}")
+
+if __name__ == "__main__":
+    main()
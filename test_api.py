@@ -0,0 +1,234 @@
+import sys
+import os
+import json
+import shutil
+import time
+import tempfile
+import threading
+import unittest
+import http.client
+import urllib.request
+import urllib.error
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+# Pre-import real langchain submodules (this file sorts before test_author.py) so the
+# stubs below only fill in for packages that are not installed.
+try:
+    import langchain_core.prompts      # noqa: F401
+    import langchain_core.output_parsers  # noqa: F401
+    import langchain_core.runnables    # noqa: F401
+    import langchain_ollama             # noqa: F401
+except ImportError:
+    pass
+
+# Stub heavy dependencies so api.py (and agents.manager) import without Ollama/ChromaDB
+for _mod in (
+    "langchain_chroma",
+    "chromadb",
+    "langchain_ollama",
+    "langchain_community",
+    "langchain_community.document_loaders",
+    "langchain_community.document_loaders.pdf",
+    "langchain_community.document_loaders.csv_loader",
+    "langchain_community.document_loaders.text",
+    "langchain_community.document_loaders.word_document",
+    "langchain_core",
+    "langchain_core.prompts",
+    "langchain_core.output_parsers",
+    "langchain_core.runnables",
+    "langchain_text_splitters",
+):
+    if _mod not in sys.modules:
+        sys.modules[_mod] = MagicMock()
+
+from api import JobServer
+from tools.jobs import Job, JobQueue, classify_result
+from tools.tracing import start_trace, span
+
+
+class _FakeManager:
+    """Runs two traced stages, waits for `gate`, then 'saves' a CSV like the Scribe."""
+
+    def __init__(self, gate=None, result=None):
+        self.scribe = MagicMock()
+        self.gate = gate
+        self.result = result
+        self.last_trace_id = None
+
+    def sync_knowledge(self):
+        pass
+
+    def process_request(self, story, max_attempts=None, session=None, sync=True, request_id=None):
+        with start_trace("process_request") as trace:
+            self.last_trace_id = trace.trace_id
+            with span("intent", intent="REQUIREMENT"):
+                pass
+            if self.gate is not None:
+                self.gate.wait(5)
+            with span("scribe"):
+                path = os.path.join(self.scribe.output_dir, "test_cases_1.csv")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(f"ID,Title\nTC_01,{story}\n")
+        return self.result or f"Workflow Complete.\n\nSuccess. File saved to: {path}"
+
+
+class TestJob(unittest.TestCase):
+
+    def test_lifecycle_and_events(self):
+        job = Job("story")
+        self.assertEqual(job.status, "queued")
+        job.start()
+        job.emit("span", name="intent")
+        job.finish("Duplicate detected. Stopping.")
+        self.assertEqual(job.status, "duplicate")
+        self.assertEqual([e["type"] for e in job.wait_events()], ["queued", "started", "span", "finished"])
+        self.assertEqual(job.wait_events(after=3, timeout=0.01), [])
+
+    def test_classify_result(self):
+        self.assertEqual(classify_result("Workflow Complete.\n\nSuccess. File saved to: /x.csv"), "completed")
+        self.assertEqual(classify_result("Error: Model call failed - down"), "failed")
+
+
+    def test_workers_share_one_knowledge_base_sync(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        syncs, sync_flags = [], []
+
+        class SyncingManager(_FakeManager):
+            def sync_knowledge(self):
+                syncs.append(threading.get_ident())
+                time.sleep(0.05)  # both workers start while the first sync is running
+
+            def process_request(self, story, sync=True, **kwargs):
+                sync_flags.append(sync)
+                return super().process_request(story, **kwargs)
+
+        jobs = JobQueue(SyncingManager, workers=2, output_dir=tmp).start()
+        self.addCleanup(jobs.stop, 1)
+        submitted = [jobs.submit(f"story {n}") for n in range(2)]
+        for job in submitted:
+            while not job.finished:
+                job.wait_events(len(job.events) - 1, timeout=1)
+        self.assertEqual([job.status for job in submitted], ["completed", "completed"])
+        self.assertEqual(len(syncs), 1)
+        self.assertEqual(sync_flags, [False, False])
+
+
+class TestJobApi(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.gate = threading.Event()
+        self.server = JobServer("127.0.0.1", 0, workers=1, output_dir=self.tmp, keepalive=0.2,
+                                manager_factory=lambda: _FakeManager(self.gate)).start()
+        self.addCleanup(self.server.stop)
+        self.addCleanup(self.gate.set)
+
+    def _request(self, path, body=None, content_type="application/json"):
+        data = None
+        if body is not None:
+            data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        request = urllib.request.Request(self.server.url + path, data=data,
+                                         headers={"Content-Type": content_type} if data is not None else {})
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, e.read()
+
+    def _submit(self, story="Login story"):
+        status, headers, body = self._request("/jobs", {"story": story})
+        self.assertEqual(status, 202)
+        job = json.loads(body)
+        self.assertEqual(headers["Location"], f"/jobs/{job['id']}")
+        return job
+
+    def test_submit_returns_before_the_job_finishes(self):
+        job = self._submit()
+        status, _, body = self._request(f"/jobs/{job['id']}")
+        self.assertEqual(status, 200)
+        self.assertIn(json.loads(body)["status"], ("queued", "running"))
+
+        # Only one worker: a second job waits in line
+        second = self._submit("Logout story")
+        self.assertEqual(second["position"], 1)
+
+        status, _, _ = self._request(f"/jobs/{job['id']}/artifact")
+        self.assertEqual(status, 409)
+
+    def test_events_stream_until_finished_then_artifact_is_served(self):
+        job = self._submit()
+        self.gate.set()
+        status, headers, body = self._request(f"/jobs/{job['id']}/events")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Type"], "text/event-stream")
+
+        events = [json.loads(line[len("data: "):]) for line in body.decode("utf-8").splitlines()
+                  if line.startswith("data: ")]
+        types = [e["type"] for e in events]
+        self.assertEqual(types[:2], ["queued", "started"])
+        self.assertEqual(types[-1], "finished")
+        self.assertEqual(events[-1]["status"], "completed")
+        self.assertIn("scribe", [e.get("name") for e in events])
+
+        status, _, body = self._request(f"/jobs/{job['id']}")
+        view = json.loads(body)
+        self.assertEqual(view["status"], "completed")
+        self.assertEqual(view["artifact"], "test_cases_1.csv")
+        self.assertTrue(view["trace_id"])
+
+        status, headers, body = self._request(f"/jobs/{job['id']}/artifact")
+        self.assertEqual(status, 200)
+        self.assertEqual(body.decode("utf-8"), "ID,Title\nTC_01,Login story\n")
+        self.assertIn("test_cases_1.csv", headers["Content-Disposition"])
+
+        # Resuming after the last event returns at once
+        status, _, body = self._request(f"/jobs/{job['id']}/events?after={events[-1]['seq']}")
+        self.assertNotIn(b"data: ", body)
+
+    def test_plain_text_submit_and_listing(self):
+        self.gate.set()
+        status, _, body = self._request("/jobs", b"Story as text", content_type="text/plain")
+        self.assertEqual(status, 202)
+        status, _, body = self._request("/jobs")
+        self.assertEqual(len(json.loads(body)["jobs"]), 1)
+        status, _, body = self._request("/health")
+        self.assertEqual(json.loads(body)["workers"], 1)
+
+    def test_bad_requests(self):
+        self.assertEqual(self._request("/jobs", {"story": "  "})[0], 400)
+        self.assertEqual(self._request("/jobs", b"{not json")[0], 400)
+        self.assertEqual(self._request("/jobs", {"story": "x", "max_attempts": 0})[0], 400)
+        self.assertEqual(self._request("/jobs", {"story": "x", "max_attempts": True})[0], 400)
+        self.assertEqual(self._request("/jobs/unknown")[0], 404)
+        self.assertEqual(self._request("/nothing")[0], 404)
+
+    def test_bad_or_oversized_content_length_is_rejected(self):
+        for length, status in (("abc", 400), ("-5", 400), (str(10 ** 9), 413)):
+            connection = http.client.HTTPConnection(*self.server._httpd.server_address[:2], timeout=5)
+            self.addCleanup(connection.close)
+            connection.putrequest("POST", "/jobs")
+            connection.putheader("Content-Type", "application/json")
+            connection.putheader("Content-Length", length)
+            connection.endheaders()
+            response = connection.getresponse()
+            self.assertEqual(response.status, status, length)
+        self.assertEqual(self.server.jobs.list(), [])
+
+    def test_failing_manager_marks_the_job_failed(self):
+        def broken():
+            raise RuntimeError("no vector store")
+        self.server.jobs.manager_factory = broken
+        job = self._submit()
+        body = self._request(f"/jobs/{job['id']}/events")[2].decode("utf-8")
+        self.assertIn('"status": "failed"', body)
+        view = json.loads(self._request(f"/jobs/{job['id']}")[2])
+        self.assertIn("RuntimeError: no vector store", view["result"])
+        self.assertEqual(self._request(f"/jobs/{job['id']}/artifact")[0], 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
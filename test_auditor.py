@@ -1,10 +1,13 @@
 import sys
 import os
 import unittest
-from unittest.mock import MagicMock
+from io import StringIO
+from unittest.mock import MagicMock, patch
 
 sys.path.append(os.path.join(os.getcwd(), "src"))
 
+from tools.llm_calls import AgentError
+
 try:
     import langchain_core.prompts      # noqa: F401
     import langchain_core.output_parsers  # noqa: F401
@@ -65,9 +68,25 @@ class TestAuditorUnit(unittest.TestCase):
         self.assertNotIn("ANALYSIS", result)
         self.assertNotIn("Internal reasoning", result)
 
-    def test_missing_inputs_returns_error(self):
-        result = self.auditor.review("", "some draft")
-        self.assertIn("Error", result)
+    def test_missing_inputs_raise(self):
+        with self.assertRaises(AgentError):
+            self.auditor.review("", "some draft")
+
+    def test_non_model_failure_raises_instead_of_returning_text(self):
+        with patch("agents.auditor.enforce_budget", side_effect=KeyError("requirement")):
+            with self.assertRaises(AgentError) as cm:
+                self.auditor.review("requirement", "draft")
+        self.assertEqual(cm.exception.role, "auditor")
+
+    def test_over_budget_prompt_is_reported_and_sent_whole(self):
+        self._set_response("STATUS: APPROVED")
+        drafts = "\n\n".join(f"Test Case ID: TC_{i:02d}\nSteps:\n1. Step {i}" for i in range(1, 40))
+        with patch("agents.auditor.config.PROMPT_BUDGETS", {"auditor": 200}), \
+             patch("sys.stdout", new_callable=StringIO) as out:
+            self.auditor.review("TC_01: Login", drafts)
+        self.assertIn("[BUDGET] AUDITOR prompt is", out.getvalue())
+        self.assertIn("over budget", out.getvalue())
+        self.assertEqual(self.auditor.chain.invoke.call_args[0][0]["test_cases"], drafts)
 
     def test_review_passes_correct_inputs_to_chain(self):
         self._set_response("STATUS: APPROVED")
@@ -77,6 +96,56 @@ class TestAuditorUnit(unittest.TestCase):
         self.assertEqual(call_kwargs["test_cases"], "TC_01 draft")
 
 
+class TestParseVerdicts(unittest.TestCase):
+    """Per-test-case verdicts used by the incremental repair loop."""
+
+    def setUp(self):
+        from agents.auditor import parse_verdicts
+        self.parse = parse_verdicts
+
+    def test_verdict_lines_reject_only_listed_cases(self):
+        review = ("STATUS: REJECTED\nVERDICTS:\nTC_01: APPROVED\n"
+                  "TC_02: REJECTED - Expected Result must mention lockout\nTC_03: APPROVED")
+        verdicts = self.parse(review, ["TC_01", "TC_02", "TC_03"])
+        self.assertIsNone(verdicts["TC_01"])
+        self.assertIsNone(verdicts["TC_03"])
+        self.assertIn("must mention lockout", verdicts["TC_02"])
+
+    def test_overall_approval_approves_everything(self):
+        verdicts = self.parse("STATUS: APPROVED\nFEEDBACK: None", ["TC_01", "TC_02"])
+        self.assertEqual(verdicts, {"TC_01": None, "TC_02": None})
+
+    def test_rejection_naming_cases_rejects_only_those(self):
+        verdicts = self.parse("STATUS: REJECTED\nFEEDBACK: TC_02 expected result is wrong", ["TC_01", "TC_02"])
+        self.assertIsNone(verdicts["TC_01"])
+        self.assertIn("TC_02 expected result", verdicts["TC_02"])
+
+    def test_unspecific_rejection_rejects_all_cases(self):
+        verdicts = self.parse("STATUS: REJECTED\nFEEDBACK: missing scenarios", ["TC_01", "TC_02"])
+        self.assertTrue(all(verdicts.values()))
+
+    def test_cases_left_out_of_a_rejected_review_are_rejected(self):
+        review = "STATUS: REJECTED\nVERDICTS:\nTC_01: APPROVED\nFEEDBACK: TC_02 misses the lockout step"
+        verdicts = self.parse(review, ["TC_01", "TC_02"])
+        self.assertIsNone(verdicts["TC_01"])
+        self.assertIn("lockout", verdicts["TC_02"])
+
+    def test_verdicts_on_extra_cases_count_for_their_scenario(self):
+        review = "STATUS: REJECTED\nVERDICTS:\nTC_01: APPROVED\nTC_01_2: REJECTED - duplicate of TC_01\nTC_02: APPROVED"
+        verdicts = self.parse(review, ["TC_01", "TC_02"])
+        self.assertIn("TC_01_2: duplicate of TC_01", verdicts["TC_01"])
+        self.assertIsNone(verdicts["TC_02"])
+
+        verdicts = self.parse("STATUS: REJECTED\nFEEDBACK: TC_02_2 repeats TC_02", ["TC_01", "TC_02"])
+        self.assertIsNone(verdicts["TC_01"])
+        self.assertTrue(verdicts["TC_02"])
+
+    def test_bracketed_and_bulleted_verdict_lines(self):
+        verdicts = self.parse("- [TC_01] REJECTED: wrong step\n* TC_02 - APPROVED", ["TC_01", "TC_02"])
+        self.assertIn("wrong step", verdicts["TC_01"])
+        self.assertIsNone(verdicts["TC_02"])
+
+
 @unittest.skipUnless(_ollama_up, INTEGRATION_SKIP)
 class TestAuditorIntegration(unittest.TestCase):
     """Integration tests - require a running Ollama instance."""
@@ -23,6 +23,8 @@ except Exception:
 
 INTEGRATION_SKIP = "Integration test requires a running Ollama instance"
 
+from tools.llm_calls import AgentError
+
 
 class TestAuthorUnit(unittest.TestCase):
     """Unit tests - fully mocked, no Ollama required."""
@@ -70,9 +72,18 @@ class TestAuthorUnit(unittest.TestCase):
         call_kwargs = self.agent.chain.invoke.call_args[0][0]
         self.assertEqual(call_kwargs["feedback"], "None")
 
-    def test_write_empty_topic_returns_guidance(self):
-        result = self.agent.write("", context="rules")
-        self.assertIn("provide a topic", result.lower())
+    def test_write_empty_topic_raises(self):
+        with self.assertRaises(AgentError):
+            self.agent.write("", context="rules")
+
+    def test_oversized_context_is_compressed_to_budget(self):
+        self._set_response("Test Case ID: TC_01")
+        noise = "\n\n".join(f"Invoice export rule {i} for the finance team." for i in range(2000))
+        with patch("agents.author.config.PROMPT_BUDGETS", {"author": 2000}):
+            self.agent.write("Account lockout", context="Lockout after 3 failures.\n\n" + noise)
+        sent = self.agent.chain.invoke.call_args[0][0]
+        self.assertIn("Lockout after 3 failures.", sent["context"])
+        self.assertLess(len(sent["context"]), len(noise))
 
     def test_write_with_feedback_invokes_chain_once(self):
         self._set_response("TC_01: Revised test")
@@ -0,0 +1,236 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+# Stub heavy dependencies so batch.py (and agents.manager) import without Ollama/ChromaDB
+for _mod in (
+    "langchain_chroma",
+    "chromadb",
+    "langchain_ollama",
+    "langchain_community",
+    "langchain_community.document_loaders",
+    "langchain_community.document_loaders.pdf",
+    "langchain_community.document_loaders.csv_loader",
+    "langchain_community.document_loaders.text",
+    "langchain_community.document_loaders.word_document",
+    "langchain_core",
+    "langchain_core.prompts",
+    "langchain_core.output_parsers",
+    "langchain_core.runnables",
+    "langchain_text_splitters",
+):
+    if _mod not in sys.modules:
+        sys.modules[_mod] = MagicMock()
+
+from batch import load_stories, run_batch, classify_result, safe_id, format_eta, main
+from tools.output_sinks import CsvSink, new_run_id
+
+
+class _FakeManager:
+    """Answers like Manager.process_request; writes a CSV into scribe.output_dir."""
+    created = 0
+    lock = threading.Lock()
+
+    def __init__(self, fail_on=()):
+        with _FakeManager.lock:
+            _FakeManager.created += 1
+        self.scribe = MagicMock()
+        self.fail_on = fail_on
+        self.calls = []
+        self.last_trace_id = "t1"
+
+    def process_request(self, text, **kwargs):
+        self.calls.append((text, kwargs))
+        if any(word in text for word in self.fail_on):
+            return "Error: Max attempts reached. Content could not be approved."
+        path = os.path.join(self.scribe.output_dir, "test_cases.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("ID,Title\nTC_01,x\n")
+        return f"Workflow Complete.\n\nSuccess. File saved to: {path}"
+
+
+class TestLoadStories(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+    def test_folder_of_text_files(self):
+        os.makedirs(os.path.join(self.tmp, "sprint"))
+        for name, text in (("b.txt", "Story B"), ("a.md", "Story A"), ("sprint/c.txt", "Story C"),
+                           ("empty.txt", "  "), ("notes.pdf", "skip")):
+            with open(os.path.join(self.tmp, name), "w", encoding="utf-8") as f:
+                f.write(text)
+        stories = load_stories(self.tmp)
+        self.assertEqual(stories, [("a", "Story A"), ("b", "Story B"), (os.path.join("sprint", "c"), "Story C")])
+
+    def test_jsonl_with_and_without_ids(self):
+        path = os.path.join(self.tmp, "stories.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"id": "LOGIN-1", "story": "Login"}) + "\n\n")
+            f.write(json.dumps({"text": "Logout"}) + "\n")
+        self.assertEqual(load_stories(path), [("LOGIN-1", "Login"), ("line-3", "Logout")])
+
+    def test_bad_input_raises(self):
+        path = os.path.join(self.tmp, "stories.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"id": "A", "story": "x"}\n{"id": "A", "story": "y"}\n')
+        with self.assertRaises(ValueError):
+            load_stories(path)
+        with self.assertRaises(FileNotFoundError):
+            load_stories(os.path.join(self.tmp, "missing"))
+
+
+class TestHelpers(unittest.TestCase):
+
+    def test_classify_result(self):
+        self.assertEqual(classify_result("Workflow Complete.\n\nSuccess. File saved to: /x.csv"), "completed")
+        self.assertEqual(classify_result("Workflow Complete.\n\nError saving file: disk full"), "failed")
+        self.assertEqual(classify_result("Duplicate detected. Stopping.\nFOUND_EXISTING"), "duplicate")
+        self.assertEqual(classify_result("Archivist Report: ..."), "answered")
+        self.assertEqual(classify_result("Error: Model call failed - down"), "failed")
+
+    def test_safe_id_and_eta(self):
+        self.assertEqual(safe_id("sprint 4/LOGIN #1"), "sprint_4_LOGIN_1")
+        self.assertEqual(format_eta(75), "1m 15s")
+        self.assertEqual(format_eta(3 * 3600 + 120), "3h 02m")
+        self.assertEqual(format_eta(None), "--")
+
+
+class TestRunBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.out = os.path.join(self.tmp, "out")
+        patcher = patch("batch.ingest_knowledge_base", return_value="[OK] Up-to-date")
+        self.mock_ingest = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.managers = []
+
+    def _factory(self, **kwargs):
+        def build():
+            manager = _FakeManager(**kwargs)
+            self.managers.append(manager)
+            return manager
+        return build
+
+    def _run(self, stories, **kwargs):
+        kwargs.setdefault("manager_factory", self._factory())
+        with patch("sys.stdout", new_callable=StringIO) as out:
+            summary = run_batch(stories, self.out, **kwargs)
+        return summary, out.getvalue()
+
+    def test_quiet_mode_silences_only_the_workers(self):
+        class ChattyManager(_FakeManager):
+            def process_request(self, text, **kwargs):
+                print("agent noise")
+                # A thread outside the batch (e.g. a job queue in the same process) still prints
+                bystander = threading.Thread(target=print, args=("bystander",))
+                bystander.start()
+                bystander.join()
+                return super().process_request(text, **kwargs)
+
+        summary, log = self._run([("S1", "Story 1")], manager_factory=ChattyManager)
+        self.assertEqual(summary["statuses"], {"completed": 1})
+        self.assertNotIn("agent noise", log)
+        self.assertIn("bystander", log)
+
+    def test_each_story_gets_its_own_output_and_a_summary(self):
+        stories = [(f"S{i}", f"Story {i}") for i in range(5)]
+        summary, log = self._run(stories, workers=3)
+
+        self.assertEqual(summary["statuses"], {"completed": 5})
+        self.assertEqual(self.mock_ingest.call_count, 1)
+        self.assertLessEqual(len(self.managers), 3)
+        for manager in self.managers:
+            for _, kwargs in manager.calls:
+                self.assertFalse(kwargs["sync"])
+                self.assertEqual(kwargs["priority"], "batch")
+        for story_id, _ in stories:
+            self.assertTrue(os.path.exists(os.path.join(self.out, story_id, "test_cases.csv")))
+            with open(os.path.join(self.out, story_id, "result.json"), encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["status"], "completed")
+        with open(os.path.join(self.out, "summary.json"), encoding="utf-8") as f:
+            self.assertEqual([s["id"] for s in json.load(f)["stories"]], [s for s, _ in stories])
+        self.assertIn("[BATCH] 5/5", log)
+        self.assertIn("ETA", log)
+
+    def test_rerun_skips_done_stories_and_retries_failed_or_edited_ones(self):
+        stories = [("A", "Story A"), ("B", "Story B broken"), ("C", "Story C")]
+        self._run(stories, manager_factory=self._factory(fail_on=("broken",)))
+
+        self.managers.clear()
+        stories[2] = ("C", "Story C, edited")
+        summary, _ = self._run(stories)
+
+        rerun = [text for manager in self.managers for text, _ in manager.calls]
+        self.assertEqual(sorted(rerun), ["Story B broken", "Story C, edited"])
+        self.assertEqual(summary["skipped"], 1)
+        self.assertEqual(summary["stories"][0], {"id": "A", "status": "skipped"})
+
+    def test_nothing_to_do_skips_the_sync(self):
+        stories = [("A", "Story A")]
+        self._run(stories)
+        self.mock_ingest.reset_mock()
+        summary, _ = self._run(stories)
+        self.assertEqual(summary["run"], 0)
+        self.mock_ingest.assert_not_called()
+
+    def test_a_crashing_story_is_recorded_as_failed(self):
+        def build():
+            manager = _FakeManager()
+            manager.process_request = MagicMock(side_effect=RuntimeError("boom"))
+            return manager
+        summary, _ = self._run([("A", "Story A")], manager_factory=build)
+        self.assertEqual(summary["statuses"], {"failed": 1})
+        with open(os.path.join(self.out, "A", "result.json"), encoding="utf-8") as f:
+            self.assertIn("RuntimeError: boom", json.load(f)["result"])
+
+    def test_consolidate_points_every_scribe_at_one_file(self):
+        stories = [("A", "Story A"), ("B", "Story B")]
+        summary, _ = self._run(stories, output_format="xlsx", consolidate=True)
+        target = os.path.join(self.out, "test_cases.xlsx")
+        self.assertEqual(summary["consolidated"], target)
+        for manager in self.managers:
+            self.assertEqual(manager.scribe.append_to, target)
+            self.assertEqual(manager.scribe.output_format, "xlsx")
+
+    def test_forced_rerun_replaces_its_rows_in_the_consolidated_file(self):
+        class AppendingManager(_FakeManager):
+            """Appends one row per story to the consolidated file, like the Scribe."""
+            def process_request(self, text, **kwargs):
+                run_id = new_run_id()
+                CsvSink().append(self.scribe.append_to, ["ID", "Title"], [["TC_01", text]], run_id=run_id,
+                                 replace=self.scribe.replace_runs)
+                self.scribe.last_run_id = run_id
+                return f"Workflow Complete.\n\nSuccess. File saved to: {self.scribe.append_to}"
+
+        stories = [("A", "Story A"), ("B", "Story B")]
+        self._run(stories, manager_factory=AppendingManager, output_format="csv", consolidate=True)
+        self._run(stories, manager_factory=AppendingManager, output_format="csv", consolidate=True, force=True)
+        self._run([("A", "Story A, edited"), ("B", "Story B")], manager_factory=AppendingManager,
+                  output_format="csv", consolidate=True)
+
+        _, rows = CsvSink().read(os.path.join(self.out, "test_cases.csv"))
+        self.assertEqual(sorted(row[2] for row in rows), ["Story A, edited", "Story B"])
+
+    def test_main_exit_code_reflects_failures(self):
+        path = os.path.join(self.tmp, "stories.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"id": "A", "story": "broken story"}) + "\n")
+        with patch("batch.Manager", self._factory(fail_on=("broken",))), \
+             patch("sys.stdout", new_callable=StringIO):
+            self.assertEqual(main([path, "--output", self.out, "--workers", "1"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from tools.checkpoints import CheckpointStore, Run, RunInProgressError, run_key
+
+
+class TestCheckpointStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.store = CheckpointStore(os.path.join(self.tmp, "state", "checkpoints.sqlite"))
+
+    def test_stages_survive_a_new_store_on_the_same_file(self):
+        with self.store.open_run("REQ-1", "story") as run:
+            run.save("analysis", {"rules": "r", "scenarios": ["a", "b"]})
+            run.save("loop", {"attempt": 2, "history": {"TC_01": [["draft", "feedback"]]}})
+
+        reopened = CheckpointStore(self.store.path).open_run("REQ-1", "story")
+        self.assertTrue(reopened.resumed)
+        self.assertEqual(reopened.get("analysis"), {"rules": "r", "scenarios": ["a", "b"]})
+        self.assertEqual(reopened.get("loop")["attempt"], 2)
+
+    def test_key_depends_on_request_id_and_input(self):
+        with self.store.open_run("REQ-1", "story") as run:
+            run.save("context", {"docs": "d"})
+            self.assertFalse(self.store.open_run("REQ-2", "story").resumed)
+            self.assertFalse(self.store.open_run("REQ-1", "story, edited").resumed)
+        with self.assertRaises(ValueError):
+            run_key(None, "story")
+
+    def test_finished_runs_start_over(self):
+        run = self.store.open_run("REQ-1", "story")
+        run.save("analysis", {"rules": "r", "scenarios": []})
+        run.finish("Workflow Complete.")
+        self.assertFalse(self.store.open_run("REQ-1", "story").resumed)
+        self.assertEqual(self.store.runs()[0]["status"], "running")
+
+    def test_same_run_cannot_be_open_twice(self):
+        run = self.store.open_run("REQ-1", "story")
+        with self.assertRaises(RunInProgressError):
+            self.store.open_run("REQ-1", "story")
+        # Another store on the same file (another Manager or process) is refused too
+        with self.assertRaises(RunInProgressError):
+            CheckpointStore(self.store.path).open_run("REQ-1", "story")
+        run.close()
+        self.store.open_run("REQ-1", "story").close()
+
+    def test_prune_drops_stale_runs(self):
+        with self.store.open_run("old", "story") as run:
+            run.save("analysis", {})
+        self.assertEqual(self.store.prune(max_age_s=3600), 0)
+        time.sleep(0.01)
+        self.assertEqual(self.store.prune(max_age_s=0.001), 1)
+        self.assertEqual(self.store.runs(), [])
+
+    def test_concurrent_writers(self):
+        def work(n):
+            run = self.store.open_run(f"REQ-{n}", "story")
+            for attempt in range(5):
+                run.save("loop", {"attempt": attempt})
+            run.finish("done")
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual({r["status"] for r in self.store.runs()}, {"finished"})
+
+    def test_run_without_store_is_a_no_op(self):
+        run = Run()
+        run.save("analysis", {"rules": "r"})
+        self.assertEqual(run.get("analysis"), {"rules": "r"})
+        run.finish("done")
+        self.assertFalse(run.resumed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,10 @@
 import sys
 import os
 import json
+import time
+import shutil
+import tempfile
+import threading
 import unittest
 from unittest.mock import MagicMock, patch, mock_open, call
 
@@ -124,6 +128,24 @@ class TestIngestKnowledgeBase(unittest.TestCase):
             result = ingest_knowledge_base()
         self.assertIn("error", result.lower())
 
+    def test_concurrent_syncs_ingest_once(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+
+        def slow_update(documents, interactive):
+            time.sleep(0.05)
+
+        with patch("ingest_data.STATE_FILE", os.path.join(tmp, ".ingest_state.json")), \
+             patch("ingest_data.get_current_file_state", return_value={"doc.pdf": 1.0}), \
+             patch("ingest_data.load_documents_dynamically", return_value=[MagicMock()]), \
+             patch("ingest_data.update_vector_store", side_effect=slow_update) as mock_update:
+            threads = [threading.Thread(target=ingest_knowledge_base) for _ in range(2)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        mock_update.assert_called_once()
+
     def test_update_vector_store_called_with_non_interactive_flag(self):
         with patch("ingest_data.get_current_file_state", return_value={"new.pdf": 1.0}), \
              patch("ingest_data.os.path.exists", return_value=False), \
@@ -20,10 +20,21 @@ Scenarios covered:
   12. Prompt injection attempt does not alter workflow control flow
   13. Archivist exception during generation is handled gracefully
   14. Empty scenario text falls back to full input
+  15. Scenarios are drafted in parallel and stitched with stable IDs
+  16. A retry re-drafts and re-audits only the rejected test cases
+  17. Mechanical defects are caught by the pre-audit without calling the Auditor
+  18. Loops that stop converging end early; max_attempts is set per request
+  19. Tiered routing: cheap Author model first, escalated only for rejected cases
+  20. Each request exports one trace with a span per stage
+  21. A failed run resumes from its last checkpointed stage
+  22. An edited story recomputes only the stages whose inputs changed
 """
 
 import sys
 import os
+import json
+import shutil
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch, call
 
@@ -50,6 +61,8 @@ for _mod in (
         sys.modules[_mod] = MagicMock()
 
 from agents.manager import Manager
+from tools.model_router import ModelRouter
+from tools.llm_calls import ModelCallError, AgentError
 
 
 # ---------------------------------------------------------------------------
@@ -75,6 +88,10 @@ class _ManagerFixture(unittest.TestCase):
         self.manager.auditor = MagicMock()
         self.manager.scribe = MagicMock()
         self.manager.llm = MagicMock()
+        self.manager.router = ModelRouter(self.manager.router.tiers)  # private to the test, never saved
+        self.manager.trace_log_path = None
+        self.manager.checkpoint_path = None
+        self.manager.memo_path = None
 
         # Patch ingest at module level so sync_knowledge() does not hit disk
         self._ingest_patcher = patch("agents.manager.ingest_knowledge_base",
@@ -83,8 +100,8 @@ class _ManagerFixture(unittest.TestCase):
 
         # Default classify_intent response (overridden per test as needed)
         self._set_intent("REQUIREMENT")
-        # Default analyze_input response
-        self._set_analysis("Standard rule set.", "Scenario 1\nScenario 2")
+        # Default analyze_input response (one scenario -> one Author call per attempt)
+        self._set_analysis("Standard rule set.", "Scenario 1")
         # Default archivist responses
         self.manager.archivist.ask.return_value = "NO_EXISTING_TESTS: none found"
         # Default author response
@@ -144,7 +161,8 @@ class TestScenario02RequirementWorkflow(_ManagerFixture):
     def test_all_agents_invoked_in_correct_order(self):
         call_order = []
         self.manager.archivist.ask.side_effect = lambda q: call_order.append("archivist") or "NO_EXISTING_TESTS: none"
-        self.manager.author.write.side_effect = lambda *a, **kw: call_order.append("author") or "draft"
+        self.manager.author.write.side_effect = lambda *a, **kw: call_order.append("author") or (
+            "Test Case ID: TC_01\nTitle: Login\nSteps:\n1. Go\nExpected Result: Pass")
         self.manager.auditor.review.side_effect = lambda *a, **kw: call_order.append("auditor") or "STATUS: APPROVED"
         self.manager.scribe.save.side_effect = lambda c: call_order.append("scribe") or "Success."
 
@@ -201,7 +219,7 @@ class TestScenario04FirstAttemptApproval(_ManagerFixture):
         self.assertEqual(self.manager.author.write.call_count, 1)
 
     def test_scribe_receives_first_draft(self):
-        first_draft = "Test Case ID: [TC_01]\nTitle: Simple\nSteps:\n1. Do it\nExpected: Pass"
+        first_draft = "Test Case ID: [TC_01]\nTitle: Simple\nSteps:\n1. Do it\nExpected Result: Pass"
         self.manager.author.write.return_value = first_draft
         self.manager.auditor.review.return_value = "STATUS: APPROVED"
 
@@ -301,6 +319,14 @@ class TestScenario07ScribeFailure(_ManagerFixture):
         self.assertIsInstance(result, str)
         self.assertTrue(len(result) > 0)
 
+    def test_agent_error_stops_the_request(self):
+        self.manager.auditor.review.side_effect = AgentError("auditor", "missing inputs")
+        result = self.manager.process_request("Save scenario")
+        self.assertEqual(result, "Error: auditor failed: missing inputs")
+        # Nothing downstream sees the failure as a review
+        self.assertEqual(self.manager.author.write.call_count, 1)
+        self.manager.scribe.save.assert_not_called()
+
 
 # ---------------------------------------------------------------------------
 # Scenario 8 - Knowledge sync on every request
@@ -364,9 +390,9 @@ class TestScenario10InputParsing(_ManagerFixture):
 
         self.manager.process_request("Full story with scenarios")
 
-        author_call = self.manager.author.write.call_args
-        topic_arg = author_call[1].get("topic", author_call[0][0] if len(author_call[0]) > 0 else "")
-        self.assertIn("Happy path", topic_arg)
+        # Scenarios are drafted in parallel, so look across every Author call
+        topics = [c[1].get("topic", c[0][0] if c[0] else "") for c in self.manager.author.write.call_args_list]
+        self.assertTrue(any("Happy path" in t for t in topics))
 
     def test_rules_not_sent_as_topic_to_author(self):
         self._set_analysis("Feature: Login page", "Scenario A only")
@@ -498,6 +524,443 @@ class TestScenario14ScenarioFallback(_ManagerFixture):
         self.assertIn("fallback scenario text", topic)
 
 
+# ---------------------------------------------------------------------------
+# Scenario 15 - Per-scenario fan-out with stable IDs
+# ---------------------------------------------------------------------------
+
+class TestScenario15ScenarioFanOut(_ManagerFixture):
+    def _topic(self, call_args):
+        return call_args[1].get("topic", call_args[0][0] if call_args[0] else "")
+
+    def test_one_author_call_per_scenario(self):
+        self._set_analysis("Rules", "1. Login\n2. Logout\n3. Lockout")
+        self.manager.process_request("story")
+        topics = sorted(self._topic(c) for c in self.manager.author.write.call_args_list)
+        self.assertEqual(topics, ["Lockout", "Login", "Logout"])
+
+    def test_stitched_draft_has_stable_ids_in_scenario_order(self):
+        self._set_analysis("Rules", ["Login", "Logout", "Lockout"])
+        self.manager.author.write.side_effect = lambda topic, **kw: (
+            f"Test Case ID: [TC_01]\nTitle: {topic}\nSteps:\n1. Do\nExpected Result: Ok")
+
+        self.manager.process_request("story")
+
+        saved = self.manager.scribe.save.call_args[0][0]
+        self.assertLess(saved.index("TC_01"), saved.index("Title: Login"))
+        self.assertLess(saved.index("Test Case ID: TC_02\nTitle: Logout"), saved.index("Test Case ID: TC_03\nTitle: Lockout"))
+
+    def test_parallelism_is_capped_by_config(self):
+        import threading, time
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def slow_write(topic, **kw):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return "Test Case ID: TC_01\nTitle: t\nSteps:\n1. x\nExpected Result: y"
+
+        self._set_analysis("Rules", [f"Scenario {i}" for i in range(6)])
+        self.manager.author.write.side_effect = slow_write
+        with patch("agents.manager.config.AUTHOR_PARALLELISM", 2):
+            self.manager.process_request("story")
+        self.assertEqual(self.manager.author.write.call_count, 6)
+        self.assertLessEqual(peak[0], 2)
+
+
+# ---------------------------------------------------------------------------
+# Scenario 16 - Incremental repair of rejected test cases only
+# ---------------------------------------------------------------------------
+
+class TestScenario16IncrementalRepair(_ManagerFixture):
+    def setUp(self):
+        super().setUp()
+        self._set_analysis("Rules", ["Login", "Logout", "Lockout"])
+        self.manager.author.write.side_effect = lambda topic, **kw: (
+            f"Test Case ID: TC_01\nTitle: {topic}{' (fixed)' if kw.get('feedback') else ''}"
+            f"\nSteps:\n1. Do\nExpected Result: Ok")
+        self.manager.auditor.review.side_effect = [
+            "STATUS: REJECTED\nTC_01: APPROVED\nTC_02: REJECTED - wrong result\nTC_03: APPROVED",
+            "STATUS: APPROVED\nTC_02: APPROVED",
+        ]
+
+    def test_only_rejected_case_is_redrafted(self):
+        self.manager.process_request("story")
+        topics = [c[0][0] for c in self.manager.author.write.call_args_list]
+        self.assertEqual(len(topics), 4)
+        self.assertEqual(topics[3:], ["Logout"])
+
+    def test_rejected_case_receives_its_own_feedback(self):
+        self.manager.process_request("story")
+        retry = self.manager.author.write.call_args_list[3]
+        self.assertIn("wrong result", retry[1]["feedback"])
+        self.assertIn("Test Case ID: TC_02", retry[1]["previous_draft"])
+
+    def test_only_rejected_case_is_re_audited(self):
+        self.manager.process_request("story")
+        second_topic, second_draft = self.manager.auditor.review.call_args_list[1][0]
+        self.assertEqual(second_topic, "TC_02: Logout")
+        self.assertNotIn("TC_01", second_draft)
+
+    def test_approved_cases_are_frozen_in_final_output(self):
+        self.manager.process_request("story")
+        saved = self.manager.scribe.save.call_args[0][0]
+        self.assertIn("Title: Login\n", saved)
+        self.assertIn("Title: Logout (fixed)", saved)
+        self.assertIn("Title: Lockout\n", saved)
+        self.assertLess(saved.index("TC_01"), saved.index("TC_02"))
+        self.assertLess(saved.index("TC_02"), saved.index("TC_03"))
+
+
+# ---------------------------------------------------------------------------
+# Scenario 17 - Rule-based pre-audit
+# ---------------------------------------------------------------------------
+
+class TestScenario17PreAudit(_ManagerFixture):
+    GOOD = "Test Case ID: TC_01\nTitle: {t}\nSteps:\n1. Do\nExpected Result: Ok"
+    NO_RESULT = "Test Case ID: TC_01\nTitle: {t}\nSteps:\n1. Do\nExpected Result:"
+
+    def test_defective_draft_skips_auditor_and_returns_precise_feedback(self):
+        self.manager.author.write.side_effect = [self.NO_RESULT.format(t="Login"), self.GOOD.format(t="Login")]
+
+        result = self.manager.process_request("story")
+
+        self.assertEqual(self.manager.auditor.review.call_count, 1)
+        retry_feedback = self.manager.author.write.call_args_list[1][1]["feedback"]
+        self.assertIn("missing 'Expected Result'", retry_feedback)
+        self.assertIn("Workflow Complete", result)
+
+    def test_missing_scenario_coverage_is_reported(self):
+        self.manager.author.write.side_effect = ["I could not write this one.", self.GOOD.format(t="Login")]
+        self.manager.process_request("story")
+        retry_feedback = self.manager.author.write.call_args_list[1][1]["feedback"]
+        self.assertIn("No test case was written for scenario 'Scenario 1'", retry_feedback)
+
+    def test_clean_cases_wait_for_fixed_ones_before_audit(self):
+        self._set_analysis("Rules", ["Login", "Logout"])
+        self.manager.author.write.side_effect = lambda topic, **kw: (
+            self.NO_RESULT if topic == "Logout" and not kw.get("feedback") else self.GOOD).format(t=topic)
+
+        self.manager.process_request("story")
+
+        self.assertEqual(self.manager.auditor.review.call_count, 1)
+        audited_topic = self.manager.auditor.review.call_args[0][0]
+        self.assertEqual(audited_topic, "TC_01: Login\nTC_02: Logout")
+
+    def test_all_defective_attempts_never_reach_auditor(self):
+        self.manager.author.write.return_value = "not a test case"
+        result = self.manager.process_request("story")
+        self.manager.auditor.review.assert_not_called()
+        self.assertIn("Max attempts", result)
+
+
+# ---------------------------------------------------------------------------
+# Scenario 18 - No-progress detection and per-request attempt limits
+# ---------------------------------------------------------------------------
+
+class TestScenario18NoProgress(_ManagerFixture):
+    def test_identical_drafts_stop_before_max_attempts(self):
+        self.manager.auditor.review.side_effect = [
+            "STATUS: REJECTED\nFEEDBACK: TC_01 step 2 is wrong",
+            "STATUS: REJECTED\nFEEDBACK: TC_01 still wrong, see step 2",
+        ]
+
+        result = self.manager.process_request("story", max_attempts=5)
+
+        self.assertEqual(self.manager.author.write.call_count, 2)
+        self.assertIn("Stopped early after attempt 2/5", result)
+        self.assertIn("near-identical draft", result)
+        self.manager.scribe.save.assert_not_called()
+
+    def test_repeated_feedback_stops_even_when_draft_changes(self):
+        self.manager.author.write.side_effect = [
+            f"Test Case ID: TC_01\nTitle: Attempt {n}\nSteps:\n1. {'x' * 40 * n}\nExpected Result: Ok"
+            for n in range(1, 6)
+        ]
+        self.manager.auditor.review.return_value = "STATUS: REJECTED\nFEEDBACK: Expected Result must mention lockout"
+
+        result = self.manager.process_request("story", max_attempts=5)
+
+        self.assertEqual(self.manager.author.write.call_count, 2)
+        self.assertIn("same feedback", result)
+
+    def test_converging_loop_uses_requested_attempts(self):
+        self.manager.author.write.side_effect = [
+            f"Test Case ID: TC_01\nTitle: {title}\nSteps:\n1. Go\nExpected Result: Ok"
+            for title in ("Login", "Login with MFA enabled for admin users", "Login via single sign-on portal")
+        ]
+        self.manager.auditor.review.side_effect = [
+            "STATUS: REJECTED\nFEEDBACK: add MFA",
+            "STATUS: REJECTED\nFEEDBACK: the SSO path is not covered by this case",
+            "STATUS: APPROVED",
+        ]
+
+        result = self.manager.process_request("story", max_attempts=3)
+
+        self.assertEqual(self.manager.author.write.call_count, 3)
+        self.assertIn("Workflow Complete", result)
+
+    def test_max_attempts_message_on_last_attempt(self):
+        self.manager.auditor.review.return_value = "STATUS: REJECTED\nFEEDBACK: nope"
+        result = self.manager.process_request("story", max_attempts=1)
+        self.assertIn("Max attempts", result)
+        self.assertEqual(self.manager.author.write.call_count, 1)
+
+
+# ---------------------------------------------------------------------------
+# Scenario 19 - Tiered model routing
+# ---------------------------------------------------------------------------
+
+class TestScenario19TieredRouting(_ManagerFixture):
+    def setUp(self):
+        super().setUp()
+        self.manager.router = ModelRouter({"author": ["small", "large"]})
+        self._set_analysis("Rules", ["Login", "Logout"])
+        self.manager.author.write.side_effect = lambda topic, **kw: (
+            f"Test Case ID: TC_01\nTitle: {topic} ({kw.get('model')})\nSteps:\n1. Do\nExpected Result: Ok")
+
+    def _models(self):
+        return [(c[0][0], c[1].get("model")) for c in self.manager.author.write.call_args_list]
+
+    def test_first_drafts_use_the_cheapest_tier(self):
+        self.manager.process_request("story")
+        self.assertEqual(sorted(self._models()), [("Login", "small"), ("Logout", "small")])
+
+    def test_only_rejected_case_escalates(self):
+        self.manager.auditor.review.side_effect = [
+            "STATUS: REJECTED\nTC_01: APPROVED\nTC_02: REJECTED - wrong result",
+            "STATUS: APPROVED",
+        ]
+        result = self.manager.process_request("story")
+        self.assertIn("Workflow Complete", result)
+        self.assertEqual(self._models()[2:], [("Logout", "large")])
+
+        stats = self.manager.router.stats()["author"]
+        self.assertEqual(stats["small"]["calls"], 2)
+        self.assertEqual(stats["small"]["success_rate"], 0.5)
+        self.assertEqual(stats["large"]["accepted"], 1)
+        self.assertEqual(stats["large"]["tier"], 1)
+
+    def test_stalled_case_escalates_instead_of_stopping(self):
+        self.manager.router = ModelRouter({"author": ["tiny", "small", "large"]})
+        self._set_analysis("Rules", ["Login"])
+        self.manager.author.write.side_effect = None
+        self.manager.author.write.return_value = "Test Case ID: TC_01\nTitle: Same\nSteps:\n1. Do\nExpected Result: Ok"
+        self.manager.auditor.review.return_value = "STATUS: REJECTED\nFEEDBACK: TC_01 is wrong"
+
+        result = self.manager.process_request("story", max_attempts=5)
+
+        self.assertEqual([m for _, m in self._models()], ["tiny", "small", "large"])
+        self.assertIn("Stopped early after attempt 3/5", result)
+
+
+# ---------------------------------------------------------------------------
+# Scenario 20 - Per-request tracing
+# ---------------------------------------------------------------------------
+
+class TestScenario20Tracing(_ManagerFixture):
+    def setUp(self):
+        super().setUp()
+        self.trace_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.trace_dir, ignore_errors=True)
+        self.manager.trace_log_path = os.path.join(self.trace_dir, "traces.jsonl")
+
+    def _traces(self):
+        with open(self.manager.trace_log_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_generation_request_exports_one_trace_with_stage_spans(self):
+        self.manager.process_request("story")
+        traces = self._traces()
+        self.assertEqual(len(traces), 1)
+        self.assertEqual(traces[0]["trace_id"], self.manager.last_trace_id)
+
+        names = [s["name"] for s in traces[0]["spans"]]
+        for stage in ("process_request", "sync", "intent", "duplicate_check",
+                      "context", "drafting", "author", "pre_audit", "auditor", "scribe"):
+            self.assertIn(stage, names)
+
+        by_id = {s["span_id"]: s for s in traces[0]["spans"]}
+        author = next(s for s in traces[0]["spans"] if s["name"] == "author")
+        self.assertEqual(by_id[author["parent_id"]]["name"], "drafting")
+        self.assertEqual(author["attributes"]["tc_id"], "TC_01")
+
+    def test_failed_request_still_exports_its_trace(self):
+        self.manager.archivist.ask.side_effect = ModelCallError("archivist", "m", "down")
+        result = self.manager.process_request("story")
+        self.assertIn("Model call failed", result)
+        spans = {s["name"]: s for s in self._traces()[0]["spans"]}
+        self.assertEqual(spans["duplicate_check"]["status"], "error")
+
+
+# ---------------------------------------------------------------------------
+# Scenario 21 - Checkpointed stages resume after a failure
+# ---------------------------------------------------------------------------
+
+class TestScenario21CheckpointResume(_ManagerFixture):
+    def setUp(self):
+        super().setUp()
+        self.state_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.state_dir, ignore_errors=True)
+        self.manager.checkpoint_path = os.path.join(self.state_dir, "checkpoints.sqlite")
+
+    def test_auditor_timeout_on_attempt_two_resumes_at_the_auditor(self):
+        self.manager.auditor.review.side_effect = [
+            "STATUS: REJECTED\nFEEDBACK: TC_01 misses the error message",
+            ModelCallError("auditor", "m", "timed out"),
+            "STATUS: APPROVED",
+        ]
+        first = self.manager.process_request("story", max_attempts=3, request_id="REQ-1")
+        self.assertIn("Model call failed", first)
+        self.assertEqual(self.manager.author.write.call_count, 2)
+
+        second = self.manager.process_request("story", max_attempts=3, request_id="REQ-1")
+        self.assertIn("Workflow Complete", second)
+        # Parse, duplicate check, context and both drafts came from the checkpoint
+        self.assertEqual(self.manager.analyze_input.call_count, 1)
+        self.assertEqual(self.manager.archivist.ask.call_count, 2)
+        self.assertEqual(self.manager.author.write.call_count, 2)
+        self.assertEqual(self.manager.auditor.review.call_count, 3)
+
+        # A finished run is not resumed: the same story starts over
+        self.manager.auditor.review.side_effect = None
+        self.manager.process_request("story", request_id="REQ-1")
+        self.assertEqual(self.manager.analyze_input.call_count, 2)
+
+    def test_failed_save_resumes_at_the_scribe(self):
+        self.manager.scribe.save.side_effect = ["Error saving file: disk full", "Success. File saved to: /x.csv"]
+        self.assertIn("Error saving file", self.manager.process_request("story", request_id="REQ-1"))
+        self.assertIn("Success", self.manager.process_request("story", request_id="REQ-1"))
+        self.assertEqual(self.manager.author.write.call_count, 1)
+        self.assertEqual(self.manager.auditor.review.call_count, 1)
+        self.assertEqual(self.manager.scribe.save.call_count, 2)
+
+    def test_request_ids_keep_identical_stories_apart(self):
+        self.manager.archivist.ask.side_effect = ModelCallError("archivist", "m", "down")
+        self.manager.process_request("story", request_id="A")
+        self.manager.archivist.ask.side_effect = None
+        self.manager.process_request("story", request_id="B")
+        # B did not inherit A's parse
+        self.assertEqual(self.manager.analyze_input.call_count, 2)
+
+    def test_same_request_running_elsewhere_is_refused(self):
+        elsewhere = self.manager.open_run("REQ-1", "story")
+        self.addCleanup(elsewhere.close)
+        result = self.manager.process_request("story", request_id="REQ-1")
+        self.assertTrue(result.startswith("Error: Request 'REQ-1' is already running"))
+        self.manager.author.write.assert_not_called()
+        elsewhere.close()
+        self.assertIn("Workflow Complete", self.manager.process_request("story", request_id="REQ-1"))
+
+    def test_requests_without_an_id_are_not_checkpointed(self):
+        self.manager.archivist.ask.side_effect = ModelCallError("archivist", "m", "down")
+        self.manager.process_request("story")
+        self.manager.archivist.ask.side_effect = None
+        self.manager.process_request("story")
+        # Another caller's identical story starts from scratch
+        self.assertEqual(self.manager.analyze_input.call_count, 2)
+        self.assertFalse(os.path.exists(self.manager.checkpoint_path))
+
+
+# ---------------------------------------------------------------------------
+# Scenario 22 - Stage memo: an edited story only recomputes what changed
+# ---------------------------------------------------------------------------
+
+class TestScenario22StageMemo(_ManagerFixture):
+    def setUp(self):
+        super().setUp()
+        self.state_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.state_dir, ignore_errors=True)
+        self.manager.memo_path = os.path.join(self.state_dir, "stage_memo.sqlite")
+        patcher = patch("agents.manager.knowledge_fingerprint", return_value="kb-1")
+        self.fingerprint = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.queries = []
+        self.manager.archivist.ask.side_effect = lambda q: self.queries.append(q) or "NO_EXISTING_TESTS: none"
+        self.manager.author.write.side_effect = lambda scenario, **kw: (
+            f"Test Case ID: TC_01\nTitle: {scenario}\nSteps:\n1. Go\nExpected Result: Pass")
+
+    def _written(self):
+        return [c.args[0] for c in self.manager.author.write.call_args_list]
+
+    def test_added_scenario_is_the_only_one_drafted_and_audited(self):
+        self._set_analysis("Login rules.", ["Valid login", "Locked account"])
+        self.manager.process_request("story v1")
+        self.assertEqual(len(self.queries), 2)
+
+        self._set_analysis("Login rules.", ["Password reset", "Valid login", "Locked account"])
+        result = self.manager.process_request("story v2")
+
+        self.assertIn("Workflow Complete", result)
+        # v1 drafts its two scenarios in parallel (any order); v2 drafts only the new one
+        written = self._written()
+        self.assertEqual(sorted(written[:2]), ["Locked account", "Valid login"])
+        self.assertEqual(written[2:], ["Password reset"])
+        # Duplicate check asked about the new scenario only; the context bundle was reused
+        self.assertEqual(len(self.queries), 3)
+        self.assertIn("Password reset", self.queries[2])
+        self.assertNotIn("Valid login", self.queries[2])
+        topic = self.manager.auditor.review.call_args[0][0]
+        self.assertEqual(topic, "TC_01: Password reset")
+        # Reused cases moved to their new positions
+        saved = self.manager.scribe.save.call_args[0][0]
+        self.assertIn("Test Case ID: TC_02\nTitle: Valid login", saved)
+        self.assertIn("Test Case ID: TC_03\nTitle: Locked account", saved)
+
+    def test_unchanged_story_skips_every_model_call(self):
+        self._set_analysis("Login rules.", ["Valid login"])
+        self.manager.process_request("story")
+        self.manager.process_request("story")
+        self.assertEqual(len(self.queries), 2)
+        self.assertEqual(self.manager.author.write.call_count, 1)
+        self.assertEqual(self.manager.auditor.review.call_count, 1)
+        self.assertEqual(self.manager.scribe.save.call_count, 2)
+
+    def test_edited_rules_invalidate_context_and_cases_but_not_duplicate_verdicts(self):
+        self._set_analysis("Login rules.", ["Valid login"])
+        self.manager.process_request("story v1")
+        self._set_analysis("Login rules, now with MFA.", ["Valid login"])
+        self.manager.process_request("story v2")
+        self.assertEqual(len(self.queries), 3)
+        self.assertIn("MFA", self.queries[2])
+        self.assertEqual(self.manager.author.write.call_count, 2)
+
+    def test_knowledge_base_change_reruns_the_duplicate_check(self):
+        self._set_analysis("Login rules.", ["Valid login"])
+        self.manager.process_request("story")
+        self.fingerprint.return_value = "kb-2"
+        self.manager.process_request("story")
+        # Duplicate check and context ran again; the retrieved text didn't change, so the case holds
+        self.assertEqual(len(self.queries), 4)
+        self.assertEqual(self.manager.author.write.call_count, 1)
+
+    def test_knowledge_base_change_with_new_context_redrafts_the_case(self):
+        self._set_analysis("Login rules.", ["Valid login"])
+        self.manager.process_request("story")
+        # The re-ingested knowledge base retrieves different rules for the same story
+        self.fingerprint.return_value = "kb-2"
+        self.manager.archivist.ask.side_effect = lambda q: (
+            self.queries.append(q) or ("NO_EXISTING_TESTS: none" if q.startswith("Check database")
+                                       else "Passwords now expire after 30 days."))
+        self.manager.process_request("story")
+        self.assertEqual(self.manager.author.write.call_count, 2)
+        self.assertIn("expire after 30 days", self.manager.author.write.call_args.kwargs["context"])
+
+    def test_cases_approved_in_a_failed_run_are_kept(self):
+        self._set_analysis("Login rules.", ["Valid login", "Locked account"])
+        self.manager.auditor.review.return_value = "STATUS: REJECTED\nFEEDBACK: TC_02 misses the lockout message"
+        self.assertIn("Error", self.manager.process_request("story", max_attempts=1))
+
+        self.manager.auditor.review.return_value = "STATUS: APPROVED"
+        self.assertIn("Workflow Complete", self.manager.process_request("story", max_attempts=1))
+        written = self._written()
+        self.assertEqual(sorted(written[:2]), ["Locked account", "Valid login"])
+        self.assertEqual(written[2:], ["Locked account"])
+
+
 # ---------------------------------------------------------------------------
 # Cross-cutting: result type contract
 # ---------------------------------------------------------------------------
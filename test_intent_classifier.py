@@ -0,0 +1,106 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from tools.intent_classifier import (
+    IntentClassifier, heuristic_logit, hashed_features, train_model, model_logit,
+    load_model, record_decision, LOG_SNIPPET_CHARS,
+)
+
+
+class TestHeuristics(unittest.TestCase):
+
+    def test_question_scores_negative(self):
+        logit, reasons = heuristic_logit("What is the password policy?")
+        self.assertLess(logit, 0)
+        self.assertIn("ends-with-?", reasons)
+
+    def test_structured_story_scores_strongly_positive(self):
+        logit, reasons = heuristic_logit("Feature: Login\nBackground:\n- x\nScenarios:\n1. a\n2. b")
+        self.assertGreater(logit, 5)
+        self.assertEqual(reasons, ["structured-story"])
+
+    def test_numbered_list_leans_requirement(self):
+        logit, _ = heuristic_logit("1. Login works\n2. Logout works")
+        self.assertGreater(logit, 0)
+
+
+class TestNgramModel(unittest.TestCase):
+
+    def test_features_are_stable_and_normalized(self):
+        a = hashed_features("Verify login page")
+        self.assertEqual(a, hashed_features("verify LOGIN page"))
+        self.assertAlmostEqual(sum(v * v for v in a.values()), 1.0)
+
+    def test_training_separates_classes(self):
+        samples = [{"text": "what is the rule", "intent": "QUESTION"},
+                   {"text": "verify the login flow", "intent": "REQUIREMENT"}] * 5
+        model = train_model(samples, dim=256, epochs=20)
+        self.assertLess(model_logit(model, "what is the rule"), 0)
+        self.assertGreater(model_logit(model, "verify the login flow"), 0)
+
+    def test_missing_artifact_returns_none(self):
+        self.assertIsNone(load_model("/nonexistent/model.json"))
+
+
+class TestIntentClassifier(unittest.TestCase):
+
+    def test_obvious_cases_decided_locally(self):
+        clf = IntentClassifier(model_path=None)
+        self.assertEqual(clf.classify("How long is the lockout period?")["intent"], "QUESTION")
+        decision = clf.classify("Feature: X\nScenarios:\n1. a\n2. b")
+        self.assertEqual(decision["intent"], "REQUIREMENT")
+        self.assertEqual(decision["path"], "heuristic")
+
+    def test_uncertain_input_is_escalated(self):
+        decision = IntentClassifier(model_path=None).classify("login page")
+        self.assertIsNone(decision["intent"])
+        self.assertEqual(decision["path"], "escalate")
+
+    def test_model_settles_borderline_case(self):
+        clf = IntentClassifier(model_path=None)
+        clf.model = {"dim": 64, "ngrams": 1, "bias": 5.0, "weights": {}}
+        decision = clf.classify("login page")
+        self.assertEqual(decision["intent"], "REQUIREMENT")
+        self.assertEqual(decision["path"], "model")
+
+    def test_shipped_artifact_loads(self):
+        self.assertIsNotNone(IntentClassifier().model)
+
+
+class TestRecordDecision(unittest.TestCase):
+
+    def test_appends_jsonl_row(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "logs", "decisions.jsonl")
+            record_decision(path, "What?", {"intent": "QUESTION", "path": "heuristic"}, raw=True)
+            record_decision(path, "Verify", {"intent": "REQUIREMENT", "path": "llm"}, raw=True)
+            with open(path) as f:
+                rows = [json.loads(line) for line in f]
+        self.assertEqual([r["intent"] for r in rows], ["QUESTION", "REQUIREMENT"])
+        self.assertEqual(rows[0]["text"], "What?")
+
+    def test_keeps_only_hash_and_snippet_by_default(self):
+        story = "Verify login for card 4111 1111 1111 1111 with password hunter2"
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "decisions.jsonl")
+            record_decision(path, story, {"intent": "REQUIREMENT", "path": "heuristic"})
+            with open(path) as f:
+                content = f.read()
+        row = json.loads(content)
+        self.assertNotIn("text", row)
+        self.assertNotIn("hunter2", content)
+        self.assertEqual(row["snippet"], story[:LOG_SNIPPET_CHARS])
+        self.assertEqual(len(row["text_sha256"]), 64)
+        self.assertEqual(row["intent"], "REQUIREMENT")
+
+    def test_disabled_when_path_is_none(self):
+        record_decision(None, "text", {"intent": "QUESTION"})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
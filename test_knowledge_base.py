@@ -11,6 +11,7 @@ for _mod in ("langchain_chroma", "chromadb"):
         sys.modules[_mod] = MagicMock()
 
 from tools.knowledge_base import get_db_sources, _delete_by_source, update_vector_store
+from tools.tracing import add_listener, remove_listener
 
 
 def _make_doc(source):
@@ -96,6 +97,23 @@ class TestUpdateVectorStore(unittest.TestCase):
 
         vs.add_documents.assert_called_once()
 
+    @patch("tools.knowledge_base.Chroma")
+    @patch("tools.knowledge_base.get_embedding_function")
+    def test_sync_is_recorded_as_an_ingest_span(self, mock_emb, MockChroma):
+        MockChroma.return_value = self._make_vs(db_sources=[])
+        spans = []
+        listener = lambda data, trace: spans.append(data)
+        add_listener(listener)
+        self.addCleanup(remove_listener, listener)
+
+        with patch("tools.knowledge_base.RecursiveCharacterTextSplitter") as MockSplitter:
+            MockSplitter.return_value.split_documents.return_value = [MagicMock()] * 3
+            update_vector_store([_make_doc("/data/a.pdf"), _make_doc("/data/b.pdf")], interactive=False)
+
+        ingest = [s for s in spans if s["name"] == "ingest"]
+        self.assertEqual(len(ingest), 1)
+        self.assertEqual(ingest[0]["attributes"], {"files_added": 2, "files_deleted": 0, "chunks": 3})
+
     @patch("tools.knowledge_base.Chroma")
     @patch("tools.knowledge_base.get_embedding_function")
     def test_deleted_files_removed_non_interactively(self, mock_emb, MockChroma):
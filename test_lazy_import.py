@@ -0,0 +1,58 @@
+import sys
+import os
+import json
+import subprocess
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from tools.lazy_import import LazyImport, lazy_import
+from benchmark_imports import parse_importtime, HEAVY_MODULES, SRC_DIR
+
+class TestLazyImport(unittest.TestCase):
+
+    def test_resolves_on_call_and_attribute_access(self):
+        ordered = lazy_import("collections", "OrderedDict")
+        self.assertIsInstance(ordered, LazyImport)
+        self.assertEqual(list(ordered(b=1, a=2)), ["b", "a"])
+        self.assertEqual(ordered.__name__, "OrderedDict")
+        self.assertIn("collections.OrderedDict", repr(ordered))
+
+        dumps, loads = lazy_import("json", "dumps", "loads")
+        self.assertEqual(loads(dumps({"a": 1})), {"a": 1})
+
+    def test_missing_module_fails_on_first_use_not_at_definition(self):
+        proxy = lazy_import("no_such_module_anywhere", "Thing")
+        with self.assertRaises(ImportError):
+            proxy()
+
+    def test_module_attribute_can_still_be_patched(self):
+        import agents.author
+        with patch("agents.author.ChatOllama") as chat:
+            agents.author.ChatOllama(model="m")
+        chat.assert_called_once_with(model="m")
+        self.assertIsInstance(agents.author.ChatOllama, LazyImport)
+
+class TestImportCost(unittest.TestCase):
+
+    def test_entry_points_do_not_load_heavy_dependencies(self):
+        code = ("import sys, json, main, batch, api, ingest_data, agents.manager; "
+                f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+        result = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(json.loads(result.stdout.strip().splitlines()[-1]), [])
+
+    def test_parse_importtime(self):
+        rows = parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _json\n"
+            "import time:       900 |       1020 | json\n"
+        )
+        self.assertEqual(rows, [
+            {"module": "_json", "self_us": 120, "cumulative_us": 120, "depth": 1},
+            {"module": "json", "self_us": 900, "cumulative_us": 1020, "depth": 0},
+        ])
+
+if __name__ == "__main__":
+    unittest.main()
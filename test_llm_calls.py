@@ -0,0 +1,181 @@
+import sys
+import os
+import time
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+import config
+from tools import llm_calls
+from tools.llm_governor import Governor
+from tools.llm_calls import (invoke_chain, ModelCallError, ModelTimeoutError, LatencyStats,
+                             is_transient, backoff_delay, llm_options, static_prefix, warm_up)
+
+
+class _SlowChain:
+    """Chain stub: the first `slow_calls` invocations sleep, the rest answer at once."""
+
+    def __init__(self, delay, slow_calls=1, answer="ok"):
+        self.delay = delay
+        self.slow_calls = slow_calls
+        self.answer = answer
+        self.calls = 0
+
+    def invoke(self, inputs, config=None):
+        self.calls += 1
+        if self.calls <= self.slow_calls:
+            time.sleep(self.delay)
+            return "slow"
+        return self.answer
+
+
+class TestInvokeChain(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.multiple(config, LLM_MAX_RETRIES=2, LLM_BACKOFF_BASE=0.0, LLM_HEDGE_ROLES=(),
+                                 LLM_TIMEOUTS={"author": 0.2})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_returns_the_chain_result(self):
+        chain = MagicMock()
+        chain.invoke.return_value = "draft"
+        self.assertEqual(invoke_chain("author", "m", chain, {"topic": "x"}), "draft")
+        chain.invoke.assert_called_once()
+        self.assertEqual(chain.invoke.call_args[0][0], {"topic": "x"})
+
+    def test_hung_call_raises_timeout_after_retries(self):
+        chain = _SlowChain(delay=1.0, slow_calls=99)
+        with self.assertRaises(ModelTimeoutError) as cm:
+            invoke_chain("author", "m", chain, {})
+        self.assertEqual(cm.exception.attempts, 3)
+        self.assertEqual(cm.exception.role, "author")
+
+    def test_timed_out_attempt_frees_its_slot_for_the_retry(self):
+        gate = threading.Event()
+        self.addCleanup(gate.set)
+        calls = []
+
+        def invoke(inputs, config=None):
+            calls.append(inputs)
+            if len(calls) == 1:
+                gate.wait(5)  # hangs well past the timeout, still "running"
+                return "late"
+            return "draft"
+
+        chain = MagicMock()
+        chain.invoke.side_effect = invoke
+        governor = Governor(limits={"m": 1})
+        with patch.object(llm_calls, "GOVERNOR", governor):
+            started = time.perf_counter()
+            self.assertEqual(invoke_chain("author", "m", chain, {}), "draft")
+            self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual([lane["active"] for lane in governor.snapshot().values()], [0])
+
+    def test_transient_error_is_retried(self):
+        chain = MagicMock()
+        chain.invoke.side_effect = [ConnectionError("refused"), "draft"]
+        self.assertEqual(invoke_chain("author", "m", chain, {}), "draft")
+        self.assertEqual(chain.invoke.call_count, 2)
+
+    def test_permanent_error_fails_fast(self):
+        chain = MagicMock()
+        chain.invoke.side_effect = ValueError("model 'x' not found")
+        with self.assertRaises(ModelCallError) as cm:
+            invoke_chain("author", "m", chain, {})
+        self.assertEqual(chain.invoke.call_count, 1)
+        self.assertNotIsInstance(cm.exception, ModelTimeoutError)
+
+    def test_hedged_request_wins_when_first_attempt_stalls(self):
+        stats = LatencyStats()
+        for _ in range(5):
+            stats.record("archivist", 0.05)
+        chain = _SlowChain(delay=0.5, slow_calls=1, answer="hedged")
+        with patch.object(llm_calls, "LATENCY", stats), \
+             patch.multiple(config, LLM_HEDGE_ROLES=("archivist",), LLM_HEDGE_MIN_SAMPLES=5,
+                            LLM_TIMEOUTS={"archivist": 2}):
+            started = time.perf_counter()
+            self.assertEqual(invoke_chain("archivist", "m", chain, "q"), "hedged")
+        self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertEqual(chain.calls, 2)
+
+
+class TestHelpers(unittest.TestCase):
+
+    def test_transient_classification(self):
+        self.assertTrue(is_transient(ConnectionError()))
+        self.assertTrue(is_transient(type("E", (Exception,), {"status_code": 503})()))
+        self.assertTrue(is_transient(type("E", (Exception,), {"status_code": 429})()))
+        self.assertFalse(is_transient(type("E", (Exception,), {"status_code": 404})()))
+        self.assertFalse(is_transient(ValueError()))
+
+    def test_backoff_is_jittered_and_capped(self):
+        with patch.multiple(config, LLM_BACKOFF_BASE=1.0, LLM_BACKOFF_MAX=3.0):
+            delays = [backoff_delay(10) for _ in range(50)]
+        self.assertTrue(all(0 <= d <= 3.0 for d in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+    def test_percentile_needs_enough_samples(self):
+        stats = LatencyStats()
+        stats.record("manager", 1.0)
+        self.assertIsNone(stats.percentile("manager", 95, min_samples=2))
+        for value in range(2, 21):
+            stats.record("manager", float(value))
+        self.assertEqual(stats.percentile("manager", 95, min_samples=2), 19.0)
+
+
+class TestPrefixCacheAndKeepAlive(unittest.TestCase):
+
+    def test_static_prefix_stops_at_first_variable(self):
+        self.assertEqual(static_prefix("Rules first.\nJSON: {{\"a\": 1}}\nInput: {input} tail"),
+                         'Rules first.\nJSON: {"a": 1}\nInput: ')
+        self.assertEqual(static_prefix("no variables"), "no variables")
+
+    def test_agent_prompts_put_variables_after_the_instructions(self):
+        from agents.author import Author
+        from agents.auditor import Auditor
+        with patch("agents.author.ChatOllama"), patch("agents.auditor.ChatOllama"):
+            templates = [Author().prompt.template, Auditor(archivist_agent=None).prompt.template]
+        for template in templates:
+            prefix = static_prefix(template)
+            self.assertIn("FORMAT:", prefix)
+            self.assertGreater(len(prefix), len(template) * 0.7)
+        author = templates[0]
+        self.assertLess(author.index("{context}"), author.index("{topic}"))
+
+    def test_llm_options_carry_keep_alive(self):
+        with patch.multiple(config, LLM_KEEP_ALIVE={"author": "1h"}, LLM_TIMEOUTS={"author": 10}):
+            self.assertEqual(llm_options("author"), {"client_kwargs": {"timeout": 15}, "keep_alive": "1h"})
+            self.assertNotIn("keep_alive", llm_options("scribe"))
+
+    def test_warm_up_primes_each_prefix_and_survives_failures(self):
+        client = MagicMock()
+        client.chat.side_effect = [None, ConnectionError("down")]
+        with patch.multiple(config, LLM_KEEP_ALIVE={"author": "1h"}):
+            results = warm_up([("author", "small", "You are the Author."), ("auditor", "big", "Audit.")],
+                              client=client)
+        first = client.chat.call_args_list[0][1]
+        self.assertEqual(first["messages"], [{"role": "user", "content": "You are the Author."}])
+        self.assertEqual(first["keep_alive"], "1h")
+        self.assertEqual(first["options"], {"num_predict": 1})
+        self.assertIsInstance(results["small"], float)
+        self.assertTrue(results["big"].startswith("Error"))
+
+
+class TestAgentsSurfaceTypedFailures(unittest.TestCase):
+
+    def test_author_raises_instead_of_returning_error_text(self):
+        from agents.author import Author
+        with patch("agents.author.ChatOllama"):
+            author = Author()
+        author.chain = MagicMock()
+        author.chain.invoke.side_effect = ValueError("bad request")
+        with self.assertRaises(ModelCallError):
+            author.write("Scenario", context="rules")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,191 @@
+import sys
+import os
+import time
+import tempfile
+import threading
+import unittest
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from tools.llm_governor import Governor, request_context, current_request
+
+
+class TestGovernorLimits(unittest.TestCase):
+
+    def test_concurrency_is_capped_per_model(self):
+        governor = Governor(limits={"big": 2}, default_limit=5)
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def call():
+            with governor.slot("big", endpoint="e"):
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.02)
+                with lock:
+                    active[0] -= 1
+
+        threads = [threading.Thread(target=call) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(governor.snapshot()["e|big"]["served"], 6)
+
+    def test_models_have_independent_lanes(self):
+        governor = Governor(default_limit=1)
+        with governor.slot("a", endpoint="e"):
+            with governor.slot("b", endpoint="e"):
+                snap = governor.snapshot()
+        self.assertEqual(snap["e|a"]["active"], 1)
+        self.assertEqual(snap["e|b"]["active"], 1)
+
+    def test_release_is_idempotent_and_non_blocking_acquire_needs_a_free_slot(self):
+        governor = Governor(default_limit=1)
+        waited, release = governor.acquire("m", endpoint="e")
+        self.assertIsNone(governor.acquire("m", endpoint="e", blocking=False))
+        release()
+        release()
+        self.assertEqual(governor.snapshot()["e|m"]["active"], 0)
+        self.assertIsNotNone(governor.acquire("m", endpoint="e", blocking=False))
+
+
+class TestGovernorOrdering(unittest.TestCase):
+
+    def _run_queue(self, governor, waiters):
+        """Holds the only slot, queues `waiters` (priority, session), then releases."""
+        order = []
+        release = threading.Event()
+
+        def holder():
+            with governor.slot("m", endpoint="e", session="holder"):
+                release.wait()
+
+        def waiter(priority, session, label):
+            with governor.slot("m", endpoint="e", priority=priority, session=session):
+                order.append(label)
+
+        threads = [threading.Thread(target=holder)]
+        threads[0].start()
+        time.sleep(0.02)
+        for priority, session, label in waiters:
+            t = threading.Thread(target=waiter, args=(priority, session, label))
+            t.start()
+            threads.append(t)
+            time.sleep(0.02)
+        self.assertEqual(governor.snapshot()["e|m"]["queued"], len(waiters))
+        release.set()
+        for t in threads:
+            t.join()
+        return order
+
+    def test_interactive_calls_jump_ahead_of_batch(self):
+        order = self._run_queue(Governor(default_limit=1), [
+            ("batch", "s1", "batch-1"), ("batch", "s1", "batch-2"), ("interactive", "s2", "question"),
+        ])
+        self.assertEqual(order[0], "question")
+
+    def test_fifo_within_same_priority(self):
+        order = self._run_queue(Governor(default_limit=1), [
+            ("generation", "s1", "first"), ("generation", "s2", "second"),
+        ])
+        self.assertEqual(order, ["first", "second"])
+
+    def test_session_with_fewest_calls_in_flight_goes_first(self):
+        governor = Governor(default_limit=2)
+        order = []
+        release = threading.Event()
+
+        def hold(session):
+            with governor.slot("m", endpoint="e", session=session):
+                release.wait()
+
+        def wait(session):
+            with governor.slot("m", endpoint="e", session=session):
+                order.append(session)
+                time.sleep(0.01)
+
+        threads = [threading.Thread(target=hold, args=("heavy",)), threading.Thread(target=hold, args=("light",))]
+        for t in threads:
+            t.start()
+        time.sleep(0.02)
+        for session in ("heavy", "light"):
+            t = threading.Thread(target=wait, args=(session,))
+            t.start()
+            threads.append(t)
+            time.sleep(0.02)
+        # Free the 'light' holder's slot first: 'heavy' still has one call in flight
+        release.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(sorted(order), ["heavy", "light"])
+
+    def test_two_freed_slots_serve_both_waiters(self):
+        governor = Governor(default_limit=2)
+        release, acquired = threading.Event(), {}
+
+        def hold():
+            with governor.slot("m", endpoint="e", session="holder"):
+                release.wait()
+
+        def wait(label):
+            with governor.slot("m", endpoint="e", session=label):
+                acquired[label] = True
+                release.wait()
+
+        threads = [threading.Thread(target=hold) for _ in range(2)]
+        for label in ("b", "c"):
+            threads.append(threading.Thread(target=wait, args=(label,)))
+        for t in threads:
+            t.start()
+            time.sleep(0.02)
+        # Two slots open at once but only one waiter is woken: the one that takes a
+        # slot must wake the next, or 'c' sits in the queue next to a free slot
+        with governor._cond:
+            governor._lanes["e|m"].limit = 4
+            governor._cond.notify()
+        deadline = time.time() + 1
+        while len(acquired) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        served = sorted(acquired)
+        release.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(served, ["b", "c"])
+
+
+class TestRequestContext(unittest.TestCase):
+
+    def test_outer_context_wins(self):
+        with request_context(priority="batch", session="job-1"):
+            with request_context(priority="interactive", session="other"):
+                self.assertEqual(current_request(), {"priority": "batch", "session": "job-1"})
+
+    def test_defaults_outside_any_request(self):
+        self.assertEqual(current_request()["priority"], "generation")
+
+
+@unittest.skipUnless(os.name == "posix", "cross-process limits use fcntl")
+class TestCrossProcessSlots(unittest.TestCase):
+
+    def test_lock_files_cap_two_governors_sharing_a_directory(self):
+        with tempfile.TemporaryDirectory() as lock_dir:
+            first = Governor(default_limit=1, lock_dir=lock_dir)
+            second = Governor(default_limit=1, lock_dir=lock_dir)
+            entered = threading.Event()
+
+            def other():
+                with second.slot("m", endpoint="e"):
+                    entered.set()
+
+            with first.slot("m", endpoint="e"):
+                t = threading.Thread(target=other)
+                t.start()
+                self.assertFalse(entered.wait(0.2))
+            t.join(2)
+            self.assertTrue(entered.is_set())
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
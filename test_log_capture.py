@@ -0,0 +1,95 @@
+import sys
+import os
+import shutil
+import logging
+import tempfile
+import threading
+import contextvars
+import unittest
+from io import StringIO
+from unittest.mock import MagicMock, patch
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from tools.log_capture import LogBuffer, capture
+from tools.jobs import JobQueue
+
+
+class TestCapture(unittest.TestCase):
+
+    def test_prints_and_log_records_go_to_the_sink(self):
+        sink = LogBuffer()
+        with patch("sys.stdout", new_callable=StringIO) as out:
+            with capture(sink):
+                print("[MANAGER] inside")
+                logging.getLogger("trace.test").warning("slow model")
+            print("outside")
+            self.assertEqual(out.getvalue(), "outside\n")
+        self.assertIn("[MANAGER] inside\n", sink.text())
+        self.assertIn("WARNING trace.test: slow model", sink.text())
+
+    def test_concurrent_captures_do_not_mix(self):
+        barrier = threading.Barrier(2)
+        sinks = {name: LogBuffer() for name in ("a", "b")}
+
+        def work(name):
+            with capture(sinks[name]):
+                for i in range(50):
+                    print(f"{name}{i}")
+                    if i == 10:
+                        barrier.wait()
+                # Helper threads that copy the context write to the same sink
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    pool.submit(contextvars.copy_context().run, print, f"{name}-child").result()
+
+        threads = [threading.Thread(target=work, args=(name,)) for name in sinks]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        for name, other in (("a", "b"), ("b", "a")):
+            lines = sinks[name].text().split()
+            self.assertEqual(lines, [f"{name}{i}" for i in range(50)] + [f"{name}-child"])
+            self.assertFalse(any(line.startswith(other) for line in lines))
+
+    def test_buffer_keeps_the_tail(self):
+        sink = LogBuffer(max_chars=10)
+        sink.write("0123456789")
+        sink.write("abc")
+        self.assertEqual(sink.text(), "3456789abc")
+
+
+class _ChattyManager:
+    def __init__(self):
+        self.scribe = MagicMock()
+        self.last_trace_id = None
+
+    def sync_knowledge(self):
+        pass
+
+    def process_request(self, story, **kwargs):
+        print(f"[MANAGER] working on {story}")
+        return "Archivist Report: done"
+
+
+class TestJobLogs(unittest.TestCase):
+
+    def test_each_job_keeps_its_own_output(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        jobs = JobQueue(_ChattyManager, workers=2, output_dir=tmp, capture_logs=True).start()
+        self.addCleanup(jobs.stop, 1)
+
+        submitted = [jobs.submit(f"story {n}") for n in range(4)]
+        for job in submitted:
+            while not job.finished:
+                job.wait_events(len(job.events) - 1, timeout=1)
+
+        for n, job in enumerate(submitted):
+            self.assertEqual(job.log.text(), f"[MANAGER] working on story {n}\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,9 @@
 import sys
 import os
+import json
+import shutil
+import tempfile
+import unittest
 from unittest.mock import MagicMock, patch
 
 # Add src to path so we can import the Manager
@@ -12,6 +16,8 @@ for _mod in ("langchain_chroma", "chromadb"):
         sys.modules[_mod] = MagicMock()
 
 from agents.manager import Manager
+from tools.llm_calls import ModelCallError
+from tools.model_router import ModelRouter
 
 def run_test():
     print("--- Starting Manager Logic Test (Simulation) ---")
@@ -33,6 +39,10 @@ def run_test():
         
         # Initialize Manager (It will use our Mocks now)
         manager = Manager()
+        manager.router = ModelRouter(manager.router.tiers)  # private to the test, never saved
+        manager.trace_log_path = None
+        manager.checkpoint_path = None
+        manager.memo_path = None
 
         # Force the Intent Classifier to be deterministic for this test
         # (So we don't need the real LLM running for this specific logic check)
@@ -91,5 +101,208 @@ def run_test():
         else:
             print(">>> FAIL: Workflow failed.")
 
+def _make_manager():
+    """Builds a Manager whose team and LLM clients are all mocks."""
+    with patch('agents.manager.Archivist'), \
+         patch('agents.manager.Author'), \
+         patch('agents.manager.Auditor'), \
+         patch('agents.manager.Scribe'), \
+         patch('agents.manager.ChatOllama'):
+        manager = Manager()
+    manager.analysis_chain = MagicMock()
+    manager.intent_log_path = None
+    manager.router = ModelRouter(manager.router.tiers)  # private to the test, never saved
+    manager.trace_log_path = None
+    manager.checkpoint_path = None
+    manager.memo_path = None
+    return manager
+
+
+class TestFrontEndAnalysis(unittest.TestCase):
+    """The single structured call that replaces classify_intent + analyze_input."""
+
+    def setUp(self):
+        self.manager = _make_manager()
+        self.manager.analysis_chain.invoke.return_value = json.dumps({
+            "intent": "requirement",
+            "rules": "Feature: Login",
+            "scenarios": ["Valid login", "  ", "Invalid password"],
+        })
+
+    def test_returns_intent_rules_and_scenario_list(self):
+        result = self.manager.analyze_request("story text")
+        self.assertEqual(result["intent"], "REQUIREMENT")
+        self.assertEqual(result["rules"], "Feature: Login")
+        self.assertEqual(result["scenarios"], ["Valid login", "Invalid password"])
+
+    def test_intent_and_parse_share_one_model_call(self):
+        self.manager.intent_classifier.classify = MagicMock(return_value={
+            "intent": None, "path": "escalate", "confidence": 0.6, "reasons": [], "elapsed_ms": 0.1})
+        intent = self.manager.classify_intent("story text")
+        rules, scenarios = self.manager.analyze_input("story text")
+        self.assertEqual(intent, "REQUIREMENT")
+        self.assertEqual(scenarios, ["Valid login", "Invalid password"])
+        self.assertEqual(self.manager.analysis_chain.invoke.call_count, 1)
+
+    def test_cached_result_cannot_be_mutated_by_caller(self):
+        self.manager.analyze_request("story text")["scenarios"].append("junk")
+        self.assertNotIn("junk", self.manager.analyze_request("story text")["scenarios"])
+
+    def test_analysis_is_shared_across_managers_through_the_stage_memo(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        self.manager.memo_path = os.path.join(tmp, "stage_memo.sqlite")
+        self.manager.analyze_request("story text")
+
+        other = _make_manager()
+        other.memo_path = self.manager.memo_path
+        result = other.analyze_request("story text")
+        self.assertEqual(result["scenarios"], ["Valid login", "Invalid password"])
+        other.analysis_chain.invoke.assert_not_called()
+
+    def test_markdown_fenced_json_is_accepted(self):
+        self.manager.analysis_chain.invoke.return_value = (
+            '```json\n{"intent": "QUESTION", "rules": "", "scenarios": []}\n```'
+        )
+        self.assertEqual(self.manager.analyze_request("What is the policy?")["intent"], "QUESTION")
+
+    def test_schema_violation_falls_back_without_caching(self):
+        self.manager.analysis_chain.invoke.return_value = '{"intent": "MAYBE", "rules": "", "scenarios": []}'
+        result = self.manager.analyze_request("raw story")
+        self.assertEqual(result["intent"], "REQUIREMENT")
+        self.assertEqual(result["scenarios"], ["raw story"])
+        self.manager.analyze_request("raw story")
+        self.assertEqual(self.manager.analysis_chain.invoke.call_count, 2)
+
+    def test_schema_failure_escalates_to_next_tier(self):
+        self.manager.router = ModelRouter({"manager": [self.manager.model_name, "bigger"]})
+        bigger = MagicMock()
+        bigger.invoke.return_value = json.dumps({"intent": "QUESTION", "rules": "", "scenarios": []})
+        self.manager._tier_chains["bigger"] = bigger
+        self.manager.analysis_chain.invoke.return_value = "not json"
+
+        result = self.manager.analyze_request("some story")
+
+        self.assertEqual(result["intent"], "QUESTION")
+        stats = self.manager.router.stats()["manager"]
+        self.assertEqual(stats[self.manager.model_name]["rejected"], 1)
+        self.assertEqual(stats["bigger"]["accepted"], 1)
+
+    def test_warm_up_covers_every_tier_once(self):
+        self.manager.router = ModelRouter({"author": ["small", "large"]})
+        for agent in (self.manager.author, self.manager.auditor, self.manager.archivist, self.manager.scribe):
+            agent.prompt.template = "Static instructions.\n{input}"
+        self.manager.author.model_name = "large"
+        self.manager.scribe.model_name = self.manager.model_name
+        self.manager.archivist.model_name = self.manager.model_name
+
+        targets = self.manager.warm_up_targets()
+
+        models = [(role, model) for role, model, _ in targets]
+        self.assertIn(("author", "small"), models)
+        self.assertIn(("author", "large"), models)
+        self.assertEqual(len(models), len({(m, p) for _, m, p in targets}))
+
+    def test_model_failure_raises_typed_error(self):
+        self.manager.analysis_chain.invoke.side_effect = Exception("connection refused")
+        with self.assertRaises(ModelCallError):
+            self.manager.analyze_request("anything")
+
+    def test_model_failure_stops_the_request(self):
+        self.manager.sync_knowledge = MagicMock()
+        self.manager.analysis_chain.invoke.side_effect = Exception("connection refused")
+        result = self.manager.process_request("some unstructured story text")
+        self.assertTrue(result.startswith("Error: Model call failed"))
+        self.manager.author.write.assert_not_called()
+
+    def test_structured_story_skips_the_model(self):
+        story = "Feature: Login\nBackground:\n- 8 char passwords\nScenarios:\n1. Valid login\n2. Lockout"
+        result = self.manager.analyze_request(story)
+        self.assertEqual(result["source"], "rules")
+        self.assertEqual(result["scenarios"], ["Valid login", "Lockout"])
+        self.manager.analysis_chain.invoke.assert_not_called()
+
+    def test_unstructured_input_reports_llm_path(self):
+        self.assertEqual(self.manager.analyze_request("story text")["source"], "llm")
+
+
+class TestLocalIntentClassification(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = _make_manager()
+        self.manager.analysis_chain.invoke.return_value = json.dumps(
+            {"intent": "QUESTION", "rules": "", "scenarios": []})
+
+    def test_obvious_question_skips_the_model(self):
+        self.assertEqual(self.manager.classify_intent("What is the password policy?"), "QUESTION")
+        self.manager.analysis_chain.invoke.assert_not_called()
+        self.assertIn(self.manager.last_intent_decision["path"], ("heuristic", "model"))
+
+    def test_uncertain_input_escalates_to_llm(self):
+        self.manager.intent_classifier.classify = MagicMock(return_value={
+            "intent": None, "path": "escalate", "confidence": 0.55, "reasons": [], "elapsed_ms": 0.1})
+        self.assertEqual(self.manager.classify_intent("login page"), "QUESTION")
+        self.assertEqual(self.manager.last_intent_decision["path"], "llm")
+        self.manager.analysis_chain.invoke.assert_called_once()
+
+    def test_decision_is_recorded(self):
+        with patch('agents.manager.record_decision') as mock_record:
+            self.manager.classify_intent("Verify login with valid credentials")
+        logged = mock_record.call_args[0][2]
+        self.assertEqual(logged["intent"], "REQUIREMENT")
+        self.assertFalse(mock_record.call_args.kwargs["raw"])
+
+
+
+class TestLazyAgents(unittest.TestCase):
+    """Agents are built on first use, not in Manager()."""
+
+    def setUp(self):
+        patchers = {name: patch(f"agents.manager.{name}") for name in ("Archivist", "Author", "Auditor", "Scribe")}
+        self.classes = {name: p.start() for name, p in patchers.items()}
+        with patch("agents.manager.ChatOllama"):
+            self.manager = Manager()
+        for p in patchers.values():
+            p.stop()
+        self.manager.intent_log_path = None
+        self.manager.router = ModelRouter(self.manager.router.tiers)  # private to the test, never saved
+        self.manager.trace_log_path = None
+        self.manager.checkpoint_path = None
+        self.manager.memo_path = None
+
+    def test_construction_builds_no_agent(self):
+        for cls in self.classes.values():
+            cls.assert_not_called()
+        self.assertGreater(self.manager.startup_ms, 0)
+
+    def test_question_builds_only_the_archivist(self):
+        self.manager.sync_knowledge = MagicMock()
+        self.manager.classify_intent = MagicMock(return_value="QUESTION")
+        self.manager.process_request("What is the policy?")
+        self.classes["Archivist"].assert_called_once()
+        for name in ("Author", "Auditor", "Scribe"):
+            self.classes[name].assert_not_called()
+        # Built once, then reused
+        self.assertIs(self.manager.archivist, self.manager.archivist)
+
+    def test_prewarm_builds_every_agent_in_the_background(self):
+        with patch("agents.manager.config.LLM_WARMUP", False):
+            self.manager.prewarm().join(5)
+        for cls in self.classes.values():
+            cls.assert_called_once()
+        self.classes["Auditor"].assert_called_once_with(archivist_agent=self.manager.archivist)
+
+    def test_agent_failure_is_an_error_result_not_an_exit(self):
+        self.classes["Archivist"].side_effect = FileNotFoundError("Vector Store not found. Run ingestion first.")
+        self.manager.sync_knowledge = MagicMock()
+        self.manager.classify_intent = MagicMock(return_value="QUESTION")
+        result = self.manager.process_request("What is the policy?")
+        self.assertEqual(result, "Error: Archivist could not be initialized: Vector Store not found. "
+                                 "Run ingestion first.")
+        # The next request tries again
+        self.classes["Archivist"].side_effect = None
+        self.assertTrue(self.manager.process_request("What is the policy?").startswith("Archivist Report"))
+
+
 if __name__ == "__main__":
     run_test()
\ No newline at end of file
@@ -0,0 +1,100 @@
+import sys
+import os
+import time
+import threading
+import unittest
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from tools.manager_pool import ManagerPool, PoolTimeout
+
+
+class _Manager:
+    """Fails the test if two requests ever run on it at once."""
+
+    def __init__(self):
+        self.busy = threading.Lock()
+        self.handled = 0
+
+    def process_request(self, user_input, **kwargs):
+        if not self.busy.acquire(blocking=False):
+            raise AssertionError("Manager used by two requests at once")
+        try:
+            time.sleep(0.01)
+            self.handled += 1
+            return f"done {user_input}"
+        finally:
+            self.busy.release()
+
+
+class TestManagerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.built = []
+
+    def _factory(self):
+        manager = _Manager()
+        self.built.append(manager)
+        return manager
+
+    def test_concurrent_requests_share_at_most_size_managers(self):
+        pool = ManagerPool(self._factory, size=3)
+        results = []
+        threads = [threading.Thread(target=lambda n=n: results.append(pool.process_request(f"s{n}")))
+                   for n in range(12)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(results), 12)
+        self.assertLessEqual(len(self.built), 3)
+        self.assertEqual(sum(m.handled for m in self.built), 12)
+        self.assertEqual(pool.stats(), {"size": 3, "created": len(self.built), "idle": len(self.built),
+                                        "in_use": 0, "waiting": 0})
+
+    def test_waits_for_a_free_manager_and_times_out(self):
+        pool = ManagerPool(self._factory, size=1)
+        got = []
+
+        def wait_for_one():
+            with pool.acquire(timeout=2) as manager:
+                got.append(manager)
+
+        with pool.acquire() as first:
+            with self.assertRaises(PoolTimeout):
+                with pool.acquire(timeout=0.05):
+                    pass
+            waiter = threading.Thread(target=wait_for_one)
+            waiter.start()
+            time.sleep(0.05)
+            self.assertEqual((got, pool.stats()["waiting"]), ([], 1))
+        waiter.join()
+        self.assertEqual(got, [first])
+
+    def test_manager_that_raised_is_replaced(self):
+        pool = ManagerPool(self._factory, size=1)
+        with self.assertRaises(RuntimeError):
+            with pool.acquire():
+                raise RuntimeError("boom")
+        with pool.acquire() as manager:
+            self.assertIs(manager, self.built[1])
+
+    def test_failed_construction_frees_the_slot(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise SystemExit(1)
+            return _Manager()
+
+        pool = ManagerPool(flaky, size=1)
+        with self.assertRaises(SystemExit):
+            pool.process_request("s")
+        self.assertEqual(pool.process_request("s"), "done s")
+        self.assertEqual(pool.stats()["created"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
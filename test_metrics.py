@@ -0,0 +1,107 @@
+import sys
+import os
+import unittest
+import urllib.request
+import urllib.error
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from tools import metrics
+from tools.metrics import Registry, record_span, serve
+from tools.tracing import Trace
+
+
+def _span(name, duration_ms=100.0, status="ok", **attributes):
+    return {"name": name, "duration_ms": duration_ms, "status": status, "attributes": attributes}
+
+
+class TestExposition(unittest.TestCase):
+
+    def test_counter_and_gauge_lines(self):
+        registry = Registry()
+        counter = registry.counter("jobs_total", "Jobs.", ["kind"])
+        counter.inc(kind="a")
+        counter.inc(2, kind='say "hi"')
+        registry.gauge("depth", "Depth.").set(3)
+        text = registry.render()
+        self.assertIn("# TYPE jobs_total counter", text)
+        self.assertIn('jobs_total{kind="a"} 1', text)
+        self.assertIn('jobs_total{kind="say \\"hi\\""} 2', text)
+        self.assertIn("depth 3", text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+        text = registry.render()
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{le="1.0"} 2', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("latency_seconds_sum 5.55", text)
+        self.assertIn("latency_seconds_count 3", text)
+
+    def test_wrong_labels_and_kind_clashes_are_rejected(self):
+        registry = Registry()
+        counter = registry.counter("c", "C.", ["role"])
+        with self.assertRaises(ValueError):
+            counter.inc(model="x")
+        with self.assertRaises(ValueError):
+            registry.gauge("c", "C.")
+
+    def test_collected_gauge_reads_at_scrape_time(self):
+        registry = Registry()
+        depth = [1]
+        registry.gauge("queued", "Queued.", ["model"], collect=lambda: [({"model": "m"}, depth[0])])
+        depth[0] = 4
+        self.assertIn('queued{model="m"} 4', registry.render())
+
+
+class TestSpanMapping(unittest.TestCase):
+
+    def test_llm_span_updates_latency_calls_and_tokens(self):
+        before = metrics.LLM_TOKENS.value(role="author", model="t-m", kind="prompt")
+        record_span(_span("llm.author", 2000.0, role="author", model="t-m", prompt_tokens=400,
+                          completion_tokens=90, queue_ms=5.0), None)
+        self.assertEqual(metrics.LLM_TOKENS.value(role="author", model="t-m", kind="prompt"), before + 400)
+        self.assertGreaterEqual(metrics.LLM_SECONDS.count(role="author", model="t-m"), 1)
+        self.assertGreaterEqual(metrics.LLM_CALLS.value(role="author", model="t-m", status="ok"), 1)
+
+    def test_intent_and_cache_spans(self):
+        questions = metrics.REQUESTS.value(intent="question")
+        hits = metrics.CACHE.value(cache="analysis", result="hit")
+        record_span(_span("intent", intent="QUESTION"), None)
+        record_span(_span("parse", cache_hit=True), None)
+        self.assertEqual(metrics.REQUESTS.value(intent="question"), questions + 1)
+        self.assertEqual(metrics.CACHE.value(cache="analysis", result="hit"), hits + 1)
+
+    def test_attempts_per_request_come_from_the_trace(self):
+        rounds = metrics.REQUEST_ATTEMPTS.count()
+        rejected = metrics.REJECTIONS.value(stage="auditor")
+        trace = Trace("process_request", {})
+        trace.spans = [_span("drafting", attempt=1), _span("drafting", attempt=2)]
+        record_span(_span("auditor", attempt=1, rejected=2), trace)
+        record_span(_span("process_request"), trace)
+        self.assertEqual(metrics.REQUEST_ATTEMPTS.count(), rounds + 1)
+        self.assertEqual(metrics.REJECTIONS.value(stage="auditor"), rejected + 2)
+
+
+class TestEndpoint(unittest.TestCase):
+
+    def test_metrics_are_served_over_http(self):
+        registry = Registry()
+        registry.counter("served_total", "Served.").inc()
+        server = serve("127.0.0.1", 0, registry=registry)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+
+        with urllib.request.urlopen(base + "/metrics", timeout=5) as response:
+            self.assertTrue(response.headers["Content-Type"].startswith("text/plain; version=0.0.4"))
+            self.assertIn("served_total 1", response.read().decode("utf-8"))
+        with self.assertRaises(urllib.error.HTTPError):
+            urllib.request.urlopen(base + "/other", timeout=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from tools.model_router import ModelRouter, shared_router
+
+
+class TestModelRouter(unittest.TestCase):
+
+    def setUp(self):
+        self.router = ModelRouter({"author": ["small", "medium", "large"], "empty": []})
+
+    def test_tiers_are_clamped(self):
+        self.assertEqual(self.router.model_for("author", 0), "small")
+        self.assertEqual(self.router.model_for("author", 7), "large")
+
+    def test_role_without_tiers_uses_default(self):
+        self.assertEqual(self.router.model_for("auditor", 0, default="own"), "own")
+        self.assertEqual(self.router.model_for("empty", 0, default="own"), "own")
+        self.assertEqual(self.router.levels("auditor"), 1)
+
+    def test_escalation_stops_at_top_tier(self):
+        self.assertTrue(self.router.can_escalate("author", 1))
+        self.assertEqual(self.router.escalate("author", 1), 2)
+        self.assertFalse(self.router.can_escalate("author", 2))
+        self.assertEqual(self.router.escalate("author", 2), 2)
+
+    def test_stats_report_success_rate_and_latency(self):
+        self.router.record("author", "small", True, 1.0)
+        self.router.record("author", "small", False, 3.0)
+        stats = self.router.stats()["author"]["small"]
+        self.assertEqual(stats["success_rate"], 0.5)
+        self.assertEqual(stats["latency_avg_s"], 2.0)
+        self.assertEqual(stats["latency_max_s"], 3.0)
+        self.assertEqual(stats["tier"], 0)
+
+    def test_stats_accumulate_across_runs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "logs", "routing.json")
+            first = ModelRouter({"author": ["small"]}, path)
+            first.record("author", "small", True, 0.5)
+            first.save()
+            second = ModelRouter({"author": ["small"]}, path)
+            second.record("author", "small", False, 0.5)
+            self.assertEqual(second.stats()["author"]["small"]["calls"], 2)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["author"]["small"]["accepted"], 1)
+
+    def test_routers_sharing_a_file_merge_instead_of_overwriting(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "routing.json")
+            a, b = ModelRouter({"author": ["small"]}, path), ModelRouter({"author": ["small"]}, path)
+            a.record("author", "small", True, 1.0)
+            b.record("author", "small", False, 2.0)
+            b.record("author", "large", True)
+            a.save()
+            b.save()
+            a.save()  # nothing new: the file keeps b's counts
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)["author"]
+            self.assertEqual((saved["small"]["calls"], saved["small"]["accepted"]), (2, 1))
+            self.assertEqual(saved["small"]["latency_max_s"], 2.0)
+            self.assertEqual(saved["large"]["calls"], 1)
+            self.assertEqual(sorted(f for f in os.listdir(tmp) if not f.endswith(".lock")), ["routing.json"])
+
+    def test_shared_router_is_one_per_process_and_file(self):
+        tiers = {"author": ["small"]}
+        self.assertIs(shared_router(tiers, "/tmp/x.json"), shared_router(dict(tiers), "/tmp/x.json"))
+        self.assertIsNot(shared_router(tiers, "/tmp/x.json"), shared_router(tiers, "/tmp/y.json"))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
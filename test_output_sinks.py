@@ -0,0 +1,147 @@
+import sys
+import os
+import csv
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from tools.output_sinks import (CsvSink, XlsxSink, ParquetSink, get_sink, sink_for_path, rows_from_csv,
+                                new_run_id, media_type, RUN_ID_COLUMN)
+
+try:
+    import openpyxl  # noqa: F401
+    _has_openpyxl = True
+except ImportError:
+    _has_openpyxl = False
+
+try:
+    import pyarrow  # noqa: F401
+    _has_pyarrow = True
+except ImportError:
+    _has_pyarrow = False
+
+HEADER = ["ID", "Title", "Steps"]
+ROWS = [["TC_01", "Login, valid", "1. Go\n2. Click"], ["TC_02", "Logout", "1. Leave"]]
+
+class TestHelpers(unittest.TestCase):
+
+    def test_run_ids_are_unique_and_sortable(self):
+        ids = [new_run_id() for _ in range(200)]
+        self.assertEqual(len(set(ids)), 200)
+        self.assertRegex(ids[0], r"^\d{8}T\d{6}Z-[0-9a-f]{8}$")
+
+    def test_rows_from_csv_pads_and_folds(self):
+        header, rows = rows_from_csv('ID,Title,Steps\nTC_01,A\n\nTC_02,B,1. x, then y\n')
+        self.assertEqual(header, HEADER)
+        self.assertEqual(rows, [["TC_01", "A", ""], ["TC_02", "B", "1. x, then y"]])
+        with self.assertRaises(ValueError):
+            rows_from_csv("  \n")
+
+    def test_sink_lookup(self):
+        self.assertIsInstance(get_sink("CSV"), CsvSink)
+        self.assertIsInstance(sink_for_path("/x/sprint.parquet"), ParquetSink)
+        with self.assertRaises(ValueError):
+            get_sink("docx")
+        self.assertEqual(media_type("/x/a.csv"), "text/csv; charset=utf-8")
+        self.assertEqual(media_type("/x/a.bin"), "application/octet-stream")
+
+class _SinkTests:
+    """Shared checks; subclasses set `sink`."""
+    sink = None
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.path = os.path.join(self.tmp, f"out.{self.sink.extension}")
+
+    def test_write_round_trip_leaves_no_temp_files(self):
+        self.assertEqual(self.sink.write(self.path, HEADER, ROWS), 2)
+        self.assertEqual(self.sink.read(self.path), (HEADER, ROWS))
+        self.assertEqual(os.listdir(self.tmp), [os.path.basename(self.path)])
+
+    def test_append_adds_run_ids_and_matches_columns_by_name(self):
+        self.sink.append(self.path, HEADER, ROWS, run_id="r1")
+        self.sink.append(self.path, ["Steps", "ID", "Title"], [["1. x", "TC_03", "Reset"]], run_id="r2")
+        header, rows = self.sink.read(self.path)
+        self.assertEqual(header, [RUN_ID_COLUMN] + HEADER)
+        self.assertEqual(rows[0], ["r1"] + ROWS[0])
+        self.assertEqual(rows[2], ["r2", "TC_03", "Reset", "1. x"])
+
+    def test_append_with_a_new_column_widens_the_header(self):
+        self.sink.append(self.path, HEADER, ROWS, run_id="r1")
+        self.sink.append(self.path, HEADER + ["Priority"], [["TC_03", "Reset", "1. x", "High"]], run_id="r2")
+        header, rows = self.sink.read(self.path)
+        self.assertEqual(header, [RUN_ID_COLUMN] + HEADER + ["Priority"])
+        self.assertEqual(rows[0], ["r1"] + ROWS[0] + [""])
+        self.assertEqual(rows[2], ["r2", "TC_03", "Reset", "1. x", "High"])
+
+    def test_append_replaces_the_rows_of_earlier_runs(self):
+        self.sink.append(self.path, HEADER, ROWS, run_id="r1")
+        self.sink.append(self.path, HEADER, [["TC_03", "t", "s"]], run_id="r2")
+        self.sink.append(self.path, HEADER, [["TC_01", "Login, fixed", "1. Go"]], run_id="r3", replace=["r1"])
+        rows = self.sink.read(self.path)[1]
+        self.assertEqual([row[0] for row in rows], ["r2", "r3"])
+
+class TestCsvSink(_SinkTests, unittest.TestCase):
+    sink = CsvSink()
+
+    def test_failed_write_keeps_the_old_file(self):
+        self.sink.write(self.path, HEADER, ROWS)
+        with patch.object(CsvSink, "_write", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.sink.write(self.path, HEADER, [])
+        self.assertEqual(self.sink.read(self.path), (HEADER, ROWS))
+        self.assertEqual(os.listdir(self.tmp), [os.path.basename(self.path)])
+
+    def test_append_adds_to_the_file_in_place(self):
+        self.sink.append(self.path, HEADER, ROWS, run_id="r1")
+        before = os.stat(self.path)
+        self.sink.append(self.path, HEADER, [["TC_03", "t", "s"]], run_id="r2")
+        after = os.stat(self.path)
+        self.assertEqual(before.st_ino, after.st_ino)
+        self.assertGreater(after.st_size, before.st_size)
+        self.assertEqual(self.sink.read(self.path)[1][-1], ["r2", "TC_03", "t", "s"])
+
+    def test_failed_append_leaves_no_partial_rows(self):
+        self.sink.append(self.path, HEADER, ROWS, run_id="r1")
+        before = self.sink.read(self.path)
+        with patch("tools.output_sinks.os.fsync", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.sink.append(self.path, HEADER, [["TC_03", "t", "s"]], run_id="r2")
+        self.assertEqual(self.sink.read(self.path), before)
+
+    def test_concurrent_appends_lose_nothing(self):
+        def run(i):
+            self.sink.append(self.path, HEADER, [[f"TC_{i}", "t", "s"]], run_id=f"r{i}")
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        with open(self.path, "r", encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f))[1:]
+        self.assertEqual(sorted(row[0] for row in rows), sorted(f"r{i}" for i in range(20)))
+
+@unittest.skipUnless(_has_openpyxl, "openpyxl is not installed")
+class TestXlsxSink(_SinkTests, unittest.TestCase):
+    sink = XlsxSink()
+
+@unittest.skipUnless(_has_pyarrow, "pyarrow is not installed")
+class TestParquetSink(_SinkTests, unittest.TestCase):
+    sink = ParquetSink()
+
+    def test_large_appends_stream_in_row_groups(self):
+        sink = ParquetSink()
+        sink.chunk_rows = 3
+        sink.append(self.path, HEADER, [[f"TC_{i}", "t", "s"] for i in range(7)], run_id="r1")
+        sink.append(self.path, HEADER, [["TC_7", "t", "s"]], run_id="r2")
+        import pyarrow.parquet as pq
+        self.assertEqual(pq.ParquetFile(self.path).metadata.num_rows, 8)
+        self.assertEqual(pq.ParquetFile(self.path).num_row_groups, 3)
+
+if __name__ == "__main__":
+    unittest.main()
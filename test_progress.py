@@ -0,0 +1,50 @@
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from tools.progress import ProgressTracker, similarity
+
+
+class TestSimilarity(unittest.TestCase):
+
+    def test_whitespace_is_ignored(self):
+        self.assertEqual(similarity("Step 1.\n  Click   Login", "Step 1. Click Login"), 1.0)
+
+    def test_unrelated_texts_score_low(self):
+        self.assertLess(similarity("Verify login redirects to dashboard", "zzzz qqqq"), 0.5)
+
+
+class TestProgressTracker(unittest.TestCase):
+
+    def setUp(self):
+        self.tracker = ProgressTracker(draft_threshold=0.95, feedback_threshold=0.9)
+
+    def test_first_rejection_is_never_a_stall(self):
+        self.assertIsNone(self.tracker.record("TC_01", "draft", "fix step 2"))
+
+    def test_identical_draft_is_a_stall(self):
+        self.tracker.record("TC_01", "Title: Login\nSteps: 1. Go", "fix step 2")
+        reason = self.tracker.record("TC_01", "Title: Login\nSteps: 1. Go", "totally different complaint")
+        self.assertIn("near-identical draft", reason)
+
+    def test_oscillation_back_to_an_earlier_draft_is_a_stall(self):
+        self.tracker.record("TC_01", "Expected Result: Dashboard loads", "feedback one")
+        self.tracker.record("TC_01", "Expected Result: An error banner is displayed to the user", "feedback two")
+        reason = self.tracker.record("TC_01", "Expected Result: Dashboard loads", "feedback three")
+        self.assertIsNotNone(reason)
+
+    def test_repeated_feedback_is_a_stall(self):
+        self.tracker.record("TC_01", "Expected Result: Dashboard loads", "STATUS: REJECTED - TC_01 must show lockout")
+        reason = self.tracker.record("TC_01", "Completely rewritten case about an error banner",
+                                     "STATUS: REJECTED - TC_01 must show lockout")
+        self.assertIn("same feedback", reason)
+
+    def test_cases_are_tracked_independently(self):
+        self.tracker.record("TC_01", "same", "same")
+        self.assertIsNone(self.tracker.record("TC_02", "same", "same"))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
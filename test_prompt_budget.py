@@ -0,0 +1,90 @@
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from tools.prompt_budget import (
+    count_tokens, dedupe, trim_context, focus_previous_draft, enforce_budget,
+)
+
+
+class _Prompt:
+    """Minimal stand-in for a PromptTemplate: renders every input in order."""
+
+    def format(self, **inputs):
+        return "STATIC INSTRUCTIONS\n" + "\n".join(f"{k}: {v}" for k, v in inputs.items())
+
+
+PREVIOUS = """Test Case ID: TC_02
+Title: Lockout
+Pre-conditions: User exists
+Steps:
+1. Fail login three times
+Expected Result: Error shown"""
+
+
+class TestCompressionSteps(unittest.TestCase):
+
+    def test_count_tokens_estimate(self):
+        self.assertEqual(count_tokens("abcd" * 10), 10)
+        self.assertEqual(count_tokens(""), 0)
+
+    def test_dedupe_removes_repeated_paragraphs_only(self):
+        text = ("Passwords need 8 characters minimum.\n\nLockout after three failed attempts.\n\n"
+                "Passwords need 8 characters minimum.")
+        self.assertEqual(dedupe(text).count("Passwords need 8"), 1)
+        # A line shared by two different paragraphs stays in both
+        cases = "TC_01\n1. Enter valid username and password\n\nTC_02\n1. Enter valid username and password"
+        self.assertEqual(dedupe(cases), cases)
+
+    def test_trim_context_keeps_relevant_paragraphs_and_headers(self):
+        context = ("USER PROVIDED RULES:\n\nAccount lockout after three failed attempts.\n\n"
+                   "Invoices are exported monthly to the finance system in PDF format.")
+        trimmed = trim_context(context, "Account lockout scenario", max_tokens=25)
+        self.assertIn("USER PROVIDED RULES:", trimmed)
+        self.assertIn("lockout", trimmed)
+        self.assertNotIn("Invoices", trimmed)
+
+    def test_focus_previous_draft_keeps_only_sections_named_in_feedback(self):
+        focused = focus_previous_draft(PREVIOUS, "Expected Result must say 'Account locked'")
+        self.assertIn("Test Case ID: TC_02", focused)
+        self.assertIn("Expected Result: Error shown", focused)
+        self.assertNotIn("Fail login three times", focused)
+        self.assertIn("unchanged and omitted", focused)
+
+
+class TestEnforceBudget(unittest.TestCase):
+
+    def test_under_budget_is_untouched(self):
+        inputs = {"topic": "Login", "context": "rules"}
+        out, report = enforce_budget(_Prompt(), inputs, 1000, focus="Login")
+        self.assertIs(out, inputs)
+        self.assertEqual(report["steps"], [])
+
+    def test_over_budget_prompt_is_brought_under_budget(self):
+        context = "\n\n".join(f"Unrelated paragraph number {i} about invoices and exports." for i in range(200))
+        inputs = {"topic": "Account lockout", "context": "Lockout after 3 failures.\n\n" + context,
+                  "feedback": "Fix Expected Result", "previous_draft": PREVIOUS}
+        out, report = enforce_budget(_Prompt(), inputs, 300, focus="Account lockout")
+        self.assertLessEqual(report["after"], 300)
+        self.assertGreater(report["before"], 300)
+        self.assertIn("Lockout after 3 failures.", out["context"])
+        self.assertIn("diff-previous-draft", report["steps"])
+        self.assertEqual(inputs["previous_draft"], PREVIOUS)
+
+    def test_drafts_under_review_are_never_deduped(self):
+        case = "Pre-conditions: User is registered\n1. Enter valid username and password"
+        test_cases = f"Test Case ID: TC_01\n{case}\n\nTest Case ID: TC_02\n{case}\n\n{case}\n\n{case}"
+        inputs = {"requirement": "Login", "test_cases": test_cases}
+        out, report = enforce_budget(_Prompt(), inputs, 10, focus="Login", context_field=None)
+        self.assertEqual(out["test_cases"], test_cases)
+        self.assertNotIn("dedupe", report["steps"])
+
+    def test_none_budget_disables_check(self):
+        _, report = enforce_budget(_Prompt(), {"context": "x" * 10000}, None)
+        self.assertEqual(report["steps"], [])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -1,5 +1,7 @@
 import sys
 import os
+import io
+import csv
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -97,6 +99,94 @@ class TestScribeUnit(unittest.TestCase):
         output_dir = os.path.join(os.getcwd(), "data", "outputs")
         self.assertTrue(os.path.exists(output_dir))
 
+    def test_parseable_draft_skips_the_llm(self):
+        result = self.scribe.save(DUMMY_DRAFT)
+        self.assertIn("Success", result)
+        self.scribe.chain.invoke.assert_not_called()
+
+    def test_multiline_steps_are_quoted_into_one_cell(self):
+        result = self.scribe.save(DUMMY_DRAFT)
+        filepath = result.split(": ", 1)[1].strip()
+        with open(filepath, "r", encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ["ID", "Title", "Pre-conditions", "Steps", "Expected Result"])
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1][0], "TC_001")
+        self.assertEqual(rows[1][3], "1. Enter username\n2. Enter password\n3. Click Login")
+
+    def test_unparseable_draft_falls_back_to_llm(self):
+        self.scribe.chain.invoke.return_value = EXPECTED_CSV
+        result = self.scribe.save("Some free-form text the parser cannot read")
+        self.assertIn("Success", result)
+        self.scribe.chain.invoke.assert_called_once()
+
+    def test_saves_in_the_same_second_get_distinct_files(self):
+        first = self.scribe.save(DUMMY_DRAFT).split(": ", 1)[1].strip()
+        second = self.scribe.save(DUMMY_DRAFT).split(": ", 1)[1].strip()
+        self.assertNotEqual(first, second)
+        self.assertTrue(os.path.exists(first) and os.path.exists(second))
+        self.assertIn(self.scribe.last_run_id, second)
+
+    def test_append_to_collects_runs_in_one_file(self):
+        import tempfile
+        from tools.output_sinks import RUN_ID_COLUMN
+        with tempfile.TemporaryDirectory() as tmp:
+            self.scribe.append_to = os.path.join(tmp, "sprint.csv")
+            self.scribe.save(DUMMY_DRAFT, run_id="run-1")
+            result = self.scribe.save(DUMMY_DRAFT, run_id="run-2")
+            self.assertEqual(result, f"Success. File saved to: {self.scribe.append_to}")
+            with open(self.scribe.append_to, "r", encoding="utf-8", newline="") as f:
+                rows = list(csv.reader(f))
+        self.assertEqual(rows[0][0], RUN_ID_COLUMN)
+        self.assertEqual([row[0] for row in rows[1:]], ["run-1", "run-1", "run-2", "run-2"])
+
+    def test_unknown_format_is_reported_not_raised(self):
+        self.scribe.output_format = "docx"
+        self.assertIn("Unknown output format", self.scribe.save(DUMMY_DRAFT))
+
+
+class TestTestCaseParsing(unittest.TestCase):
+    """Parser/validator shared by the Scribe and the workflow."""
+
+    def test_bracketed_ids_and_bold_labels(self):
+        from tools.test_cases import parse_test_cases
+        cases = parse_test_cases("**Test Case ID:** [TC_01]\n**Title:** Login\nSteps:\n1. Go\nExpected Result: Ok")
+        self.assertEqual(cases[0]["ID"], "TC_01")
+        self.assertEqual(cases[0]["Title"], "Login")
+
+    def test_commas_and_quotes_survive_round_trip(self):
+        from tools.test_cases import cases_to_csv
+        case = {"ID": "TC_01", "Title": 'Say "hi", then leave', "Pre-conditions": "",
+                "Steps": "1. a, b", "Expected Result": "Ok"}
+        rows = list(csv.reader(io.StringIO(cases_to_csv([case]))))
+        self.assertEqual(rows[1][1], 'Say "hi", then leave')
+
+    def test_validation_flags_missing_fields_and_duplicates(self):
+        from tools.test_cases import validate_test_cases
+        problems = validate_test_cases([
+            {"ID": "TC_01", "Title": "A", "Steps": "1. x", "Expected Result": ""},
+            {"ID": "TC_01", "Title": "B", "Steps": "1. y", "Expected Result": "Ok"},
+        ])
+        self.assertIn("TC_01: missing 'Expected Result'.", problems)
+        self.assertIn("TC_01: duplicate Test Case ID.", problems)
+
+    def test_pre_audit_passes_clean_drafts(self):
+        from tools.test_cases import pre_audit
+        result = pre_audit({"TC_01": DUMMY_DRAFT.split("Test Case ID: TC_002")[0].replace("TC_001", "TC_01")},
+                           {"TC_01": "Login success"})
+        self.assertEqual(result, {"TC_01": None})
+
+    def test_pre_audit_flags_ids_shared_between_scenarios(self):
+        from tools.test_cases import pre_audit
+        draft = "Test Case ID: TC_01\nTitle: A\nSteps:\n1. x\nExpected Result: y"
+        result = pre_audit({"TC_01": draft, "TC_02": draft}, {"TC_01": "A", "TC_02": "B"})
+        self.assertIsNone(result["TC_01"])
+        self.assertIn("ID already used", result["TC_02"])
+
+    def test_empty_draft_is_invalid(self):
+        from tools.test_cases import parse_test_cases, validate_test_cases
+        self.assertTrue(validate_test_cases(parse_test_cases("")))
+
 
 @unittest.skipUnless(_ollama_up, INTEGRATION_SKIP)
 class TestScribeIntegration(unittest.TestCase):
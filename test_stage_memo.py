@@ -0,0 +1,82 @@
+import sys
+import os
+import time
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from tools.stage_memo import MemoStore, Memo, content_key
+
+
+class TestContentKey(unittest.TestCase):
+
+    def test_key_changes_with_any_input(self):
+        key = content_key("case", "scenario", "context")
+        self.assertEqual(key, content_key("case", "scenario", "context"))
+        self.assertTrue(key.startswith("case:"))
+        self.assertNotEqual(key, content_key("case", "scenario", "context, edited"))
+        self.assertNotEqual(key, content_key("context", "scenario", "context"))
+        # Parts are delimited: moving text between them is a different key
+        self.assertNotEqual(content_key("case", "ab", "c"), content_key("case", "a", "bc"))
+
+
+class TestMemoStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.store = MemoStore(os.path.join(self.tmp, "state", "stage_memo.sqlite"))
+
+    def test_values_survive_a_new_store_on_the_same_file(self):
+        self.store.put("context:1", "context", {"docs": "d"})
+        self.assertEqual(MemoStore(self.store.path).get("context:1"), {"docs": "d"})
+        self.assertIsNone(self.store.get("context:2"))
+        self.assertEqual(self.store.stats(), {"context": 1})
+
+    def test_old_dependency_table_is_dropped(self):
+        path = os.path.join(self.tmp, "old.sqlite")
+        db = sqlite3.connect(path)
+        db.execute("CREATE TABLE memo_deps (key TEXT, dep TEXT)")
+        db.commit()
+        db.close()
+        MemoStore(path)
+        db = sqlite3.connect(path)
+        tables = {r[0] for r in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        db.close()
+        self.assertEqual(tables, {"memo"})
+
+    def test_prune_drops_unused_entries(self):
+        self.store.put("case:1", "case", {"draft": "a"})
+        self.assertEqual(self.store.prune(max_age_s=3600), 0)
+        time.sleep(0.01)
+        self.assertEqual(self.store.prune(max_age_s=0.001), 1)
+        self.assertEqual(self.store.stats(), {})
+
+    def test_concurrent_writers(self):
+        def work(n):
+            store = MemoStore(self.store.path)
+            for i in range(5):
+                store.put(f"case:{n}-{i}", "case", {"n": n})
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.store.stats(), {"case": 40})
+
+
+class TestMemo(unittest.TestCase):
+
+    def test_without_a_store_nothing_is_remembered(self):
+        memo = Memo()
+        memo.put("case:1", "case", {"draft": "a"})
+        self.assertFalse(memo.enabled)
+        self.assertIsNone(memo.get("case:1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from tools.story_parser import parse_story, split_sections, extract_list_items
+
+STORY = """
+Feature: User Login
+
+Background:
+  - Passwords must be at least 8 characters long.
+
+Acceptance Criteria:
+  - Valid credentials redirect to the Dashboard.
+  - Invalid credentials show an error.
+
+Scenarios:
+  1. Login with valid username and password.
+  2. Login with valid username but wrong password.
+  3. Account lockout after 3 failed
+     login attempts.
+"""
+
+
+class TestParseStory(unittest.TestCase):
+
+    def test_extracts_numbered_scenarios(self):
+        result = parse_story(STORY)
+        self.assertEqual(result["scenarios"], [
+            "Login with valid username and password.",
+            "Login with valid username but wrong password.",
+            "Account lockout after 3 failed login attempts.",
+        ])
+
+    def test_rules_contain_feature_background_and_criteria_only(self):
+        rules = parse_story(STORY)["rules"]
+        self.assertIn("Feature: User Login", rules)
+        self.assertIn("Passwords must be at least 8 characters", rules)
+        self.assertIn("Invalid credentials show an error.", rules)
+        self.assertNotIn("Login with valid username", rules)
+
+    def test_full_layout_has_full_confidence(self):
+        self.assertEqual(parse_story(STORY)["confidence"], 1.0)
+
+    def test_free_text_has_zero_confidence(self):
+        result = parse_story("What is the password policy for admin users?")
+        self.assertEqual(result["confidence"], 0.0)
+        self.assertEqual(result["scenarios"], [])
+
+    def test_scenarios_heading_without_items_has_zero_confidence(self):
+        self.assertEqual(parse_story("Feature: X\nScenarios:\nsee attached doc")["confidence"], 0.0)
+
+    def test_stray_prose_lowers_confidence(self):
+        messy = STORY + "\nAlso please remember the thing we talked about.\n"
+        self.assertLess(parse_story(messy)["confidence"], parse_story(STORY)["confidence"])
+
+    def test_headings_are_case_insensitive_and_markdown_tolerant(self):
+        result = parse_story("## FEATURE: Search\n**Test Scenarios**:\n- By ID\n- By name")
+        self.assertEqual(result["scenarios"], ["By ID", "By name"])
+        self.assertIn("FEATURE: Search", result["rules"])
+
+    def test_custom_aliases_are_recognized(self):
+        text = "Feature: Search\nTest ideas:\n1. By ID\n2. By name"
+        self.assertEqual(parse_story(text)["scenarios"], [])
+        result = parse_story(text, aliases={"scenarios": ["test ideas"]})
+        self.assertEqual(result["scenarios"], ["By ID", "By name"])
+
+    def test_scenarios_on_the_heading_line(self):
+        result = parse_story("Feature: Session\nScenarios: login, logout")
+        self.assertEqual(result["scenarios"], ["login", "logout"])
+        result = parse_story("Feature: Session\nScenarios: login; logout, then back in\n- timeout")
+        self.assertEqual(result["scenarios"], ["login", "logout, then back in", "timeout"])
+        self.assertGreaterEqual(result["confidence"], 0.8)
+
+    def test_gherkin_scenarios(self):
+        gherkin = """
+Feature: User Login
+  Background:
+    Given a registered user "ana"
+
+  Scenario: Valid login
+    Given the login page is open
+    When ana signs in with the right password
+    Then the Dashboard is shown
+
+  Scenario Outline: Lockout
+    When ana fails to sign in <n> times
+    Then the account is locked
+"""
+        result = parse_story(gherkin)
+        self.assertEqual(result["scenarios"], [
+            "Valid login: Given the login page is open; When ana signs in with the right password; "
+            "Then the Dashboard is shown",
+            "Lockout: When ana fails to sign in <n> times; Then the account is locked",
+        ])
+        self.assertIn('Given a registered user "ana"', result["rules"])
+        self.assertNotIn("Dashboard", result["rules"])
+        self.assertEqual(result["confidence"], 1.0)
+
+    def test_empty_input(self):
+        self.assertEqual(parse_story("")["confidence"], 0.0)
+
+
+class TestHelpers(unittest.TestCase):
+
+    def test_split_sections_keeps_document_order(self):
+        sections = [s for s, _, _ in split_sections(STORY)]
+        self.assertEqual(sections, ["feature", "background", "acceptance", "scenarios"])
+
+    def test_extract_list_items_counts_stray_lines(self):
+        items, stray = extract_list_items(["1. One", "2) Two", "* Three", "not an item"])
+        self.assertEqual(items, ["One", "Two", "Three"])
+        self.assertEqual(stray, 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,100 @@
+import sys
+import os
+import time
+import json
+import tempfile
+import subprocess
+import unittest
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from tools.stub_ollama import StubOllamaServer, parse_latency, parse_duration, embed_text
+
+try:
+    import ollama
+    import chromadb  # noqa: F401
+    import langchain_ollama  # noqa: F401
+    HAS_STACK = True
+except ImportError:
+    HAS_STACK = False
+
+
+class TestStubHelpers(unittest.TestCase):
+
+    def test_latency_distributions(self):
+        import random
+        rng = random.Random(1)
+        self.assertEqual(parse_latency("fixed:0.25")(rng), 0.25)
+        self.assertTrue(0.1 <= parse_latency("uniform:0.1,0.2")(rng) <= 0.2)
+        self.assertGreaterEqual(parse_latency("normal:0,5")(rng), 0.0)
+        self.assertEqual(parse_latency(None)(rng), 0.0)
+        with self.assertRaises(ValueError):
+            parse_latency("pareto:1")
+
+    def test_keep_alive_durations(self):
+        self.assertEqual(parse_duration("30m"), 1800)
+        self.assertEqual(parse_duration("10s"), 10)
+        self.assertEqual(parse_duration(-1), -1)
+        self.assertEqual(parse_duration(None), 300)
+
+    def test_embeddings_are_deterministic_and_normalized(self):
+        a = embed_text("account lockout after three attempts", dim=64)
+        self.assertEqual(a, embed_text("account lockout after three attempts", dim=64))
+        self.assertAlmostEqual(sum(v * v for v in a), 1.0)
+
+
+@unittest.skipUnless(HAS_STACK, "ollama client / chromadb / langchain-ollama not installed")
+class TestStubServer(unittest.TestCase):
+
+    def test_scripted_responses_in_order_then_builtins(self):
+        script = {"rules": [{"match": "ping", "response": ["pong 1", "pong 2"], "times": 2}]}
+        with StubOllamaServer(script=script) as server:
+            client = ollama.Client(host=server.url)
+            replies = [client.chat(model="m", messages=[{"role": "user", "content": "ping"}]).message.content
+                       for _ in range(3)]
+        self.assertEqual(replies, ["pong 1", "pong 2", "OK"])
+
+    def test_streaming_latency_and_token_rate(self):
+        script = {"rules": [{"match": ".", "response": " ".join(["word"] * 20)}]}
+        with StubOllamaServer(script=script, latency="fixed:0.1", tokens_per_s=200) as server:
+            client = ollama.Client(host=server.url)
+            started = time.perf_counter()
+            chunks = list(client.chat(model="m", messages=[{"role": "user", "content": "go"}], stream=True))
+            elapsed = time.perf_counter() - started
+        self.assertGreater(len(chunks), 10)
+        self.assertTrue(chunks[-1].done)
+        self.assertGreaterEqual(elapsed, 0.1 + 20 * 2 / 200 * 0.8)
+
+    def test_model_load_time_honours_keep_alive(self):
+        with StubOllamaServer(load_seconds=0.2) as server:
+            client = ollama.Client(host=server.url)
+            first = client.generate(model="m", prompt="x", keep_alive="5m")
+            second = client.generate(model="m", prompt="x", keep_alive="5m")
+            self.assertGreater(first.load_duration, 0)
+            self.assertEqual(second.load_duration, 0)
+            self.assertIn("m", server.loaded_models())
+
+    def test_embed_endpoint(self):
+        with StubOllamaServer(embedding_dim=32) as server:
+            result = ollama.Client(host=server.url).embed(model="e", input=["a", "b"])
+            self.assertEqual(len(result.embeddings), 2)
+            self.assertEqual(len(result.embeddings[0]), 32)
+            self.assertEqual(server.stats()["/api/embed"]["e"]["texts"], 2)
+
+    def test_full_process_request_runs_offline(self):
+        # Own process: other test modules swap parts of the LangChain stack for mocks
+        with tempfile.TemporaryDirectory() as tmp:
+            report_path = os.path.join(tmp, "report.json")
+            subprocess.run([sys.executable, "benchmark_e2e.py", "--requests", "2", "--concurrency", "2",
+                            "--latency", "fixed:0", "--output", report_path],
+                           check=True, capture_output=True, timeout=300,
+                           env={**os.environ, "TRACE_LLM_WARMUP": "0"})
+            with open(report_path, encoding="utf-8") as f:
+                report = json.load(f)
+        self.assertEqual(report["completed"], 2)
+        chat = report["stub"]["/api/chat"]
+        # Per story: 3 Author drafts, 2 Archivist lookups, 1 Auditor review
+        self.assertEqual(sum(entry["requests"] for entry in chat.values()), 2 * (3 + 2 + 1))
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
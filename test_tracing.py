@@ -0,0 +1,118 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import contextvars
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+import config
+from tools.tracing import (start_trace, span, current_span, current_trace,
+                           add_listener, remove_listener, summarize)
+from tools.llm_calls import invoke_chain
+
+
+class TestSpans(unittest.TestCase):
+
+    def test_spans_nest_under_the_active_span(self):
+        with start_trace("request") as trace:
+            with span("outer"):
+                with span("inner", tc_id="TC_01"):
+                    pass
+        spans = {s["name"]: s for s in trace.to_dict()["spans"]}
+        self.assertIsNone(spans["request"]["parent_id"])
+        self.assertEqual(spans["outer"]["parent_id"], spans["request"]["span_id"])
+        self.assertEqual(spans["inner"]["parent_id"], spans["outer"]["span_id"])
+        self.assertEqual(spans["inner"]["attributes"], {"tc_id": "TC_01"})
+        self.assertIsNone(current_trace())
+
+    def test_error_is_recorded_and_reraised(self):
+        with self.assertRaises(ValueError):
+            with start_trace("request") as trace:
+                with span("stage"):
+                    raise ValueError("boom")
+        spans = {s["name"]: s for s in trace.to_dict()["spans"]}
+        self.assertEqual(spans["stage"]["status"], "error")
+        self.assertEqual(spans["stage"]["error"], "ValueError: boom")
+
+    def test_nested_start_trace_joins_the_active_trace(self):
+        with start_trace("outer") as outer:
+            with start_trace("inner") as inner:
+                self.assertIs(inner, outer)
+        self.assertEqual([s["name"] for s in outer.to_dict()["spans"]], ["outer", "inner"])
+
+    def test_worker_threads_keep_the_request_context(self):
+        with start_trace("request") as trace:
+            with span("drafting"):
+                def work(n):
+                    with span("author", n=n):
+                        pass
+                with ThreadPoolExecutor(max_workers=3) as pool:
+                    futures = [pool.submit(contextvars.copy_context().run, work, n) for n in range(3)]
+                    for future in futures:
+                        future.result()
+        spans = trace.to_dict()["spans"]
+        drafting = next(s for s in spans if s["name"] == "drafting")
+        authors = [s for s in spans if s["name"] == "author"]
+        self.assertEqual(len(authors), 3)
+        self.assertTrue(all(s["parent_id"] == drafting["span_id"] for s in authors))
+
+    def test_listeners_see_every_finished_span(self):
+        seen = []
+        listener = lambda data, trace: seen.append(data["name"])
+        add_listener(listener)
+        try:
+            with span("untraced"):
+                self.assertIsNone(current_span().trace)
+        finally:
+            remove_listener(listener)
+        self.assertEqual(seen, ["untraced"])
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.path = os.path.join(self.tmp, "logs", "traces.jsonl")
+
+    def test_one_json_line_per_trace(self):
+        for _ in range(2):
+            with start_trace("request", export_path=self.path, session="s1"):
+                with span("stage"):
+                    pass
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 2)
+        self.assertNotEqual(lines[0]["trace_id"], lines[1]["trace_id"])
+        self.assertEqual(lines[0]["attributes"], {"session": "s1"})
+
+    def test_model_calls_carry_tokens_and_summarize_adds_them_up(self):
+        chain = MagicMock()
+        chain.invoke.return_value = "a short draft"
+        with patch.multiple(config, LLM_HEDGE_ROLES=(), LLM_TIMEOUTS={}):
+            with start_trace("request", export_path=self.path):
+                invoke_chain("author", "m", chain, {"topic": "login"})
+                invoke_chain("author", "m", chain, {"topic": "logout"})
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            spans = json.loads(f.readline())["spans"]
+        call = next(s for s in spans if s["name"] == "llm.author")
+        self.assertEqual(call["attributes"]["model"], "m")
+        self.assertEqual(call["attributes"]["attempts"], 1)
+        self.assertGreater(call["attributes"]["prompt_tokens"], 0)
+        self.assertGreater(call["attributes"]["completion_tokens"], 0)
+        self.assertIn("queue_ms", call["attributes"])
+
+        rows = {r["span"]: r for r in summarize(self.path)}
+        self.assertEqual(rows["llm.author"]["count"], 2)
+        self.assertEqual(rows["llm.author"]["completion_tokens"], 2 * call["attributes"]["completion_tokens"])
+        self.assertEqual(rows["request"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()